@@ -0,0 +1,80 @@
+"""Archivo de partidas de la clase: importa PGN y busca posiciones.
+
+Las partidas jugadas en la aplicación entran solas al terminar; con este
+script se añaden colecciones PGN y se consulta qué partidas pasaron por
+una posición (por ejemplo, para repasar en clase todas las partidas que
+llegaron a cierta variante). La posición se busca por su clave Zobrist en
+el índice de posiciones, así que la consulta no depende del tamaño del
+archivo.
+
+Uso:
+    python -m modulos.Ajedrez.archivo_partidas importar clase_2024.pgn [otras.pgn ...]
+    python -m modulos.Ajedrez.archivo_partidas buscar --fen "rnbqkb1r/pppppppp/5n2/8/4P3/8/PPPP1PPP/RNBQKBNR w KQkq - 1 2"
+    python -m modulos.Ajedrez.archivo_partidas buscar --jugadas e2e4 g8f6
+"""
+
+import argparse
+import sys
+import time
+
+from .clases import generador
+from .clases.ArchivoPartidas import ArchivoPartidas, RUTA_ARCHIVO
+from .clases.Posicion import Posicion
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Archivo de partidas con índice de posiciones")
+    parser.add_argument("--base", default=RUTA_ARCHIVO, help="fichero SQLite")
+    ordenes = parser.add_subparsers(dest="orden", required=True)
+
+    importar = ordenes.add_parser("importar", help="archiva partidas PGN")
+    importar.add_argument("pgn", nargs="+")
+
+    buscar = ordenes.add_parser("buscar", help="partidas que pasaron por una posición")
+    posicion = buscar.add_mutually_exclusive_group(required=True)
+    posicion.add_argument("--fen")
+    posicion.add_argument("--jugadas", nargs="+", help="jugadas UCI desde el inicio")
+    buscar.add_argument("--limite", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    archivo = ArchivoPartidas(args.base)
+    try:
+        if args.orden == "importar":
+            inicio = time.perf_counter()
+            total = 0
+            for ruta in args.pgn:
+                total += archivo.importar_pgn(
+                    ruta,
+                    lambda n: print(f"\r{ruta}: {n} partidas", end="", flush=True),
+                )
+            print(
+                f"\n{total} partidas leídas en {time.perf_counter() - inicio:.1f}s "
+                f"({archivo.contar_partidas()} en el archivo)"
+            )
+        else:
+            if args.fen:
+                buscada = Posicion.desde_fen(args.fen)
+            else:
+                buscada = Posicion.inicial()
+                for uci in args.jugadas:
+                    mov = generador.jugada_uci(buscada, uci)
+                    if mov is None:
+                        print(f"Jugada ilegal: {uci}")
+                        return 1
+                    buscada.hacer_movimiento(mov)
+            inicio = time.perf_counter()
+            encontradas = archivo.buscar_posicion(buscada, args.limite)
+            ms = (time.perf_counter() - inicio) * 1000
+            for p in encontradas:
+                print(
+                    f"#{p['id']}  {p['blancas'] or '?'} - {p['negras'] or '?'}  "
+                    f"{p['resultado']}  {p['fecha'] or ''}  (jugada {p['ply'] // 2 + 1})"
+                )
+            print(f"{len(encontradas)} partidas ({ms:.2f} ms)")
+    finally:
+        archivo.cerrar()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+"""Banco de pruebas de la evaluación: posiciones por segundo, una a una y por lotes.
+
+Genera posiciones reproducibles con partidas aleatorias desde el banco del
+motor (unas cuantas distintas, repetidas hasta completar la cantidad
+pedida, porque generar jugadas cuesta mucho más que evaluar), las evalúa
+con evaluacion.evaluar y con evaluacion_lotes, comprueba que las dos
+coinciden y muestra el rendimiento de cada camino.
+
+Uso:
+    python -m modulos.Ajedrez.bench_evaluacion
+    python -m modulos.Ajedrez.bench_evaluacion --posiciones 50000 --lote 8192
+"""
+
+import argparse
+import random
+import sys
+import time
+
+import numpy as np
+
+from .bench_motor import POSICIONES_BANCO
+from .clases.Posicion import Posicion
+from .clases import generador
+from .clases.evaluacion import evaluar
+from .clases.evaluacion_lotes import codificar, evaluar_lote
+
+
+def posiciones_aleatorias(cantidad, semilla=0, max_medias_jugadas=60):
+    """Posiciones alcanzadas con jugadas al azar desde el banco del motor."""
+    azar = random.Random(semilla)
+    fens = list(POSICIONES_BANCO.values())
+    posiciones = []
+    while len(posiciones) < cantidad:
+        posicion = Posicion.desde_fen(azar.choice(fens))
+        for _ in range(azar.randint(0, max_medias_jugadas)):
+            legales = generador.generar_todos_legales(posicion, posicion.turno)
+            if not legales:
+                break
+            posicion.hacer_movimiento(azar.choice(legales))
+        posiciones.append(posicion)
+    return posiciones
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Banco de pruebas de la evaluación")
+    parser.add_argument("--posiciones", type=int, default=20000)
+    parser.add_argument(
+        "--distintas", type=int, default=1000, help="posiciones distintas generadas"
+    )
+    parser.add_argument("--lote", type=int, default=4096, help="posiciones por lote")
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    distintas = posiciones_aleatorias(min(args.distintas, args.posiciones), args.semilla)
+    posiciones = [distintas[i % len(distintas)] for i in range(args.posiciones)]
+
+    inicio = time.perf_counter()
+    escalares = [evaluar(p) for p in posiciones]
+    t_escalar = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    planos, turnos = codificar(posiciones)
+    t_codificar = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    valores = np.concatenate(
+        [
+            evaluar_lote(planos[i : i + args.lote], turnos[i : i + args.lote])
+            for i in range(0, len(planos), args.lote)
+        ]
+    )
+    t_lotes = time.perf_counter() - inicio
+
+    discrepancias = int(np.count_nonzero(valores != np.array(escalares)))
+    n = len(posiciones)
+    print(f"{n} posiciones, lotes de {args.lote}")
+    print(f"  una a una : {t_escalar:7.3f}s  {n / t_escalar:>12,.0f} posiciones/s")
+    print(f"  codificar : {t_codificar:7.3f}s  {n / t_codificar:>12,.0f} posiciones/s")
+    print(f"  por lotes : {t_lotes:7.3f}s  {n / t_lotes:>12,.0f} posiciones/s")
+    print(f"  discrepancias con la evaluación del motor: {discrepancias}")
+    return 1 if discrepancias else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+"""Banco de pruebas del motor: nodos por segundo y tiempo por jugada.
+
+Sirve para comprobar que cada nivel responde a tiempo en equipos modestos
+y para comparar la velocidad de la búsqueda entre versiones.
+
+Uso:
+    python -m modulos.Ajedrez.bench_motor
+    python -m modulos.Ajedrez.bench_motor --nivel 4 --profundidad 4
+"""
+
+import argparse
+import sys
+
+from .clases.Posicion import Posicion
+from .clases.Motor import Motor, NIVELES
+from .clases.fen import FEN_INICIAL
+
+POSICIONES_BANCO = {
+    "inicial": FEN_INICIAL,
+    "italiana": "r1bqk1nr/pppp1ppp/2n5/2b1p3/2B1P3/5N2/PPPP1PPP/RNBQK2R w KQkq - 4 4",
+    "medio_juego": "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10",
+    "kiwipete": "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+    "final_torres": "8/5pk1/6p1/8/3R4/6P1/r4PK1/8 w - - 0 40",
+}
+
+
+def medir_nivel(nivel, profundidad=None):
+    """Busca en cada posición del banco. Devuelve (nodos, segundos) totales."""
+    nodos_totales, segundos_totales = 0, 0.0
+    for nombre, fen in POSICIONES_BANCO.items():
+        posicion = Posicion.desde_fen(fen)
+        motor = Motor(nivel)
+        if profundidad is None:
+            resultado = motor.buscar(posicion)
+        else:
+            # Profundidad fija: sin límite de tiempo práctico
+            resultado = motor.buscar(posicion, tiempo=3600, profundidad_max=profundidad)
+        nodos_totales += resultado.nodos
+        segundos_totales += resultado.segundos
+        print(
+            f"nivel {nivel} {nombre:14} {resultado.jugada.uci:6} "
+            f"{resultado.valor:+6d}  prof {resultado.profundidad:2}  "
+            f"{resultado.nodos:>8} nodos  {resultado.segundos:6.2f}s  "
+            f"{resultado.nodos_por_segundo:>9,.0f} nodos/s"
+        )
+    return nodos_totales, segundos_totales
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Banco de pruebas del motor")
+    parser.add_argument(
+        "--nivel", type=int, choices=sorted(NIVELES), help="solo este nivel"
+    )
+    parser.add_argument(
+        "--profundidad", "--depth", type=int, help="profundidad fija en vez de tiempo"
+    )
+    args = parser.parse_args(argv)
+
+    niveles = [args.nivel] if args.nivel else sorted(NIVELES)
+    nodos_totales, segundos_totales = 0, 0.0
+    for nivel in niveles:
+        nodos, segundos = medir_nivel(nivel, args.profundidad)
+        nodos_totales += nodos
+        segundos_totales += segundos
+    if segundos_totales > 0:
+        print(
+            f"\nTotal: {nodos_totales} nodos en {segundos_totales:.2f}s "
+            f"({nodos_totales / segundos_totales:,.0f} nodos/s)"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
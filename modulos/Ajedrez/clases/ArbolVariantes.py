@@ -0,0 +1,169 @@
+# Cada cuántas medias jugadas guarda un nodo el FEN completo de su posición
+INTERVALO_CONTROL = 16
+# Coste de montar una posición desde FEN, en jugadas aplicadas equivalentes
+COSTE_RECONSTRUIR = 4
+
+
+class NodoVariante:
+    """Una jugada del árbol: lo que hace falta para rehacerla y mostrarla.
+
+    No guarda la posición, solo la jugada (UCI) y sus datos para el panel;
+    las variantes comparten con la línea principal todos los nodos hasta
+    el punto en que se separan. Cada INTERVALO_CONTROL medias jugadas el
+    nodo guarda además el FEN (punto de control) para poder saltar ahí
+    sin reproducir la partida desde el principio.
+    """
+
+    __slots__ = (
+        "padre",
+        "hijos",
+        "elegido",
+        "ply",
+        "uci",
+        "san",
+        "san_es",
+        "capturada",
+        "clave",
+        "t_blanco",
+        "t_negro",
+        "resultado",
+        "fen",
+    )
+
+    def __init__(self, padre, uci, ply):
+        self.padre = padre
+        self.hijos = []
+        self.elegido = None  # último hijo visitado: la continuación de la línea
+        self.ply = ply
+        self.uci = uci
+        self.san = None
+        self.san_es = None
+        self.capturada = None  # (nombre, color) de la pieza capturada
+        self.clave = None
+        self.t_blanco = None
+        self.t_negro = None
+        self.resultado = None
+        self.fen = None
+
+    def siguiente(self):
+        """Hijo por el que sigue la línea: el último visitado o la principal."""
+        if self.elegido is not None:
+            return self.elegido
+        return self.hijos[0] if self.hijos else None
+
+    def __repr__(self):
+        return f"NodoVariante({self.ply}: {self.uci})"
+
+
+class ArbolVariantes:
+    """Árbol de jugadas de la partida con sus variantes.
+
+    La raíz es la posición inicial (siempre con FEN). actual es el nodo
+    que está en el tablero. Ir de un nodo a otro se planifica aquí (plan)
+    y lo ejecuta Juego con hacer/deshacer sobre su Posicion; el árbol no
+    sabe nada de piezas ni de pygame.
+    """
+
+    def __init__(self, fen_raiz, clave_raiz):
+        self.raiz = NodoVariante(None, None, 0)
+        self.raiz.fen = fen_raiz
+        self.raiz.clave = clave_raiz
+        self.actual = self.raiz
+
+    def agregar(self, uci):
+        """Baja desde actual por la jugada uci, creando el nodo si es nuevo.
+
+        Devuelve (nodo, nuevo). Si la jugada ya estaba en el árbol se reutiliza
+        su nodo (y todo lo que cuelga de él).
+        """
+        padre = self.actual
+        for hijo in padre.hijos:
+            if hijo.uci == uci:
+                nodo, nuevo = hijo, False
+                break
+        else:
+            nodo, nuevo = NodoVariante(padre, uci, padre.ply + 1), True
+            padre.hijos.append(nodo)
+        padre.elegido = nodo
+        self.actual = nodo
+        return nodo, nuevo
+
+    @staticmethod
+    def necesita_control(nodo):
+        return nodo.ply % INTERVALO_CONTROL == 0
+
+    @staticmethod
+    def camino(nodo):
+        """Nodos desde la raíz (incluida) hasta nodo."""
+        nodos = []
+        while nodo is not None:
+            nodos.append(nodo)
+            nodo = nodo.padre
+        nodos.reverse()
+        return nodos
+
+    @staticmethod
+    def ancestro_comun(a, b):
+        while a.ply > b.ply:
+            a = a.padre
+        while b.ply > a.ply:
+            b = b.padre
+        while a is not b:
+            a, b = a.padre, b.padre
+        return a
+
+    @staticmethod
+    def control_anterior(nodo):
+        """Nodo con FEN más cercano hacia la raíz (a lo sumo INTERVALO_CONTROL atrás)."""
+        while nodo.fen is None:
+            nodo = nodo.padre
+        return nodo
+
+    def plan(self, destino, ply_minimo=0):
+        """Cómo llegar de actual a destino con el menor número de jugadas aplicadas.
+
+        Devuelve (control, subidas, bajadas): si control es None se deshacen
+        `subidas` jugadas desde actual; si no, se monta la posición del FEN de
+        control. En ambos casos después se hacen las jugadas de `bajadas` en
+        orden. ply_minimo es hasta dónde se puede deshacer (por debajo de él
+        la Posicion ya no tiene los registros de deshacer).
+        """
+        comun = self.ancestro_comun(self.actual, destino)
+        control = self.control_anterior(destino)
+        coste_deltas = (self.actual.ply - comun.ply) + (destino.ply - comun.ply)
+        coste_control = COSTE_RECONSTRUIR + destino.ply - control.ply
+        if comun.ply >= ply_minimo and coste_deltas <= coste_control:
+            origen, subidas, control = comun, self.actual.ply - comun.ply, None
+        else:
+            origen, subidas = control, 0
+        bajadas = []
+        nodo = destino
+        while nodo is not origen:
+            bajadas.append(nodo)
+            nodo = nodo.padre
+        bajadas.reverse()
+        return control, subidas, bajadas
+
+    def fin_de_linea(self, nodo=None):
+        """Último nodo siguiendo la línea desde nodo (por defecto, actual)."""
+        nodo = nodo or self.actual
+        while nodo.hijos:
+            nodo = nodo.siguiente()
+        return nodo
+
+    def nodo_en_ply(self, ply):
+        """Nodo de la línea actual (camino + continuación) en la media jugada ply."""
+        nodo = self.actual
+        while nodo.ply > ply:
+            nodo = nodo.padre
+        while nodo.ply < ply and nodo.hijos:
+            nodo = nodo.siguiente()
+        return nodo
+
+    def hermano(self, paso):
+        """Variante vecina de actual (paso -1 / +1) entre los hijos de su padre."""
+        padre = self.actual.padre
+        if padre is None or len(padre.hijos) < 2:
+            return None
+        i = padre.hijos.index(self.actual)
+        return padre.hijos[(i + paso) % len(padre.hijos)]
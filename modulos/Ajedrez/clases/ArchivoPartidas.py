@@ -0,0 +1,244 @@
+import os
+import queue
+import sqlite3
+import threading
+
+from .Posicion import Posicion
+from .pgn import leer_partidas, resolver_san
+
+RUTA_ARCHIVO = os.path.normpath(
+    os.path.join(os.path.dirname(__file__), "..", "assets", "partidas", "archivo.db")
+)
+
+# Partidas que el hilo escritor junta como máximo en una transacción
+LOTE_ESCRITURA = 200
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS partidas (
+    id INTEGER PRIMARY KEY,
+    origen TEXT UNIQUE,
+    evento TEXT,
+    fecha TEXT,
+    blancas TEXT,
+    negras TEXT,
+    resultado TEXT NOT NULL DEFAULT '*',
+    fen_inicial TEXT,
+    jugadas_san TEXT NOT NULL,
+    jugadas_uci TEXT NOT NULL
+);
+
+-- Índice de posiciones: clave Zobrist -> (partida, media jugada). La clave
+-- primaria empieza por la clave, así que buscar una posición es recorrer
+-- un tramo contiguo del árbol sin tocar la tabla de partidas.
+CREATE TABLE IF NOT EXISTS posiciones (
+    clave INTEGER NOT NULL,
+    partida_id INTEGER NOT NULL,
+    ply INTEGER NOT NULL,
+    PRIMARY KEY (clave, partida_id, ply)
+) WITHOUT ROWID;
+"""
+
+
+def _clave_sql(clave):
+    """Las claves Zobrist son de 64 bits sin signo; SQLite guarda enteros con signo."""
+    return clave - (1 << 64) if clave >= 1 << 63 else clave
+
+
+class PartidaArchivada:
+    """Lo que se guarda de una partida: cabeceras, jugadas y la clave de cada posición.
+
+    origen identifica partidas importadas ("pgn:fichero:n") para no
+    repetirlas; las de Juego van sin origen.
+
+    claves tiene una entrada más que jugadas: la de la posición inicial
+    (ply 0) y la de después de cada jugada, tal como las deja
+    Posicion.historial_claves.
+    """
+
+    __slots__ = ("origen", "cabeceras", "resultado", "fen_inicial", "san", "uci", "claves")
+
+    def __init__(self, origen, cabeceras, resultado, fen_inicial, san, uci, claves):
+        self.origen = origen
+        self.cabeceras = cabeceras
+        self.resultado = resultado
+        self.fen_inicial = fen_inicial
+        self.san = san
+        self.uci = uci
+        self.claves = claves
+
+
+class ArchivoPartidas:
+    """Archivo de partidas en SQLite con índice de posiciones.
+
+    Las escrituras las hace un hilo propio con su propia conexión: guardar()
+    solo encola la partida, así que el bucle de pygame nunca espera al disco.
+    El hilo agrupa lo que haya en cola en una sola transacción. Las
+    consultas usan otra conexión desde el hilo que llama; con el diario WAL
+    se puede leer mientras el escritor trabaja.
+    """
+
+    def __init__(self, ruta=RUTA_ARCHIVO):
+        self.ruta = ruta
+        os.makedirs(os.path.dirname(os.path.abspath(ruta)), exist_ok=True)
+        self.conexion = self._conectar()
+        self.conexion.executescript(ESQUEMA)
+        self._cola = queue.Queue()
+        self._escritor = threading.Thread(
+            target=self._bucle_escritor, name="ArchivoPartidas", daemon=True
+        )
+        self._escritor.start()
+
+    def _conectar(self):
+        conexion = sqlite3.connect(self.ruta)
+        conexion.execute("PRAGMA journal_mode = WAL")
+        conexion.execute("PRAGMA synchronous = NORMAL")
+        return conexion
+
+    # --- ESCRITURA (hilo escritor) ---
+    def guardar(self, partida):
+        """Encola una PartidaArchivada; vuelve enseguida."""
+        self._cola.put(partida)
+
+    def esperar(self):
+        """Bloquea hasta que todo lo encolado esté escrito."""
+        self._cola.join()
+
+    def _bucle_escritor(self):
+        conexion = self._conectar()
+        try:
+            while True:
+                primera = self._cola.get()
+                lote = [primera]
+                # Junta lo que ya esté esperando, sin quedarse a esperar más
+                while len(lote) < LOTE_ESCRITURA:
+                    try:
+                        lote.append(self._cola.get_nowait())
+                    except queue.Empty:
+                        break
+                partidas = [p for p in lote if p is not None]
+                try:
+                    if partidas:
+                        self._escribir(conexion, partidas)
+                except sqlite3.Error as e:
+                    print(f"No se pudieron archivar {len(partidas)} partidas: {e}")
+                finally:
+                    for _ in lote:
+                        self._cola.task_done()
+                if None in lote:
+                    return
+        finally:
+            conexion.close()
+
+    @staticmethod
+    def _escribir(conexion, partidas):
+        with conexion:
+            cursor = conexion.cursor()
+            for partida in partidas:
+                cabeceras = partida.cabeceras
+                cursor.execute(
+                    "INSERT OR IGNORE INTO partidas (origen, evento, fecha, blancas, "
+                    "negras, resultado, fen_inicial, jugadas_san, jugadas_uci) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        partida.origen,
+                        cabeceras.get("Event"),
+                        cabeceras.get("Date"),
+                        cabeceras.get("White"),
+                        cabeceras.get("Black"),
+                        partida.resultado,
+                        partida.fen_inicial,
+                        " ".join(partida.san),
+                        " ".join(partida.uci),
+                    ),
+                )
+                if not cursor.rowcount:
+                    continue  # mismo origen: ya estaba archivada
+                partida_id = cursor.lastrowid
+                cursor.executemany(
+                    "INSERT OR IGNORE INTO posiciones (clave, partida_id, ply) VALUES (?, ?, ?)",
+                    [
+                        (_clave_sql(clave), partida_id, ply)
+                        for ply, clave in enumerate(partida.claves)
+                    ],
+                )
+
+    # --- IMPORTACIÓN DE PGN ---
+    def importar_pgn(self, ruta, informar=None):
+        """Archiva las partidas de un PGN leyéndolo en flujo. Devuelve cuántas leyó.
+
+        Las partidas pasan por la misma cola que las de Juego; la cola no
+        crece sin límite porque se espera al escritor cada LOTE_ESCRITURA.
+        """
+        nombre = os.path.basename(ruta)
+        leidas = 0
+        with open(ruta, encoding="utf-8", errors="replace") as entrada:
+            for numero, partida in enumerate(leer_partidas(entrada), start=1):
+                posicion = partida.posicion_inicial()
+                idioma = partida.idioma
+                san, uci = [], []
+                for texto in partida.jugadas:
+                    try:
+                        mov = resolver_san(posicion, texto, idioma)
+                    except ValueError:
+                        break  # se archiva hasta la última jugada legal
+                    san.append(texto)
+                    uci.append(mov.uci)
+                    posicion.hacer_movimiento(mov)
+                self.guardar(
+                    PartidaArchivada(
+                        f"pgn:{nombre}:{numero}",
+                        partida.cabeceras,
+                        partida.resultado,
+                        partida.fen_inicial,
+                        san,
+                        uci,
+                        list(posicion.historial_claves),
+                    )
+                )
+                leidas += 1
+                if leidas % LOTE_ESCRITURA == 0:
+                    self.esperar()
+                    if informar is not None:
+                        informar(leidas)
+        self.esperar()
+        return leidas
+
+    # --- CONSULTAS ---
+    def buscar_clave(self, clave, limite=100):
+        """Partidas que pasaron por la posición: lista de dicts con id, ply y cabeceras."""
+        filas = self.conexion.execute(
+            "SELECT p.id, x.ply, p.blancas, p.negras, p.resultado, p.fecha, p.evento "
+            "FROM posiciones x JOIN partidas p ON p.id = x.partida_id "
+            "WHERE x.clave = ? ORDER BY x.partida_id DESC LIMIT ?",
+            (_clave_sql(clave), limite),
+        ).fetchall()
+        campos = ("id", "ply", "blancas", "negras", "resultado", "fecha", "evento")
+        return [dict(zip(campos, fila)) for fila in filas]
+
+    def buscar_posicion(self, posicion, limite=100):
+        return self.buscar_clave(posicion.clave, limite)
+
+    def buscar_fen(self, fen, limite=100):
+        return self.buscar_clave(Posicion.desde_fen(fen).clave, limite)
+
+    def contar_partidas(self):
+        return self.conexion.execute("SELECT COUNT(*) FROM partidas").fetchone()[0]
+
+    def obtener(self, partida_id):
+        """(cabeceras, resultado, fen_inicial, jugadas UCI) de una partida, o None."""
+        fila = self.conexion.execute(
+            "SELECT evento, fecha, blancas, negras, resultado, fen_inicial, jugadas_uci "
+            "FROM partidas WHERE id = ?",
+            (partida_id,),
+        ).fetchone()
+        if fila is None:
+            return None
+        evento, fecha, blancas, negras, resultado, fen_inicial, uci = fila
+        cabeceras = {"Event": evento, "Date": fecha, "White": blancas, "Black": negras}
+        return cabeceras, resultado, fen_inicial, uci.split()
+
+    def cerrar(self):
+        """Termina de escribir lo pendiente y cierra las conexiones."""
+        self._cola.put(None)
+        self._escritor.join()
+        self.conexion.close()
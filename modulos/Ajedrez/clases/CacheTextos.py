@@ -0,0 +1,36 @@
+from collections import OrderedDict
+
+
+class CacheTextos:
+    """Superficies de texto ya renderizadas, con un máximo de entradas (LRU).
+
+    La clave es (fuente, texto, color): las fuentes se crean una sola vez
+    en TableroInteractivo, así que el objeto fuente sirve de clave y la
+    caché lo mantiene vivo mientras tenga textos suyos.
+    """
+
+    def __init__(self, capacidad=256):
+        self.capacidad = capacidad
+        self._superficies = OrderedDict()
+        self.aciertos = 0
+        self.fallos = 0
+
+    def render(self, fuente, texto, color):
+        clave = (fuente, texto, color)
+        superficie = self._superficies.get(clave)
+        if superficie is not None:
+            self._superficies.move_to_end(clave)
+            self.aciertos += 1
+            return superficie
+        self.fallos += 1
+        superficie = fuente.render(texto, True, color)
+        self._superficies[clave] = superficie
+        if len(self._superficies) > self.capacidad:
+            self._superficies.popitem(last=False)
+        return superficie
+
+    def vaciar(self):
+        self._superficies.clear()
+
+    def __len__(self):
+        return len(self._superficies)
@@ -1,6 +1,9 @@
 import pygame
 import math
 
+ANCHO_LINEA = 8
+TAM_PUNTA = 20
+
 
 class Flecha:
     def __init__(self, fila_inicio, col_inicio, fila_fin, col_fin, color, tam_cuadro):
@@ -17,10 +20,17 @@ class Flecha:
             fila_fin * tam_cuadro + tam_cuadro // 2,
         )
 
+    def rect(self):
+        """Rectángulo de pantalla que puede pintar la flecha (con su punta)."""
+        margen = TAM_PUNTA + ANCHO_LINEA
+        x0, x1 = sorted((self.inicio[0], self.fin[0]))
+        y0, y1 = sorted((self.inicio[1], self.fin[1]))
+        return pygame.Rect(x0 - margen, y0 - margen, x1 - x0 + 2 * margen, y1 - y0 + 2 * margen)
+
     def dibujar(self, superficie):
         # Configuración de la flecha
-        ancho_linea = 8
-        tam_punta = 20
+        ancho_linea = ANCHO_LINEA
+        tam_punta = TAM_PUNTA
 
         # Dibujar el cuerpo de la flecha (la línea)
         pygame.draw.line(superficie, self.color, self.inicio, self.fin, ancho_linea)
@@ -0,0 +1,102 @@
+import mmap
+import os
+import random
+import struct
+
+from . import generador
+
+RUTA_LIBRO = os.path.normpath(
+    os.path.join(os.path.dirname(__file__), "..", "assets", "libro", "aperturas.bin")
+)
+
+MAGICO = b"LIBROAJ1"
+# Registro: clave Zobrist (u64), jugada codificada (u16), peso (u16), big-endian
+# para que el orden de bytes coincida con el orden numérico de las claves
+REGISTRO = struct.Struct(">QHH")
+PESO_MAXIMO = 0xFFFF
+
+
+class LibroAperturas:
+    """Libro de aperturas en un fichero binario ordenado por clave Zobrist.
+
+    El fichero se proyecta en memoria con mmap y se consulta por búsqueda
+    binaria, así que abrirlo no cuesta nada aunque tenga millones de
+    registros: solo se leen las páginas que toca cada consulta.
+    """
+
+    def __init__(self, ruta=RUTA_LIBRO):
+        self.ruta = ruta
+        self._fichero = open(ruta, "rb")
+        try:
+            self._datos = mmap.mmap(self._fichero.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._fichero.close()
+            raise ValueError(f"Libro de aperturas vacío: {ruta}")
+        if self._datos[: len(MAGICO)] != MAGICO:
+            self.cerrar()
+            raise ValueError(f"No es un libro de aperturas: {ruta}")
+        self.registros = (len(self._datos) - len(MAGICO)) // REGISTRO.size
+
+    @classmethod
+    def abrir(cls, ruta=RUTA_LIBRO):
+        """El libro si el fichero existe y es válido; None en otro caso."""
+        if not os.path.exists(ruta):
+            return None
+        try:
+            return cls(ruta)
+        except (OSError, ValueError) as e:
+            print(f"No se pudo abrir el libro de aperturas: {e}")
+            return None
+
+    def _registro(self, i):
+        return REGISTRO.unpack_from(self._datos, len(MAGICO) + i * REGISTRO.size)
+
+    def jugadas(self, clave):
+        """Lista de (código de jugada, peso) guardados para la clave."""
+        # Primer registro con clave >= la buscada
+        bajo, alto = 0, self.registros
+        while bajo < alto:
+            medio = (bajo + alto) // 2
+            if self._registro(medio)[0] < clave:
+                bajo = medio + 1
+            else:
+                alto = medio
+        encontradas = []
+        while bajo < self.registros:
+            clave_reg, codigo, peso = self._registro(bajo)
+            if clave_reg != clave:
+                break
+            encontradas.append((codigo, peso))
+            bajo += 1
+        return encontradas
+
+    def _movimientos(self, posicion):
+        """Pares (Movimiento, peso) del libro que son legales en la posición."""
+        opciones = self.jugadas(posicion.clave)
+        if not opciones:
+            return []
+        por_codigo = {
+            m.codigo: m
+            for m in generador.generar_todos_legales(posicion, posicion.turno)
+        }
+        # Una colisión de clave podría traer códigos que aquí no son legales
+        return [(por_codigo[c], p) for c, p in opciones if c in por_codigo]
+
+    def mejor_jugada(self, posicion):
+        """La jugada de más peso, o None si la posición no está en el libro."""
+        opciones = self._movimientos(posicion)
+        if not opciones:
+            return None
+        return max(opciones, key=lambda opcion: opcion[1])[0]
+
+    def elegir(self, posicion, azar=random):
+        """Una jugada del libro elegida al azar en proporción a su peso."""
+        opciones = self._movimientos(posicion)
+        if not opciones:
+            return None
+        movimientos, pesos = zip(*opciones)
+        return azar.choices(movimientos, weights=pesos)[0]
+
+    def cerrar(self):
+        self._datos.close()
+        self._fichero.close()
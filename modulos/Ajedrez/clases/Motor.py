@@ -0,0 +1,373 @@
+import random
+import time
+
+from . import generador
+from .evaluacion import VALOR_PIEZA, evaluar
+from .TablaTransposicion import (
+    TablaTransposicion,
+    EXACTO,
+    COTA_INFERIOR,
+    COTA_SUPERIOR,
+)
+
+MATE = 100000
+INFINITO = MATE + 1
+# Por encima de este valor la puntuación es un mate en N
+UMBRAL_MATE = MATE - 1000
+PLY_MAXIMO = 128
+
+# Nivel -> profundidad máxima, segundos máximos por jugada y ruido de la
+# evaluación en centipeones (los niveles bajos juegan peor a propósito)
+NIVELES = {
+    1: {"profundidad": 1, "tiempo": 0.3, "ruido": 150},
+    2: {"profundidad": 2, "tiempo": 0.6, "ruido": 60},
+    3: {"profundidad": 3, "tiempo": 1.5, "ruido": 20},
+    4: {"profundidad": 5, "tiempo": 3.0, "ruido": 0},
+    5: {"profundidad": 64, "tiempo": 8.0, "ruido": 0},
+}
+
+
+def tiempo_para_jugada(nivel, restante, incremento=0.0):
+    """Segundos a dedicar a esta jugada según el reloj del bando al turno.
+
+    Se reparte el tiempo restante como si quedaran 30 jugadas, se suma
+    casi todo el incremento y nunca se pasa del máximo del nivel ni de
+    la mitad de lo que queda.
+    """
+    maximo = NIVELES[nivel]["tiempo"]
+    if restante is None:
+        return maximo
+    asignado = restante / 30.0 + incremento * 0.8
+    return max(0.05, min(asignado, restante * 0.5, maximo))
+
+
+class BusquedaInterrumpida(Exception):
+    """Se acabó el tiempo o alguien pidió parar a mitad de iteración."""
+
+
+class ResultadoBusqueda:
+    """Mejor jugada de la última iteración completa y sus datos."""
+
+    __slots__ = ("jugada", "valor", "pv", "profundidad", "nodos", "segundos")
+
+    def __init__(self, jugada, valor, pv, profundidad, nodos, segundos):
+        self.jugada = jugada
+        self.valor = valor
+        self.pv = pv
+        self.profundidad = profundidad
+        self.nodos = nodos
+        self.segundos = segundos
+
+    @property
+    def nodos_por_segundo(self):
+        return self.nodos / self.segundos if self.segundos > 0 else 0.0
+
+    def __repr__(self):
+        pv = " ".join(m.uci for m in self.pv)
+        return (
+            f"ResultadoBusqueda({self.valor:+d} prof {self.profundidad}, "
+            f"{self.nodos} nodos, pv {pv})"
+        )
+
+
+class Motor:
+    """Búsqueda alfa-beta (negamax) sobre una Posicion.
+
+    Profundización iterativa con tabla de transposición, búsqueda de quietud
+    en capturas, ordenación MVV-LVA y jugadas asesinas. La búsqueda trabaja
+    haciendo y deshaciendo jugadas sobre la misma Posicion, que al terminar
+    (o al interrumpirse) queda exactamente como estaba.
+    """
+
+    def __init__(self, nivel=3, tabla=None, sondeo_finales=None):
+        self.nivel = nivel
+        self.tabla = tabla if tabla is not None else TablaTransposicion()
+        # sondeo_finales(posicion) -> puntuación exacta para el bando al turno o
+        # None; los mates se cuentan desde esa posición (MATE - medias jugadas)
+        self.sondeo_finales = sondeo_finales
+        self.posicion = None
+        self.nodos = 0
+        self._limite = None
+        self._debe_parar = None
+        self._ruido = 0
+        self._semilla = 0
+        self._asesinas = [[0, 0] for _ in range(PLY_MAXIMO)]
+        self._pv = [[] for _ in range(PLY_MAXIMO + 1)]
+
+    @property
+    def ajustes(self):
+        return NIVELES[self.nivel]
+
+    # --- GESTIÓN DEL TIEMPO ---
+    def tiempo_para_jugada(self, restante, incremento=0.0):
+        return tiempo_para_jugada(self.nivel, restante, incremento)
+
+    def _comprobar_limites(self):
+        if self._limite is not None and time.perf_counter() >= self._limite:
+            raise BusquedaInterrumpida
+        if self._debe_parar is not None and self._debe_parar():
+            raise BusquedaInterrumpida
+
+    # --- BÚSQUEDA ---
+    def buscar(self, posicion, tiempo=None, profundidad_max=None, debe_parar=None):
+        """Busca la mejor jugada para el bando al turno.
+
+        tiempo es el máximo en segundos (None = el del nivel) y debe_parar
+        una función opcional que, si devuelve True, corta la búsqueda. Se
+        devuelve el resultado de la última iteración completa, o None si
+        no hay jugadas legales.
+        """
+        ajustes = self.ajustes
+        if tiempo is None:
+            tiempo = ajustes["tiempo"]
+        if profundidad_max is None:
+            profundidad_max = ajustes["profundidad"]
+        profundidad_max = min(profundidad_max, PLY_MAXIMO - 1)
+
+        self.posicion = posicion
+        self.nodos = 0
+        self._debe_parar = debe_parar
+        self._ruido = ajustes["ruido"]
+        self._semilla = random.getrandbits(64)
+        for asesinas in self._asesinas:
+            asesinas[0] = asesinas[1] = 0
+        if self._ruido:
+            # Con ruido las puntuaciones guardadas no sirven de una búsqueda a otra
+            self.tabla.limpiar()
+
+        inicio = time.perf_counter()
+        legales = generador.generar_todos_legales(posicion, posicion.turno)
+        if not legales:
+            return None
+        if len(legales) == 1:
+            return ResultadoBusqueda(legales[0], 0, [legales[0]], 0, 0, 0.0)
+
+        if self.sondeo_finales is not None and self.sondeo_finales(posicion) is not None:
+            # Final con tablas: basta un nivel, cada hija trae su valor exacto
+            profundidad_max = 1
+
+        self._limite = inicio + tiempo
+        mejor = None
+        for profundidad in range(1, profundidad_max + 1):
+            try:
+                valor = self._negamax(profundidad, -INFINITO, INFINITO, 0)
+            except BusquedaInterrumpida:
+                break
+            segundos = time.perf_counter() - inicio
+            pv = list(self._pv[0])
+            mejor = ResultadoBusqueda(pv[0], valor, pv, profundidad, self.nodos, segundos)
+            if abs(valor) >= UMBRAL_MATE:
+                break
+            # La siguiente iteración cuesta varias veces esta: no merece la pena empezarla
+            if segundos > tiempo * 0.5:
+                break
+        self._limite = None
+
+        if mejor is None:
+            # Ni siquiera terminó la profundidad 1: cualquier jugada legal
+            segundos = time.perf_counter() - inicio
+            mejor = ResultadoBusqueda(legales[0], 0, [legales[0]], 0, self.nodos, segundos)
+        return mejor
+
+    def puntuar_jugadas(self, posicion, profundidad=1):
+        """Valor exacto de cada jugada legal, de mejor a peor.
+
+        A diferencia de buscar, no poda entre jugadas de la raíz: cada una se
+        busca con ventana completa a profundidad - 1 (más la quietud). Sirve
+        para análisis, p. ej. saber si solo una jugada gana. Sin límite de
+        tiempo; devuelve una lista de (Movimiento, valor).
+        """
+        self.posicion = posicion
+        self.nodos = 0
+        self._debe_parar = None
+        self._limite = None
+        self._ruido = self.ajustes["ruido"]
+        self._semilla = random.getrandbits(64)
+        if self._ruido:
+            self.tabla.limpiar()
+
+        puntuadas = []
+        for mov in generador.generar_todos_legales(posicion, posicion.turno):
+            registro = posicion.hacer_movimiento(mov)
+            try:
+                valor = -self._negamax(profundidad - 1, -INFINITO, INFINITO, 1)
+            finally:
+                posicion.deshacer(registro)
+            puntuadas.append((mov, valor))
+        puntuadas.sort(key=lambda par: par[1], reverse=True)
+        return puntuadas
+
+    def _evaluar(self):
+        valor = evaluar(self.posicion)
+        if self._ruido:
+            # Ruido determinista por posición para que la búsqueda sea coherente
+            h = (self.posicion.clave ^ self._semilla) * 0x9E3779B97F4A7C15
+            valor += (h >> 40) % (2 * self._ruido + 1) - self._ruido
+        return valor
+
+    def _negamax(self, profundidad, alfa, beta, ply):
+        pos = self.posicion
+        self.nodos += 1
+        if self.nodos & 1023 == 0:
+            self._comprobar_limites()
+        self._pv[ply] = []
+
+        if ply > 0:
+            if pos.reloj_medio >= 100 or pos.veces_repetida() >= 2:
+                return 0
+            if self.sondeo_finales is not None:
+                valor = self.sondeo_finales(pos)
+                if valor is not None:
+                    return _valor_desde_tabla(valor, ply)
+        if ply >= PLY_MAXIMO - 1:
+            return self._evaluar()
+
+        color = pos.turno
+        en_jaque = pos.en_jaque(color)
+        if en_jaque:
+            profundidad += 1  # extensión de jaque
+        if profundidad <= 0:
+            return self._quietud(alfa, beta, ply)
+
+        jugada_tabla = 0
+        entrada = self.tabla.buscar(pos.clave)
+        if entrada is not None:
+            prof_tabla, valor_tabla, tipo, jugada_tabla = entrada
+            if ply > 0 and prof_tabla >= profundidad:
+                valor_tabla = _valor_desde_tabla(valor_tabla, ply)
+                if tipo == EXACTO:
+                    return valor_tabla
+                if tipo == COTA_INFERIOR and valor_tabla >= beta:
+                    return valor_tabla
+                if tipo == COTA_SUPERIOR and valor_tabla <= alfa:
+                    return valor_tabla
+
+        movimientos = generador.generar_todas_pseudolegales(pos, color)
+        self._ordenar(movimientos, jugada_tabla, ply)
+
+        alfa_original = alfa
+        mejor_valor = -INFINITO
+        mejor_jugada = None
+        legales = 0
+        for mov in movimientos:
+            registro = pos.hacer_movimiento(mov)
+            if pos.en_jaque(color):
+                pos.deshacer(registro)
+                continue
+            legales += 1
+            try:
+                valor = -self._negamax(profundidad - 1, -beta, -alfa, ply + 1)
+            finally:
+                pos.deshacer(registro)
+
+            if valor > mejor_valor:
+                mejor_valor = valor
+                mejor_jugada = mov
+                if valor > alfa:
+                    alfa = valor
+                    self._pv[ply] = [mov] + self._pv[ply + 1]
+                    if alfa >= beta:
+                        if mov.capturada is None and not mov.promocion:
+                            self._guardar_asesina(mov, ply)
+                        break
+
+        if legales == 0:
+            return -MATE + ply if en_jaque else 0
+
+        if mejor_valor >= beta:
+            tipo = COTA_INFERIOR
+        elif mejor_valor > alfa_original:
+            tipo = EXACTO
+        else:
+            tipo = COTA_SUPERIOR
+        self.tabla.guardar(
+            pos.clave,
+            profundidad,
+            _valor_a_tabla(mejor_valor, ply),
+            tipo,
+            mejor_jugada.codigo,
+        )
+        return mejor_valor
+
+    def _quietud(self, alfa, beta, ply):
+        """Solo capturas y promociones hasta llegar a una posición tranquila."""
+        pos = self.posicion
+        self.nodos += 1
+        if self.nodos & 1023 == 0:
+            self._comprobar_limites()
+
+        valor_estatico = self._evaluar()
+        if valor_estatico >= beta or ply >= PLY_MAXIMO - 1:
+            return valor_estatico
+        if valor_estatico > alfa:
+            alfa = valor_estatico
+
+        color = pos.turno
+        capturas = generador.generar_capturas(pos, color)
+        capturas.sort(key=_clave_mvv_lva, reverse=True)
+        for mov in capturas:
+            registro = pos.hacer_movimiento(mov)
+            if pos.en_jaque(color):
+                pos.deshacer(registro)
+                continue
+            try:
+                valor = -self._quietud(-beta, -alfa, ply + 1)
+            finally:
+                pos.deshacer(registro)
+            if valor >= beta:
+                return valor
+            if valor > alfa:
+                alfa = valor
+        return alfa
+
+    # --- ORDENACIÓN DE JUGADAS ---
+    def _ordenar(self, movimientos, jugada_tabla, ply):
+        asesinas = self._asesinas[ply]
+
+        def puntuar(mov):
+            codigo = mov.codigo
+            if codigo == jugada_tabla:
+                return 1000000
+            if mov.capturada is not None or mov.promocion:
+                return 100000 + _clave_mvv_lva(mov)
+            if codigo == asesinas[0]:
+                return 90000
+            if codigo == asesinas[1]:
+                return 80000
+            return 0
+
+        movimientos.sort(key=puntuar, reverse=True)
+
+    def _guardar_asesina(self, mov, ply):
+        asesinas = self._asesinas[ply]
+        codigo = mov.codigo
+        if asesinas[0] != codigo:
+            asesinas[1] = asesinas[0]
+            asesinas[0] = codigo
+
+
+def _clave_mvv_lva(mov):
+    """Víctima más valiosa primero; a igualdad, el atacante más barato."""
+    valor = 0
+    if mov.capturada is not None:
+        valor = VALOR_PIEZA[mov.capturada.nombre] * 10 - VALOR_PIEZA[mov.pieza.nombre] // 100
+    if mov.promocion:
+        valor += VALOR_PIEZA[mov.promocion]
+    return valor
+
+
+def _valor_a_tabla(valor, ply):
+    # Los mates se guardan relativos a la posición, no a la raíz
+    if valor >= UMBRAL_MATE:
+        return valor + ply
+    if valor <= -UMBRAL_MATE:
+        return valor - ply
+    return valor
+
+
+def _valor_desde_tabla(valor, ply):
+    if valor >= UMBRAL_MATE:
+        return valor - ply
+    if valor <= -UMBRAL_MATE:
+        return valor + ply
+    return valor
@@ -0,0 +1,128 @@
+# Pieza de promoción <-> código de 3 bits usado en Movimiento.codigo
+CODIGOS_PROMOCION = {None: 0, "dama": 1, "torre": 2, "alfil": 3, "caballo": 4}
+PROMOCION_POR_CODIGO = {v: k for k, v in CODIGOS_PROMOCION.items()}
+LETRAS_PROMOCION_UCI = {"dama": "q", "torre": "r", "alfil": "b", "caballo": "n"}
+
+
+class Movimiento:
+    """Jugada generada por el generador de movimientos.
+
+    Guarda origen, destino y las banderas que el resto del juego necesita
+    para aplicarla sin volver a deducirlas: captura, enroque, captura al
+    paso y pieza de promoción.
+    """
+
+    __slots__ = (
+        "f_orig",
+        "c_orig",
+        "f_dest",
+        "c_dest",
+        "pieza",
+        "capturada",
+        "es_enroque",
+        "es_al_paso",
+        "promocion",
+    )
+
+    def __init__(
+        self,
+        pieza,
+        f_dest,
+        c_dest,
+        capturada=None,
+        es_enroque=False,
+        es_al_paso=False,
+        promocion=None,
+    ):
+        self.f_orig = pieza.fila
+        self.c_orig = pieza.col
+        self.f_dest = f_dest
+        self.c_dest = c_dest
+        self.pieza = pieza
+        self.capturada = capturada
+        self.es_enroque = es_enroque
+        self.es_al_paso = es_al_paso
+        self.promocion = promocion
+
+    @property
+    def es_captura(self):
+        return self.capturada is not None
+
+    @property
+    def destino(self):
+        return (self.f_dest, self.c_dest)
+
+    @property
+    def codigo(self):
+        """Entero de 15 bits (origen, destino, promoción) para tablas y libros."""
+        return (
+            (self.f_orig * 8 + self.c_orig)
+            | (self.f_dest * 8 + self.c_dest) << 6
+            | CODIGOS_PROMOCION[self.promocion] << 12
+        )
+
+    @property
+    def uci(self):
+        """Notación de coordenadas: e2e4, e7e8q."""
+        letras = "abcdefgh"
+        texto = (
+            f"{letras[self.c_orig]}{8 - self.f_orig}"
+            f"{letras[self.c_dest]}{8 - self.f_dest}"
+        )
+        if self.promocion:
+            texto += LETRAS_PROMOCION_UCI[self.promocion]
+        return texto
+
+    def __repr__(self):
+        return f"Movimiento({self.uci})"
+
+
+class RegistroMovimiento:
+    """Lo necesario para que ``Posicion.deshacer`` revierta una jugada exactamente."""
+
+    __slots__ = (
+        "mov",
+        "indice_capturada",
+        "ha_movido_previo",
+        "torre",
+        "c_torre_orig",
+        "ha_movido_torre_previo",
+        "nombre_previo",
+        "ultimo_movimiento_previo",
+        "clave_previa",
+        "derechos_previos",
+        "col_al_paso_previa",
+        "reloj_medio_previo",
+    )
+
+    def __init__(self, mov, indice_capturada, ha_movido_previo, ultimo_previo):
+        self.mov = mov
+        self.indice_capturada = indice_capturada
+        self.ha_movido_previo = ha_movido_previo
+        self.torre = None
+        self.c_torre_orig = None
+        self.ha_movido_torre_previo = False
+        self.nombre_previo = mov.pieza.nombre
+        self.ultimo_movimiento_previo = ultimo_previo
+        self.clave_previa = 0
+        self.derechos_previos = 0
+        self.col_al_paso_previa = 0
+        self.reloj_medio_previo = 0
+
+
+class DeltaPartida:
+    """Entrada del historial de deshacer de la partida.
+
+    Sustituye a las copias profundas de todas las piezas: guarda el registro
+    de la jugada, la imagen del peón si hubo promoción y los relojes y el
+    resultado tal como quedaron tras la jugada.
+    """
+
+    __slots__ = ("registro", "imagen_previa", "t_blanco", "t_negro", "resultado")
+
+    def __init__(self, registro, imagen_previa, t_blanco, t_negro, resultado):
+        self.registro = registro
+        self.imagen_previa = imagen_previa
+        self.t_blanco = t_blanco
+        self.t_negro = t_negro
+        self.resultado = resultado
@@ -0,0 +1,17 @@
+class Pieza:
+    """Pieza de ajedrez sin representación gráfica.
+
+    Es lo único que necesitan las reglas (Posicion, generador, Reglas);
+    PiezaAnimada la extiende con la imagen y la animación.
+    """
+
+    def __init__(self, nombre, color, fila, col):
+        self.nombre = nombre
+        self.color = color
+        self.fila = fila
+        self.col = col
+        self.ha_movido = False
+        self.indice_lista = -1  # hueco en Posicion.piezas (lo mantiene Posicion)
+
+    def __repr__(self):
+        return f"Pieza({self.nombre}, {self.color}, {self.fila}, {self.col})"
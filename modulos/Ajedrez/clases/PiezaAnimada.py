@@ -1,15 +1,69 @@
 import pygame
 import os
+from .Pieza import Pieza
+
+RUTA_PIEZAS = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "assets",
+    "piezas_animadas",
+)
+
+# --- CACHÉ DE SPRITES DEL PROCESO ---
+# (nombre, color, tam_cuadro) -> Surface ya convertida y escalada. Todas las
+# piezas del mismo tipo comparten la misma Surface, así que crear partidas,
+# deshacer o promocionar no vuelve a tocar el disco.
+_sprites = {}
+_tam_sprites = None
+
+
+def obtener_sprite(nombre, color, tam_cuadro):
+    """Devuelve el sprite de la pieza, decodificándolo solo la primera vez."""
+    global _tam_sprites
+    if tam_cuadro != _tam_sprites:
+        # Cambió el tamaño de casilla: las superficies escaladas ya no sirven
+        _sprites.clear()
+        _tam_sprites = tam_cuadro
+
+    clave = (nombre, color, tam_cuadro)
+    sprite = _sprites.get(clave)
+    if sprite is None:
+        sprite = _cargar_sprite(nombre, color, tam_cuadro)
+        _sprites[clave] = sprite
+    return sprite
+
+
+def _cargar_sprite(nombre, color, tam_cuadro):
+    """Lógica de carga de imágenes con soporte PNG/JPG."""
+    try:
+        nombre_base = f"{nombre}_{color}"
+        ruta_png = os.path.join(RUTA_PIEZAS, f"{nombre_base}.png")
+        ruta_jpg = os.path.join(RUTA_PIEZAS, f"{nombre_base}.jpg")
+
+        if os.path.exists(ruta_png):
+            ruta_final = ruta_png
+        elif os.path.exists(ruta_jpg):
+            ruta_final = ruta_jpg
+        else:
+            raise FileNotFoundError(f"No se encontró {nombre_base}")
+
+        imagen_temp = pygame.image.load(ruta_final).convert_alpha()
+
+        if ruta_final.endswith(".jpg"):
+            imagen_temp.set_colorkey((255, 255, 255))
+
+        return pygame.transform.smoothscale(imagen_temp, (tam_cuadro, tam_cuadro))
 
+    except Exception as e:
+        print(f"Error cargando {nombre}_{color}: {e}")
+        imagen = pygame.Surface((tam_cuadro, tam_cuadro))
+        imagen.fill((255, 0, 255))
+        return imagen
 
-class PiezaAnimada:
+
+class PiezaAnimada(Pieza):
     def __init__(self, nombre, color, fila, col, tam_cuadro):
-        self.nombre = nombre
-        self.color = color
-        self.fila = fila
-        self.col = col
+        super().__init__(nombre, color, fila, col)
         self.tam_cuadro = tam_cuadro
-        self.ha_movido = False
 
         # --- Posición visual para la animación ---
         self.x = col * tam_cuadro
@@ -21,8 +75,8 @@ class PiezaAnimada:
         self.imagen = None
         self.cargar_imagen()
 
-    def dibujar(self, pantalla):
-        """Calcula el movimiento fluido y dibuja la pieza una sola vez."""
+    def avanzar_animacion(self):
+        """Acerca la posición visual a la casilla; devuelve True si aún se mueve."""
         destino_x = self.col * self.tam_cuadro
         destino_y = self.fila * self.tam_cuadro
 
@@ -41,7 +95,10 @@ class PiezaAnimada:
             self.y = destino_y
         else:
             self.y += diff_y * self.velocidad_animacion
+        return self.x != destino_x or self.y != destino_y
 
+    def dibujar(self, pantalla):
+        """Dibuja la pieza donde esté ahora (la animación avanza en avanzar_animacion)."""
         if self.imagen:
             pantalla.blit(self.imagen, (self.x, self.y))
 
@@ -57,33 +114,5 @@ class PiezaAnimada:
         self.cargar_imagen()
 
     def cargar_imagen(self):
-        """Lógica de carga de imágenes con soporte PNG/JPG."""
-        try:
-            dir_clases = os.path.dirname(os.path.abspath(__file__))
-            ruta_raiz = os.path.dirname(dir_clases)
-            ruta_carpeta = os.path.join(ruta_raiz, "assets", "piezas_animadas")
-
-            nombre_base = f"{self.nombre}_{self.color}"
-            ruta_png = os.path.join(ruta_carpeta, f"{nombre_base}.png")
-            ruta_jpg = os.path.join(ruta_carpeta, f"{nombre_base}.jpg")
-
-            if os.path.exists(ruta_png):
-                ruta_final = ruta_png
-            elif os.path.exists(ruta_jpg):
-                ruta_final = ruta_jpg
-            else:
-                raise FileNotFoundError(f"No se encontró {nombre_base}")
-
-            imagen_temp = pygame.image.load(ruta_final).convert_alpha()
-
-            if ruta_final.endswith(".jpg"):
-                imagen_temp.set_colorkey((255, 255, 255))
-
-            self.imagen = pygame.transform.smoothscale(
-                imagen_temp, (self.tam_cuadro, self.tam_cuadro)
-            )
-
-        except Exception as e:
-            print(f"Error cargando {self.nombre}_{self.color}: {e}")
-            self.imagen = pygame.Surface((self.tam_cuadro, self.tam_cuadro))
-            self.imagen.fill((255, 0, 255))
+        """Toma la imagen de la caché de sprites compartida."""
+        self.imagen = obtener_sprite(self.nombre, self.color, self.tam_cuadro)
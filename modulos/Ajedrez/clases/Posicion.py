@@ -0,0 +1,279 @@
+from .Pieza import Pieza
+from .Movimiento import RegistroMovimiento
+from . import zobrist
+from .fen import FEN_INICIAL, colocar_fen
+
+# --- DESPLAZAMIENTOS PARA CONSULTAS DE ATAQUE SOBRE EL TABLERO ---
+DESPL_CABALLO = ((-2, -1), (-2, 1), (-1, -2), (-1, 2), (1, -2), (1, 2), (2, -1), (2, 1))
+DESPL_REY = ((-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1))
+DIR_RECTAS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+DIR_DIAGONALES = ((-1, -1), (-1, 1), (1, -1), (1, 1))
+
+
+class Posicion:
+    """Estado del tablero y reglas de bajo nivel, sin pygame.
+
+    Mantiene la lista de piezas y un tablero de 64 casillas (fila * 8 + col)
+    sincronizados, el turno, la clave Zobrist incremental y el historial de
+    claves. crear_pieza(nombre, color, fila, col) decide qué clase de pieza
+    se usa: Pieza en análisis y procesos de trabajo, PiezaAnimada en la UI.
+    """
+
+    def __init__(self, crear_pieza=Pieza):
+        self.crear_pieza = crear_pieza
+        self.piezas = []
+        self.casillas = [None] * 64
+        self.reyes = {}
+        self.turno = "blanco"
+        self.ultimo_movimiento = None
+
+        # Identidad de la posición: clave Zobrist incremental e historial de claves
+        self.clave = 0
+        self.derechos_enroque = 0
+        self.col_al_paso = zobrist.SIN_AL_PASO
+        self.reloj_medio = 0  # medias jugadas desde la última captura o avance de peón
+        self.numero_jugada = 1  # como en el FEN: sube tras cada jugada de las negras
+        self.historial_claves = []
+
+    @classmethod
+    def inicial(cls, crear_pieza=Pieza):
+        posicion = cls(crear_pieza)
+        orden = [
+            "torre",
+            "caballo",
+            "alfil",
+            "dama",
+            "rey",
+            "alfil",
+            "caballo",
+            "torre",
+        ]
+        for col, nombre in enumerate(orden):
+            posicion.piezas.append(crear_pieza(nombre, "negro", 0, col))
+            posicion.piezas.append(crear_pieza("peon", "negro", 1, col))
+            posicion.piezas.append(crear_pieza("peon", "blanco", 6, col))
+            posicion.piezas.append(crear_pieza(nombre, "blanco", 7, col))
+        posicion.reconstruir_casillas()
+        posicion.reiniciar_claves()
+        return posicion
+
+    @classmethod
+    def desde_fen(cls, fen=FEN_INICIAL, crear_pieza=Pieza):
+        posicion = cls(crear_pieza)
+        colocar_fen(posicion, fen, crear_pieza)
+        return posicion
+
+    # --- TABLERO INDEXADO (consultas de ocupación en O(1)) ---
+    def reconstruir_casillas(self):
+        """Vuelve a volcar self.piezas sobre el tablero de 64 casillas."""
+        self.casillas = [None] * 64
+        self.reyes = {}
+        for i, p in enumerate(self.piezas):
+            p.indice_lista = i
+            self.casillas[p.fila * 8 + p.col] = p
+            if p.nombre == "rey":
+                self.reyes[p.color] = p
+
+    def pieza_en(self, fila, col):
+        return self.casillas[fila * 8 + col]
+
+    def obtener_rey(self, color):
+        return self.reyes.get(color)
+
+    # --- CLAVES ZOBRIST Y REPETICIONES ---
+    def reiniciar_claves(self):
+        """Calcula la clave desde cero; a partir de aquí se mantiene incremental."""
+        self.derechos_enroque = zobrist.derechos_enroque(self.casillas)
+        self.col_al_paso = zobrist.columna_al_paso(
+            self.casillas, self.ultimo_movimiento
+        )
+        self.clave = zobrist.calcular_clave(
+            self.piezas, self.turno, self.derechos_enroque, self.col_al_paso
+        )
+        self.historial_claves = [self.clave]
+
+    def veces_repetida(self):
+        """Cuántas veces ha aparecido la posición actual (incluida esta)."""
+        claves = self.historial_claves
+        veces = 0
+        # Solo pueden repetirse posiciones con el mismo turno desde la
+        # última jugada irreversible
+        limite = max(len(claves) - 1 - self.reloj_medio, 0)
+        for i in range(len(claves) - 1, limite - 1, -2):
+            if claves[i] == self.clave:
+                veces += 1
+        return veces
+
+    # --- HACER / DESHACER (camino común para la UI, la legalidad y la búsqueda) ---
+    def hacer_movimiento(self, mov):
+        """Aplica un Movimiento sobre el tablero y devuelve su registro de deshacer."""
+        pieza = mov.pieza
+        casillas = self.casillas
+        capturada = mov.capturada
+        indice = -1
+        if capturada is not None:
+            # Se quita en O(1): la última pieza de la lista ocupa su hueco
+            piezas = self.piezas
+            indice = capturada.indice_lista
+            ultima = piezas.pop()
+            if ultima is not capturada:
+                piezas[indice] = ultima
+                ultima.indice_lista = indice
+            casillas[capturada.fila * 8 + capturada.col] = None
+
+        registro = RegistroMovimiento(
+            mov, indice, pieza.ha_movido, self.ultimo_movimiento
+        )
+        registro.clave_previa = self.clave
+        registro.derechos_previos = self.derechos_enroque
+        registro.col_al_paso_previa = self.col_al_paso
+        registro.reloj_medio_previo = self.reloj_medio
+
+        origen = mov.f_orig * 8 + mov.c_orig
+        destino = mov.f_dest * 8 + mov.c_dest
+        claves_pieza = zobrist.CLAVES_PIEZA
+        indice_pieza = zobrist.INDICE_PIEZA[(pieza.nombre, pieza.color)]
+        clave = self.clave ^ zobrist.CLAVE_TURNO ^ claves_pieza[indice_pieza][origen]
+        if capturada is not None:
+            clave ^= zobrist.clave_pieza(capturada, capturada.fila * 8 + capturada.col)
+
+        casillas[origen] = None
+        casillas[destino] = pieza
+        pieza.fila, pieza.col = mov.f_dest, mov.c_dest
+        pieza.ha_movido = True
+
+        if mov.es_enroque:
+            c_torre = 7 if mov.c_dest > mov.c_orig else 0
+            torre = casillas[mov.f_orig * 8 + c_torre]
+            registro.torre = torre
+            registro.c_torre_orig = c_torre
+            registro.ha_movido_torre_previo = torre.ha_movido
+            c_torre_dest = (mov.c_orig + mov.c_dest) // 2
+            casillas[mov.f_orig * 8 + c_torre] = None
+            casillas[mov.f_orig * 8 + c_torre_dest] = torre
+            torre.col = c_torre_dest
+            torre.ha_movido = True
+            clave ^= zobrist.clave_pieza(
+                torre, mov.f_orig * 8 + c_torre
+            ) ^ zobrist.clave_pieza(torre, mov.f_orig * 8 + c_torre_dest)
+
+        if mov.promocion:
+            pieza.nombre = mov.promocion
+            indice_pieza = zobrist.INDICE_PIEZA[(pieza.nombre, pieza.color)]
+        clave ^= claves_pieza[indice_pieza][destino]
+
+        if capturada is not None or registro.nombre_previo == "peon":
+            self.reloj_medio = 0
+        else:
+            self.reloj_medio += 1
+
+        self.ultimo_movimiento = (mov.f_orig, mov.c_orig, mov.f_dest, mov.c_dest)
+        if self.turno == "negro":
+            self.numero_jugada += 1
+        self.turno = "negro" if self.turno == "blanco" else "blanco"
+
+        derechos = zobrist.derechos_enroque(casillas)
+        col_al_paso = zobrist.columna_al_paso(casillas, self.ultimo_movimiento)
+        clave ^= zobrist.CLAVES_ENROQUE[self.derechos_enroque]
+        clave ^= zobrist.CLAVES_ENROQUE[derechos]
+        clave ^= zobrist.CLAVES_AL_PASO[self.col_al_paso]
+        clave ^= zobrist.CLAVES_AL_PASO[col_al_paso]
+        self.derechos_enroque = derechos
+        self.col_al_paso = col_al_paso
+        self.clave = clave
+        self.historial_claves.append(clave)
+        return registro
+
+    def deshacer(self, registro):
+        """Revierte exactamente lo hecho por hacer_movimiento."""
+        mov = registro.mov
+        pieza = mov.pieza
+        casillas = self.casillas
+
+        pieza.nombre = registro.nombre_previo
+        if registro.torre is not None:
+            torre = registro.torre
+            casillas[torre.fila * 8 + torre.col] = None
+            casillas[torre.fila * 8 + registro.c_torre_orig] = torre
+            torre.col = registro.c_torre_orig
+            torre.ha_movido = registro.ha_movido_torre_previo
+
+        casillas[mov.f_dest * 8 + mov.c_dest] = None
+        casillas[mov.f_orig * 8 + mov.c_orig] = pieza
+        pieza.fila, pieza.col = mov.f_orig, mov.c_orig
+        pieza.ha_movido = registro.ha_movido_previo
+
+        capturada = mov.capturada
+        if capturada is not None:
+            # Al revés que en hacer_movimiento: la que ocupó su hueco vuelve al final
+            piezas = self.piezas
+            indice = registro.indice_capturada
+            if indice < len(piezas):
+                ocupante = piezas[indice]
+                ocupante.indice_lista = len(piezas)
+                piezas.append(ocupante)
+                piezas[indice] = capturada
+            else:
+                piezas.append(capturada)
+            casillas[capturada.fila * 8 + capturada.col] = capturada
+
+        self.ultimo_movimiento = registro.ultimo_movimiento_previo
+        self.turno = "negro" if self.turno == "blanco" else "blanco"
+        if self.turno == "negro":
+            self.numero_jugada -= 1
+
+        self.historial_claves.pop()
+        self.clave = registro.clave_previa
+        self.derechos_enroque = registro.derechos_previos
+        self.col_al_paso = registro.col_al_paso_previa
+        self.reloj_medio = registro.reloj_medio_previo
+
+    # --- ATAQUES Y JAQUES ---
+    def esta_atacada(self, fila, col, color_defensor):
+        """Busca atacantes desde la casilla hacia afuera leyendo el tablero."""
+        color_enemigo = "negro" if color_defensor == "blanco" else "blanco"
+        casillas = self.casillas
+
+        # Peones: un peón negro ataca hacia abajo (fila + 1), uno blanco hacia arriba
+        f_peon = fila - 1 if color_enemigo == "negro" else fila + 1
+        if 0 <= f_peon <= 7:
+            for c in (col - 1, col + 1):
+                if 0 <= c <= 7:
+                    p = casillas[f_peon * 8 + c]
+                    if p and p.color == color_enemigo and p.nombre == "peon":
+                        return True
+
+        for despl, nombre in ((DESPL_CABALLO, "caballo"), (DESPL_REY, "rey")):
+            for df, dc in despl:
+                f, c = fila + df, col + dc
+                if 0 <= f <= 7 and 0 <= c <= 7:
+                    p = casillas[f * 8 + c]
+                    if p and p.color == color_enemigo and p.nombre == nombre:
+                        return True
+
+        for direcciones, tipos in (
+            (DIR_RECTAS, ("torre", "dama")),
+            (DIR_DIAGONALES, ("alfil", "dama")),
+        ):
+            for df, dc in direcciones:
+                f, c = fila + df, col + dc
+                while 0 <= f <= 7 and 0 <= c <= 7:
+                    p = casillas[f * 8 + c]
+                    if p:
+                        if p.color == color_enemigo and p.nombre in tipos:
+                            return True
+                        break
+                    f, c = f + df, c + dc
+        return False
+
+    def en_jaque(self, color=None):
+        color = color or self.turno
+        rey = self.reyes.get(color)
+        return rey is not None and self.esta_atacada(rey.fila, rey.col, color)
+
+    def deja_al_rey_en_jaque(self, mov):
+        color = mov.pieza.color
+        registro = self.hacer_movimiento(mov)
+        en_jaque = self.en_jaque(color)
+        self.deshacer(registro)
+        return en_jaque
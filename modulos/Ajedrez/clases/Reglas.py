@@ -0,0 +1,34 @@
+from . import generador
+
+
+class Reglas:
+    """Consultas de reglas de alto nivel sobre una Posicion (sin pygame)."""
+
+    @staticmethod
+    def movimientos_legales(posicion, pieza):
+        return generador.generar_legales(posicion, pieza)
+
+    @staticmethod
+    def todos_los_movimientos(posicion, color=None):
+        return generador.generar_todos_legales(posicion, color or posicion.turno)
+
+    @staticmethod
+    def hay_movimientos_legales(posicion, color=None):
+        return generador.hay_movimientos_legales(posicion, color or posicion.turno)
+
+    @staticmethod
+    def estado_final(posicion):
+        """Resultado de la partida tras la última jugada, o None si sigue.
+
+        Devuelve (resultado, en_jaque) para que la UI elija el sonido.
+        """
+        turno = posicion.turno
+        en_jaque = posicion.en_jaque(turno)
+        if not generador.hay_movimientos_legales(posicion, turno):
+            if en_jaque:
+                ganador = "Blancas" if turno == "negro" else "Negras"
+                return f"¡MATE! Ganan {ganador}", True
+            return "TABLAS (Ahogado)", False
+        if posicion.veces_repetida() >= 3:
+            return "TABLAS (Triple repetición)", en_jaque
+        return None, en_jaque
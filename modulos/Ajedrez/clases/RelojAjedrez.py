@@ -0,0 +1,143 @@
+import time
+
+NS = 1_000_000_000
+
+# Modos del tiempo extra por jugada
+FISCHER = "fischer"  # se suma el incremento tras cada jugada
+BRONSTEIN = "bronstein"  # se devuelve lo gastado, como mucho el retraso
+
+
+def _a_ns(segundos):
+    return int(round(segundos * NS))
+
+
+class MarcaReloj:
+    """Entrada del registro de tiempos: una jugada de un bando."""
+
+    __slots__ = ("color", "inicio", "fin", "gastado", "restante")
+
+    def __init__(self, color, inicio, fin, gastado, restante):
+        self.color = color
+        self.inicio = inicio  # ns monotónicos en que empezó a correr su reloj
+        self.fin = fin  # ns monotónicos de la jugada
+        self.gastado = gastado  # ns descontados (ya con el retraso devuelto)
+        self.restante = restante  # ns que le quedan tras la jugada y el incremento
+
+    def __repr__(self):
+        return f"MarcaReloj({self.color}, {self.gastado / NS:.3f}s, quedan {self.restante / NS:.3f}s)"
+
+
+class RelojAjedrez:
+    """Reloj de ajedrez por marcas de tiempo, sin depender de pygame.
+
+    No se le descuentan trozos de tiempo: cada jugada llega con el instante
+    (time.monotonic_ns) en que se hizo, y lo que queda se calcula restando
+    ese instante del momento en que empezó a correr el reloj del bando. Así
+    el resultado no depende de cada cuánto se dibuje ni de si el bucle se
+    quedó parado (en la ventana de promoción, en un fotograma largo...).
+    Quien dibuja solo lee restante(); el reloj avanza con pulsar().
+
+    Con incremento > 0 se suma tras cada jugada (Fischer); con retraso > 0
+    se devuelve lo gastado en la jugada hasta ese máximo (Bronstein).
+    """
+
+    def __init__(self, segundos, incremento=0.0, retraso=0.0, fuente=time.monotonic_ns):
+        self.tiempo_inicial = segundos
+        self.incremento = incremento
+        self.retraso = retraso
+        self._fuente = fuente
+        self._restante = {"blanco": _a_ns(segundos), "negro": _a_ns(segundos)}
+        self.turno = "blanco"
+        self._inicio_turno = None  # None: el reloj está parado
+        self.registro = []  # MarcaReloj de cada jugada
+
+    @property
+    def modo(self):
+        if self.retraso:
+            return BRONSTEIN
+        return FISCHER if self.incremento else None
+
+    @property
+    def iniciado(self):
+        return self._inicio_turno is not None
+
+    def ahora(self):
+        return self._fuente()
+
+    def restante_ns(self, color, ahora=None):
+        restante = self._restante[color]
+        if color == self.turno and self._inicio_turno is not None:
+            if ahora is None:
+                ahora = self._fuente()
+            restante -= ahora - self._inicio_turno
+        return max(0, restante)
+
+    def restante(self, color, ahora=None):
+        """Segundos que le quedan al bando en este instante."""
+        return self.restante_ns(color, ahora) / NS
+
+    @property
+    def tiempo_blanco(self):
+        return self.restante("blanco")
+
+    @property
+    def tiempo_negro(self):
+        return self.restante("negro")
+
+    def sin_tiempo(self, ahora=None):
+        """Color del bando al turno si ya se le acabó el tiempo, o None."""
+        if self._inicio_turno is None:
+            return None
+        return self.turno if self.restante_ns(self.turno, ahora) <= 0 else None
+
+    def pulsar(self, instante=None):
+        """El bando al turno ha jugado en `instante` (ns); pasa el reloj al rival.
+
+        La primera jugada no gasta tiempo: pone en marcha el reloj del
+        rival, como al empezar una partida. Devuelve la MarcaReloj de la
+        jugada, o None si al bando ya se le había acabado el tiempo (la
+        jugada llegó tarde y el reloj no cambia de bando).
+        """
+        if instante is None:
+            instante = self._fuente()
+        color = self.turno
+        inicio = instante if self._inicio_turno is None else self._inicio_turno
+        gastado = max(0, instante - inicio)
+        if gastado >= self._restante[color]:
+            self._restante[color] = 0
+            return None
+        if self.retraso:
+            gastado -= min(gastado, _a_ns(self.retraso))
+        restante = self._restante[color] - gastado + _a_ns(self.incremento)
+        self._restante[color] = restante
+        marca = MarcaReloj(color, inicio, instante, gastado, restante)
+        self.registro.append(marca)
+        self.turno = "negro" if color == "blanco" else "blanco"
+        self._inicio_turno = instante
+        return marca
+
+    def reanudar(self, instante=None):
+        """Vuelve a poner en marcha el reloj del bando al turno si estaba parado."""
+        if self._inicio_turno is None:
+            self._inicio_turno = self._fuente() if instante is None else instante
+
+    def detener(self, instante=None):
+        """Para el reloj (fin de partida) cargando lo gastado hasta `instante`."""
+        if self._inicio_turno is None:
+            return
+        if instante is None:
+            instante = self._fuente()
+        self._restante[self.turno] = self.restante_ns(self.turno, instante)
+        self._inicio_turno = None
+
+    def restaurar(self, tiempo_blanco, tiempo_negro, iniciado, turno="blanco", jugadas=None):
+        """Pone los tiempos dados (segundos) con `turno` al turno.
+
+        Si iniciado, el reloj del bando al turno arranca desde ya. jugadas
+        recorta el registro a ese número de entradas (al volver atrás).
+        """
+        self._restante = {"blanco": _a_ns(tiempo_blanco), "negro": _a_ns(tiempo_negro)}
+        self.turno = turno
+        self._inicio_turno = self._fuente() if iniciado else None
+        if jugadas is not None:
+            del self.registro[jugadas:]
@@ -0,0 +1,159 @@
+import multiprocessing
+import queue
+import time
+
+from . import generador
+from .fen import escribir_fen
+from .Motor import Motor, tiempo_para_jugada
+from .Posicion import Posicion
+from .TablaTransposicion import TablaTransposicion
+
+
+class ResultadoServicio:
+    """Respuesta del proceso de trabajo, ya traducida a Movimiento."""
+
+    __slots__ = ("jugada", "valor", "pv", "profundidad", "nodos", "segundos", "instante")
+
+    def __init__(self, jugada, valor, pv, profundidad, nodos, segundos, instante=None):
+        self.jugada = jugada
+        self.valor = valor
+        self.pv = pv  # jugadas en formato UCI
+        self.profundidad = profundidad
+        self.nodos = nodos
+        self.segundos = segundos
+        # time.monotonic_ns() al terminar la búsqueda, en el proceso de trabajo
+        # (el reloj monotónico es el mismo para todos los procesos)
+        self.instante = instante
+
+
+def _bucle_trabajador(pedidos, resultados, vigente, sondeo_finales):
+    """Proceso de trabajo: reconstruye cada posición y busca con su propio Motor.
+
+    vigente es el id de la única petición que sigue interesando; cualquier
+    otra se abandona en cuanto la búsqueda lo comprueba. La tabla de
+    transposición vive aquí y se conserva entre peticiones.
+    """
+    tabla = TablaTransposicion()
+    motores = {}
+    while True:
+        pedido = pedidos.get()
+        if pedido is None:
+            break
+        id_pedido, fen, claves, nivel, tiempo = pedido
+        if vigente.value != id_pedido:
+            continue
+
+        def debe_parar():
+            return vigente.value != id_pedido
+
+        posicion = Posicion.desde_fen(fen)
+        if claves and claves[-1] == posicion.clave:
+            posicion.historial_claves = list(claves)
+        motor = motores.get(nivel)
+        if motor is None:
+            motor = motores[nivel] = Motor(nivel, tabla, sondeo_finales)
+        resultado = motor.buscar(posicion, tiempo, debe_parar=debe_parar)
+        instante = time.monotonic_ns()
+        if debe_parar():
+            continue  # cancelada: nadie espera la respuesta
+        if resultado is None:
+            resultados.put((id_pedido, None, 0, (), 0, 0, 0.0, instante))
+            continue
+        resultados.put(
+            (
+                id_pedido,
+                resultado.jugada.uci,
+                resultado.valor,
+                tuple(m.uci for m in resultado.pv),
+                resultado.profundidad,
+                resultado.nodos,
+                resultado.segundos,
+                instante,
+            )
+        )
+
+
+class ServicioMotor:
+    """Motor en un proceso aparte para que el bucle de pygame nunca se bloquee.
+
+    pedir() envía la posición (FEN + historial de claves para las
+    repeticiones), sondear() recoge la respuesta sin esperar y cancelar()
+    corta la búsqueda en curso y descarta su resultado. Se usa el método
+    "spawn" en todas las plataformas: el proceso hijo no hereda el estado
+    de SDL, pero el programa principal debe protegerse con
+    ``if __name__ == "__main__"``. sondeo_finales, si se da, tiene que ser
+    una función de módulo para poder enviarla al proceso.
+    """
+
+    def __init__(self, nivel=3, sondeo_finales=None):
+        self.nivel = nivel
+        contexto = multiprocessing.get_context("spawn")
+        self._pedidos = contexto.Queue()
+        self._resultados = contexto.Queue()
+        self._vigente = contexto.Value("i", 0, lock=False)
+        self._proceso = contexto.Process(
+            target=_bucle_trabajador,
+            args=(self._pedidos, self._resultados, self._vigente, sondeo_finales),
+            daemon=True,
+        )
+        self._proceso.start()
+        self._ultimo_id = 0
+        self._pendiente = None  # (id, posicion) de la petición en curso
+
+    @property
+    def pensando(self):
+        return self._pendiente is not None
+
+    def tiempo_para_jugada(self, restante, incremento=0.0):
+        return tiempo_para_jugada(self.nivel, restante, incremento)
+
+    def pedir(self, posicion, tiempo):
+        """Encarga la búsqueda de la posición dada (se copia, no se comparte)."""
+        self._ultimo_id += 1
+        self._vigente.value = self._ultimo_id
+        self._pendiente = (self._ultimo_id, posicion)
+        self._pedidos.put(
+            (
+                self._ultimo_id,
+                escribir_fen(posicion),
+                list(posicion.historial_claves),
+                self.nivel,
+                tiempo,
+            )
+        )
+
+    def cancelar(self):
+        self._vigente.value = 0
+        self._pendiente = None
+
+    def sondear(self):
+        """Devuelve el ResultadoServicio de la petición en curso, o None si no está."""
+        while self._pendiente is not None:
+            try:
+                datos = self._resultados.get_nowait()
+            except queue.Empty:
+                return None
+            id_pedido, uci, valor, pv, profundidad, nodos, segundos, instante = datos
+            if id_pedido != self._pendiente[0]:
+                continue  # respuesta de una petición cancelada
+            posicion = self._pendiente[1]
+            self._pendiente = None
+            jugada = None
+            if uci is not None:
+                jugada = next(
+                    m
+                    for m in generador.generar_todos_legales(posicion, posicion.turno)
+                    if m.uci == uci
+                )
+            return ResultadoServicio(
+                jugada, valor, list(pv), profundidad, nodos, segundos, instante
+            )
+        return None
+
+    def cerrar(self):
+        self.cancelar()
+        if self._proceso.is_alive():
+            self._pedidos.put(None)
+            self._proceso.join(timeout=1.0)
+            if self._proceso.is_alive():
+                self._proceso.terminate()
@@ -0,0 +1,61 @@
+from array import array
+
+# Tipo de valor guardado en cada entrada
+EXACTO = 0
+COTA_INFERIOR = 1  # el valor real es >= al guardado (corte beta)
+COTA_SUPERIOR = 2  # el valor real es <= al guardado (no superó alfa)
+
+
+class TablaTransposicion:
+    """Tabla de transposición de tamaño fijo indexada por clave Zobrist.
+
+    Las entradas viven en arrays paralelos de tipos fijos, así que la memoria
+    queda acotada desde el principio (unos 18 bytes por entrada) sin importar
+    cuántas posiciones se analicen. Ante una colisión de índice se conserva
+    la entrada buscada a mayor profundidad.
+    """
+
+    def __init__(self, bits=18):
+        self.tamano = 1 << bits
+        self.mascara = self.tamano - 1
+        self.claves = array("Q", bytes(8 * self.tamano))
+        self.profundidades = array("b", [-1]) * self.tamano
+        self.valores = array("i", bytes(4 * self.tamano))
+        self.tipos = array("B", bytes(self.tamano))
+        self.jugadas = array("H", bytes(2 * self.tamano))
+        self.aciertos = 0
+        self.fallos = 0
+
+    def buscar(self, clave):
+        """Devuelve (profundidad, valor, tipo, jugada) o None si no está."""
+        i = clave & self.mascara
+        if self.profundidades[i] >= 0 and self.claves[i] == clave:
+            self.aciertos += 1
+            return (
+                self.profundidades[i],
+                self.valores[i],
+                self.tipos[i],
+                self.jugadas[i],
+            )
+        self.fallos += 1
+        return None
+
+    def guardar(self, clave, profundidad, valor, tipo, jugada=0):
+        """Guarda la entrada salvo que ocupe el hueco otra posición más profunda."""
+        i = clave & self.mascara
+        if self.claves[i] != clave and self.profundidades[i] > profundidad:
+            return
+        self.claves[i] = clave
+        self.profundidades[i] = profundidad
+        self.valores[i] = valor
+        self.tipos[i] = tipo
+        self.jugadas[i] = jugada
+
+    def limpiar(self):
+        self.profundidades = array("b", [-1]) * self.tamano
+        self.aciertos = 0
+        self.fallos = 0
+
+    def ocupacion(self):
+        """Fracción de entradas en uso (0.0 a 1.0)."""
+        return sum(1 for p in self.profundidades if p >= 0) / self.tamano
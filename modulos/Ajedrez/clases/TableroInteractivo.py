@@ -1,5 +1,37 @@
 import pygame
 
+from .CacheTextos import CacheTextos
+from .Flecha import Flecha
+
+# Color transparente de la capa de flechas (las flechas se pintan opacas)
+TRANSPARENTE = (255, 0, 255)
+
+# Caracteres de la tira de glifos de los relojes
+GLIFOS_RELOJ = "0123456789:"
+
+# Resaltados de una casilla, como bits de su firma
+MARCA_ULTIMO = 1
+MARCA_JAQUE = 2
+MARCA_SELECCION = 4
+MARCA_PUNTO = 8
+
+# Miniaturas de las piezas capturadas: lado, separación (x, y) y cuántas por fila
+TAM_MINIATURA = 20
+PASO_MINIATURA = (20, 25)
+MINIATURAS_POR_FILA = 12
+
+
+def _texto_reloj(tiempo):
+    minutos, segundos = int(tiempo // 60), int(tiempo % 60)
+    return f"{minutos:02d}:{segundos:02d}"
+
+
+def _firma_elemento(elemento):
+    """Lo que cambia el dibujo de una pieza o flecha dentro de una casilla."""
+    if isinstance(elemento, Flecha):
+        return (elemento.inicio, elemento.fin, elemento.color)
+    return (id(elemento.imagen), int(elemento.x), int(elemento.y))
+
 
 class TableroInteractivo:
     def __init__(self, tam_cuadro=75):
@@ -26,11 +58,211 @@ class TableroInteractivo:
         self.fuente_ui = pygame.font.SysFont("Segoe UI", 24, bold=True)
         self.fuente_reloj = pygame.font.SysFont("Consolas", 32, bold=True)
         self.fuente_pequena = pygame.font.SysFont("Segoe UI", 16)
+        self.fuente_coordenadas = pygame.font.SysFont("Segoe UI", 13, bold=True)
+        self.fuente_cartel = pygame.font.SysFont("Arial", 20, bold=True)
+        # Textos del panel ya renderizados (historial, libro, cartel...)
+        self.textos = CacheTextos()
 
         # Botón Deshacer posicionado estratégicamente
         self.rect_deshacer = pygame.Rect(
             self.ancho_tablero + 25, self.alto_total - 145, self.ancho_panel - 50, 40
         )
+        self._crear_regiones_panel()
+        # Superficies creadas por el renderizador (textos nuevos incluidos) y
+        # cuántas hizo falta crear en el último fotograma: con el tablero en
+        # marcha debería quedarse en 0
+        self.asignaciones = 0
+        self.asignaciones_fotograma = 0
+        self._crear_capas()
+
+        # Miniaturas por (nombre, color, lado) y, por cada fila de capturadas,
+        # (piezas, superficie) ya compuesta; no dependen de la paleta
+        self.miniaturas = {}
+        self.tiras_capturadas = {}
+
+        # Firmas del último fotograma dibujado (None: dibujar todo)
+        self._casillas_previas = None
+        self._panel_previo = None
+
+    # --- CAPAS PRE-DIBUJADAS ---
+    def _crear_capas(self):
+        """Dibuja una vez lo que no cambia entre fotogramas.
+
+        capa_tablero: casillas y coordenadas. capa_resaltados: la misma con
+        los resaltados encima; se repinta por casilla cuando cambian sus
+        resaltados. capa_flechas: las flechas sobre un color transparente,
+        rehecha solo cuando cambian. capa_panel: fondo del panel, caja del
+        historial y su título; relojes y botón tienen sus dos variantes ya
+        hechas. Dependen del tamaño de casilla y de la paleta, así que se
+        rehacen con cambiar_tema().
+        """
+        tam = self.tam_cuadro
+        tablero = self._superficie((self.ancho_tablero, self.ancho_tablero))
+        for fila in range(8):
+            for col in range(8):
+                color = self.COLOR_CLARO if (fila + col) % 2 == 0 else self.COLOR_OSCURO
+                tablero.fill(color, (col * tam, fila * tam, tam, tam))
+        # Coordenadas en el color de la casilla contraria, como en los tableros de club
+        for i in range(8):
+            color = self.COLOR_OSCURO if i % 2 == 0 else self.COLOR_CLARO
+            numero = self.fuente_coordenadas.render(str(8 - i), True, color)
+            tablero.blit(numero, (3, i * tam + 2))
+            color = self.COLOR_CLARO if i % 2 == 0 else self.COLOR_OSCURO
+            letra = self.fuente_coordenadas.render("abcdefgh"[i], True, color)
+            tablero.blit(
+                letra, ((i + 1) * tam - letra.get_width() - 3, 8 * tam - letra.get_height() - 1)
+            )
+        self.capa_tablero = tablero
+        self.capa_resaltados = tablero.copy()
+        self.asignaciones += 1
+        self._marcas_capa = [0] * 64
+
+        self.capa_flechas = self._superficie((self.ancho_tablero, self.ancho_tablero))
+        self.capa_flechas.fill(TRANSPARENTE)
+        self.capa_flechas.set_colorkey(TRANSPARENTE)
+        self._flechas_capa = ()
+
+        panel = self._superficie((self.ancho_panel, self.alto_total))
+        panel.fill(self.COLOR_PANEL_FONDO)
+        rect_hist = self.rect_historial.move(-self.ancho_tablero, 0)
+        pygame.draw.rect(panel, self.COLOR_PANEL_MOVIMIENTOS, rect_hist, border_radius=5)
+        titulo_hist = self.fuente_pequena.render(
+            "HISTORIAL DE JUEGO", True, self.COLOR_TEXTO_SECUNDARIO
+        )
+        panel.blit(titulo_hist, (rect_hist.x + 10, 160))
+        self.capa_panel = panel
+
+        self.cajas_reloj = {}
+        for es_turno in (False, True):
+            caja = self._superficie(self.rect_reloj_blanco.size)
+            caja.fill(self.COLOR_PANEL_FONDO)
+            color_fondo = (43, 41, 38) if not es_turno else (55, 53, 50)
+            pygame.draw.rect(caja, color_fondo, caja.get_rect(), border_radius=5)
+            if es_turno:
+                pygame.draw.rect(caja, self.COLOR_ACENTO, caja.get_rect(), 2, border_radius=5)
+            self.cajas_reloj[es_turno] = caja
+
+        self.botones_deshacer = {}
+        txt_btn = self.fuente_pequena.render("DESHACER", True, self.COLOR_TEXTO)
+        for hover in (False, True):
+            boton = self._superficie(self.rect_deshacer.size)
+            boton.fill(self.COLOR_PANEL_FONDO)
+            color_btn = (80, 78, 75) if hover else (60, 58, 55)
+            pygame.draw.rect(boton, color_btn, boton.get_rect(), border_radius=5)
+            boton.blit(
+                txt_btn,
+                (
+                    boton.get_width() // 2 - txt_btn.get_width() // 2,
+                    boton.get_height() // 2 - txt_btn.get_height() // 2,
+                ),
+            )
+            self.botones_deshacer[hover] = boton
+
+        # Tiras de glifos de los relojes: cada carácter en una celda fija,
+        # ya sobre el fondo de su caja, para cambiar solo los dígitos que
+        # cambian con un blit cada uno
+        self.ancho_glifo = max(self.fuente_reloj.size(c)[0] for c in GLIFOS_RELOJ)
+        alto = self.fuente_reloj.get_height()
+        self.tiras_reloj = {}
+        for es_turno in (False, True):
+            color_fondo = (43, 41, 38) if not es_turno else (55, 53, 50)
+            color_texto = self.COLOR_TEXTO if es_turno else self.COLOR_TEXTO_SECUNDARIO
+            tira = self._superficie((self.ancho_glifo * len(GLIFOS_RELOJ), alto))
+            tira.fill(color_fondo)
+            for i, c in enumerate(GLIFOS_RELOJ):
+                glifo = self.fuente_reloj.render(c, True, color_texto)
+                margen = (self.ancho_glifo - glifo.get_width()) // 2
+                tira.blit(glifo, (i * self.ancho_glifo + margen, 0))
+            self.tiras_reloj[es_turno] = tira
+        self.textos.vaciar()
+
+        # Resaltados tácticos: un sprite por tipo, para blitear sin crear nada
+        cuadro = (tam, tam)
+        ultimo = self._superficie(cuadro, pygame.SRCALPHA)
+        ultimo.fill((245, 246, 130, 150))
+        jaque = self._superficie(cuadro, pygame.SRCALPHA)
+        pygame.draw.rect(jaque, (255, 0, 0, 160), jaque.get_rect())
+        seleccion = self._superficie(cuadro, pygame.SRCALPHA)
+        seleccion.fill((129, 182, 76, 120))
+        punto = self._superficie(cuadro, pygame.SRCALPHA)
+        pygame.draw.circle(punto, (0, 0, 0, 35), (tam // 2, tam // 2), 12)
+        self.sprites_resaltado = {
+            MARCA_ULTIMO: ultimo,
+            MARCA_JAQUE: jaque,
+            MARCA_SELECCION: seleccion,
+            MARCA_PUNTO: punto,
+        }
+
+    def _superficie(self, tamano, flags=0):
+        """Crea una Surface del renderizador y la cuenta en self.asignaciones."""
+        self.asignaciones += 1
+        if flags & pygame.SRCALPHA:
+            return pygame.Surface(tamano, flags).convert_alpha()
+        return pygame.Surface(tamano, flags).convert()
+
+    def cambiar_tema(self, **colores):
+        """Cambia colores de la paleta (p. ej. COLOR_CLARO=...) y rehace las capas."""
+        for nombre, color in colores.items():
+            setattr(self, nombre, color)
+        self._crear_capas()
+        self.invalidar()
+
+    def _actualizar_capa_flechas(self, flechas):
+        firma = tuple(_firma_elemento(f) for f in flechas)
+        if firma == self._flechas_capa:
+            return
+        self.capa_flechas.fill(TRANSPARENTE)
+        for flecha in flechas:
+            flecha.dibujar(self.capa_flechas)
+        self._flechas_capa = firma
+
+    def _pintar_resaltados(self, indice, marcas):
+        """Rehace una casilla de capa_resaltados: fondo y resaltados tácticos."""
+        tam = self.tam_cuadro
+        fila, col = divmod(indice, 8)
+        rect = pygame.Rect(col * tam, fila * tam, tam, tam)
+        self.capa_resaltados.blit(self.capa_tablero, rect, rect)
+        if marcas & MARCA_ULTIMO:
+            self.resaltar_ultimo_movimiento(fila, col)
+        if marcas & MARCA_JAQUE:
+            self.dibujar_brillo_jaque(fila, col)
+        if marcas & MARCA_SELECCION:
+            self.resaltar_seleccionada(fila, col)
+        if marcas & MARCA_PUNTO:
+            self.dibujar_punto_legal(fila, col)
+        self._marcas_capa[indice] = marcas
+
+    # --- REGIONES DEL PANEL ---
+    def _crear_regiones_panel(self):
+        """Rectángulos del panel que se redibujan por separado.
+
+        Cada reloj y la fila de capturadas de arriba van solos; el centro
+        (historial, cartel de resultado, capturadas de abajo y botón) va
+        junto porque esos elementos se solapan.
+        """
+        x_panel = self.ancho_tablero + 20
+        ancho_cont = self.ancho_panel - 40
+        self.rect_reloj_negro = pygame.Rect(x_panel, 20, ancho_cont, 55)
+        self.rect_capturadas_negro = pygame.Rect(x_panel, 90, ancho_cont, 50)
+        self.rect_historial = pygame.Rect(x_panel, 150, ancho_cont, self.alto_total - 310)
+        self.rect_cartel = pygame.Rect(
+            self.ancho_tablero + 15,
+            self.alto_total // 2 + 100,
+            self.ancho_panel - 30,
+            50,
+        )
+        self.rect_capturadas_blanco = pygame.Rect(
+            x_panel, self.alto_total - 180, ancho_cont, 50
+        )
+        self.rect_reloj_blanco = pygame.Rect(x_panel, self.alto_total - 80, ancho_cont, 55)
+        self.rect_centro = self.rect_historial.unionall(
+            [self.rect_cartel, self.rect_capturadas_blanco, self.rect_deshacer]
+        )
+
+    def invalidar(self):
+        """El próximo fotograma se dibuja entero (ventana expuesta, diálogo encima...)."""
+        self._casillas_previas = None
+        self._panel_previo = None
 
     def dibujar_tablero(
         self,
@@ -46,166 +278,259 @@ class TableroInteractivo:
         t_blanco,
         t_negro,
         turno,
+        jugada_libro=None,
+        resultado=None,
     ):
-        """Método principal de renderizado."""
-
-        # 1. Limpiar fondo del panel lateral
-        pygame.draw.rect(
-            self.pantalla,
-            self.COLOR_PANEL_FONDO,
-            (self.ancho_tablero, 0, self.ancho_panel, self.alto_total),
-        )
-
-        # 2. Dibujar la cuadrícula del tablero
-        self.dibujar_cuadricula()
-
-        # 3. Resaltados tácticos (Debajo de las piezas)
+        """Método principal de renderizado: redibuja solo lo que cambió.
+
+        Cada casilla tiene una firma (resaltados, piezas que la pisan con su
+        posición en píxeles y flechas que la cruzan) y cada región del panel
+        la suya (texto del reloj, capturadas, historial...). Se comparan con
+        las del fotograma anterior y solo se repinta lo distinto. Devuelve
+        los rectángulos a pasar a pygame.display.update; vacía si no cambió
+        nada, que es lo normal con el tablero quieto.
+        """
+        asignaciones_previas = self.asignaciones + self.textos.fallos
+        sucios = []
+        completo = self._casillas_previas is None
+        if completo:
+            self.pantalla.blit(self.capa_panel, (self.ancho_tablero, 0))
+            sucios.append(self.pantalla.get_rect())
+        self._actualizar_capa_flechas(flechas)
+
+        # --- TABLERO ---
+        tam = self.tam_cuadro
+        marcas = [0] * 64
         if ultimo_movimiento:
-            self.resaltar_ultimo_movimiento(ultimo_movimiento)
+            marcas[ultimo_movimiento[0] * 8 + ultimo_movimiento[1]] |= MARCA_ULTIMO
+            marcas[ultimo_movimiento[2] * 8 + ultimo_movimiento[3]] |= MARCA_ULTIMO
         if rey_en_jaque:
-            self.dibujar_brillo_jaque(rey_en_jaque)
+            marcas[rey_en_jaque.fila * 8 + rey_en_jaque.col] |= MARCA_JAQUE
         if seleccionada:
-            self.resaltar_seleccionada(seleccionada)
-            self.dibujar_puntos_legales(movs_legales)
+            marcas[seleccionada.fila * 8 + seleccionada.col] |= MARCA_SELECCION
+            for f, c in movs_legales:
+                marcas[f * 8 + c] |= MARCA_PUNTO
 
-        # 4. Dibujar las piezas (con sus animaciones)
+        # Piezas y flechas que pisan cada casilla (una pieza en movimiento
+        # puede pisar hasta cuatro)
+        encima = [[] for _ in range(64)]
         for pieza in piezas:
-            pieza.dibujar(self.pantalla)
-
-        # 5. Elementos visuales temporales (flechas)
+            pieza.avanzar_animacion()
+            x, y = int(pieza.x), int(pieza.y)
+            for fila in range(max(y // tam, 0), min((y + tam - 1) // tam, 7) + 1):
+                for col in range(max(x // tam, 0), min((x + tam - 1) // tam, 7) + 1):
+                    encima[fila * 8 + col].append(pieza)
         for flecha in flechas:
-            flecha.dibujar(self.pantalla)
-
-        # 6. Interfaz de Usuario (Relojes, Historial, Capturadas)
-        self.dibujar_panel_lateral(
-            historial, capturadas_b, capturadas_n, t_blanco, t_negro, turno
+            rect = flecha.rect()
+            for fila in range(max(rect.top // tam, 0), min((rect.bottom - 1) // tam, 7) + 1):
+                for col in range(max(rect.left // tam, 0), min((rect.right - 1) // tam, 7) + 1):
+                    encima[fila * 8 + col].append(flecha)
+
+        firmas = [
+            (marcas[i], tuple(_firma_elemento(e) for e in encima[i])) for i in range(64)
+        ]
+        previas = self._casillas_previas
+        for i in range(64):
+            if completo or firmas[i] != previas[i]:
+                rect = self._dibujar_casilla(i, marcas[i], encima[i])
+                if not completo:
+                    sucios.append(rect)
+        self._casillas_previas = firmas
+
+        # --- PANEL LATERAL ---
+        hover = self.rect_deshacer.collidepoint(pygame.mouse.get_pos())
+        panel = {
+            "reloj_negro": (_texto_reloj(t_negro), turno == "negro"),
+            "capturadas_negro": tuple((p.nombre, p.color) for p in capturadas_n),
+            "centro": (
+                tuple(historial[-14:]),
+                jugada_libro,
+                resultado,
+                tuple((p.nombre, p.color) for p in capturadas_b),
+                hover,
+            ),
+            "reloj_blanco": (_texto_reloj(t_blanco), turno == "blanco"),
+        }
+        previo = self._panel_previo or {}
+        for region, estado in panel.items():
+            anterior = previo.get(region)
+            if not completo and anterior == estado:
+                continue
+            if (
+                not completo
+                and region.startswith("reloj")
+                and anterior[1] == estado[1]
+                and len(anterior[0]) == len(estado[0])
+            ):
+                # Solo pasó el tiempo: se cambian los dígitos distintos
+                rect = getattr(self, f"rect_{region}")
+                sucios.extend(self._cambiar_digitos(rect, anterior[0], estado[0], estado[1]))
+                continue
+            rect = getattr(self, f"rect_{region}")
+            self.pantalla.blit(self.capa_panel, rect, rect.move(-self.ancho_tablero, 0))
+            if region == "reloj_negro":
+                self.dibujar_reloj_estilizado(t_negro, rect.x, rect.y, turno == "negro")
+            elif region == "capturadas_negro":
+                self.dibujar_capturadas(capturadas_n, rect.x, rect.y)
+            elif region == "reloj_blanco":
+                self.dibujar_reloj_estilizado(t_blanco, rect.x, rect.y, turno == "blanco")
+            else:
+                self.dibujar_panel_lateral(historial, capturadas_b, jugada_libro, hover)
+                if resultado:
+                    self.dibujar_cartel_resultado(resultado)
+            if not completo:
+                sucios.append(rect)
+        self._panel_previo = panel
+        self.asignaciones_fotograma = (
+            self.asignaciones + self.textos.fallos - asignaciones_previas
         )
-
-    def dibujar_cuadricula(self):
-        for fila in range(8):
-            for col in range(8):
-                color = self.COLOR_CLARO if (fila + col) % 2 == 0 else self.COLOR_OSCURO
-                pygame.draw.rect(
-                    self.pantalla,
-                    color,
-                    (
-                        col * self.tam_cuadro,
-                        fila * self.tam_cuadro,
-                        self.tam_cuadro,
-                        self.tam_cuadro,
-                    ),
-                )
-
-    def dibujar_panel_lateral(self, historial, cap_b, cap_n, t_b, t_n, turno):
-        x_panel = self.ancho_tablero + 20
-        ancho_cont = self.ancho_panel - 40
-
-        # --- SECCIÓN SUPERIOR: Oponente (Negras) ---
-        self.dibujar_reloj_estilizado(t_n, x_panel, 20, turno == "negro")
-        # Capturadas por negras (piezas blancas perdidas)
-        self.dibujar_capturadas(cap_n, x_panel, 90)
+        return sucios
+
+    def _dibujar_casilla(self, indice, marcas, encima):
+        """Repinta una casilla: capa de resaltados, piezas y capa de flechas, recortado a ella."""
+        if marcas != self._marcas_capa[indice]:
+            self._pintar_resaltados(indice, marcas)
+        tam = self.tam_cuadro
+        fila, col = divmod(indice, 8)
+        rect = pygame.Rect(col * tam, fila * tam, tam, tam)
+        pantalla = self.pantalla
+        pantalla.set_clip(rect)
+        pantalla.blit(self.capa_resaltados, rect, rect)
+
+        # Piezas (con sus animaciones) y, encima, las flechas
+        hay_flechas = False
+        for elemento in encima:
+            if isinstance(elemento, Flecha):
+                hay_flechas = True
+            else:
+                elemento.dibujar(pantalla)
+        if hay_flechas:
+            pantalla.blit(self.capa_flechas, rect, rect)
+        pantalla.set_clip(None)
+        return rect
+
+    def dibujar_panel_lateral(self, historial, cap_b, jugada_libro=None, hover=False):
+        """Parte central del panel: historial, capturadas de las blancas y DESHACER."""
+        x_panel = self.rect_historial.x
 
         # --- SECCIÓN CENTRAL: Historial de movimientos ---
-        rect_hist = pygame.Rect(x_panel, 150, ancho_cont, self.alto_total - 310)
-        pygame.draw.rect(
-            self.pantalla, self.COLOR_PANEL_MOVIMIENTOS, rect_hist, border_radius=5
-        )
-
-        titulo_hist = self.fuente_pequena.render(
-            "HISTORIAL DE JUEGO", True, self.COLOR_TEXTO_SECUNDARIO
-        )
-        self.pantalla.blit(titulo_hist, (x_panel + 10, 160))
-
+        # (la caja y el título ya están en capa_panel)
+        rect_hist = self.rect_historial
         y_mov = 190
         for i, mov in enumerate(
             historial[-14:]
         ):  # Mostramos los últimos 14 movimientos
-            txt = self.fuente_pequena.render(f"{i+1}. {mov}", True, self.COLOR_TEXTO)
+            txt = self.textos.render(self.fuente_pequena, f"{i+1}. {mov}", self.COLOR_TEXTO)
             columna = 0 if i < 7 else 130
             self.pantalla.blit(txt, (x_panel + 15 + columna, y_mov + ((i % 7) * 25)))
 
+        # Sugerencia del libro de aperturas, al pie del historial
+        if jugada_libro:
+            txt_libro = self.textos.render(
+                self.fuente_pequena, f"Libro: {jugada_libro}", self.COLOR_ACENTO
+            )
+            self.pantalla.blit(txt_libro, (x_panel + 15, rect_hist.bottom - 30))
+
         # --- SECCIÓN INFERIOR: Jugador (Blancas) ---
         # Capturadas por blancas (piezas negras perdidas)
-        self.dibujar_capturadas(cap_b, x_panel, self.alto_total - 180)
-        self.dibujar_reloj_estilizado(
-            t_b, x_panel, self.alto_total - 80, turno == "blanco"
-        )
+        self.dibujar_capturadas(cap_b, x_panel, self.rect_capturadas_blanco.y)
 
         # --- BOTÓN DESHACER ---
-        color_btn = (60, 58, 55)
-        if self.rect_deshacer.collidepoint(pygame.mouse.get_pos()):
-            color_btn = (80, 78, 75)
+        self.pantalla.blit(self.botones_deshacer[hover], self.rect_deshacer)
 
-        pygame.draw.rect(self.pantalla, color_btn, self.rect_deshacer, border_radius=5)
-        txt_btn = self.fuente_pequena.render("DESHACER", True, self.COLOR_TEXTO)
-        self.pantalla.blit(
-            txt_btn,
-            (
-                self.rect_deshacer.centerx - txt_btn.get_width() // 2,
-                self.rect_deshacer.centery - txt_btn.get_height() // 2,
-            ),
-        )
+    def dibujar_cartel_resultado(self, resultado):
+        rect_fondo = self.rect_cartel
+        pygame.draw.rect(self.pantalla, (45, 45, 45), rect_fondo, border_radius=8)
+        pygame.draw.rect(self.pantalla, (212, 175, 55), rect_fondo, 2, border_radius=8)
+        texto = self.textos.render(self.fuente_cartel, resultado, (255, 215, 0))
+        text_rect = texto.get_rect(center=rect_fondo.center)
+        self.pantalla.blit(texto, text_rect)
 
     def dibujar_reloj_estilizado(self, tiempo, x, y, es_turno):
-        color_fondo = (43, 41, 38) if not es_turno else (55, 53, 50)
-        rect_reloj = pygame.Rect(x, y, self.ancho_panel - 40, 55)
-        pygame.draw.rect(self.pantalla, color_fondo, rect_reloj, border_radius=5)
+        self.pantalla.blit(self.cajas_reloj[es_turno], (x, y))
+        for i, c in enumerate(_texto_reloj(tiempo)):
+            self._dibujar_glifo(x, y, i, c, es_turno)
+
+    def _dibujar_glifo(self, x, y, posicion, caracter, es_turno):
+        ancho = self.ancho_glifo
+        tira = self.tiras_reloj[es_turno]
+        area = pygame.Rect(GLIFOS_RELOJ.index(caracter) * ancho, 0, ancho, tira.get_height())
+        return self.pantalla.blit(tira, (x + 15 + posicion * ancho, y + 8), area)
+
+    def _cambiar_digitos(self, rect, anterior, nuevo, es_turno):
+        """Reescribe solo los caracteres del reloj que cambiaron; devuelve sus rectángulos."""
+        return [
+            self._dibujar_glifo(rect.x, rect.y, i, c, es_turno)
+            for i, (a, c) in enumerate(zip(anterior, nuevo))
+            if a != c
+        ]
 
-        if es_turno:
-            pygame.draw.rect(
-                self.pantalla, self.COLOR_ACENTO, rect_reloj, 2, border_radius=5
+    def dibujar_capturadas(self, lista_capturadas, x, y):
+        """Dibuja las imágenes de las piezas capturadas escaladas.
+
+        La fila se compone una vez en una superficie transparente y solo
+        se rehace cuando cambia la lista (una captura o un deshacer); el
+        resto de fotogramas es un único blit.
+        """
+        firma = tuple((p.nombre, p.color) for p in lista_capturadas)
+        guardada = self.tiras_capturadas.get((x, y))
+        if guardada is None or guardada[0] != firma:
+            guardada = (firma, self._componer_capturadas(lista_capturadas))
+            self.tiras_capturadas[(x, y)] = guardada
+        self.pantalla.blit(guardada[1], (x, y))
+
+    def _componer_capturadas(self, lista_capturadas):
+        paso_x, paso_y = PASO_MINIATURA
+        filas = max(1, -(-len(lista_capturadas) // MINIATURAS_POR_FILA))
+        ancho = paso_x * (MINIATURAS_POR_FILA - 1) + TAM_MINIATURA
+        alto = paso_y * (filas - 1) + TAM_MINIATURA
+        tira = self._superficie((ancho, alto), pygame.SRCALPHA)
+        tira.fill((0, 0, 0, 0))
+        for i, pieza in enumerate(lista_capturadas):
+            if not getattr(pieza, "imagen", None):
+                continue
+            fila, col = divmod(i, MINIATURAS_POR_FILA)  # Caben más piezas por fila al ser más pequeñas
+            # Las miniaturas no se solapan: con MAX se copian tal cual sobre
+            # el fondo transparente, sin mezclarlas con él
+            tira.blit(
+                self._miniatura(pieza),
+                (col * paso_x, fila * paso_y),
+                special_flags=pygame.BLEND_RGBA_MAX,
             )
+        return tira
+
+    def _miniatura(self, pieza):
+        """Imagen de la pieza escalada a TAM_MINIATURA, creada una sola vez por tipo y color."""
+        clave = (pieza.nombre, pieza.color, TAM_MINIATURA)
+        mini = self.miniaturas.get(clave)
+        if mini is None:
+            mini = pygame.transform.smoothscale(
+                pieza.imagen, (TAM_MINIATURA, TAM_MINIATURA)
+            ).convert_alpha()
+            self.asignaciones += 1
+            self.miniaturas[clave] = mini
+        return mini
+
+    def dibujar_brillo_jaque(self, fila, col):
+        self.capa_resaltados.blit(
+            self.sprites_resaltado[MARCA_JAQUE], (col * self.tam_cuadro, fila * self.tam_cuadro)
+        )
 
-        minutos, segundos = int(tiempo // 60), int(tiempo % 60)
-        txt_tiempo = f"{minutos:02d}:{segundos:02d}"
-
-        color_texto = self.COLOR_TEXTO if es_turno else self.COLOR_TEXTO_SECUNDARIO
-        img_tiempo = self.fuente_reloj.render(txt_tiempo, True, color_texto)
-        self.pantalla.blit(img_tiempo, (x + 15, y + 8))
-
-    def dibujar_capturadas(self, lista_capturadas, x, y):
-        """Dibuja las imágenes de las piezas capturadas escaladas."""
-        espaciado_x = 20
-        mini_tam = 20
+    def resaltar_ultimo_movimiento(self, fila, col):
+        self.capa_resaltados.blit(
+            self.sprites_resaltado[MARCA_ULTIMO], (col * self.tam_cuadro, fila * self.tam_cuadro)
+        )
 
-        for i, pieza in enumerate(lista_capturadas):
-            fila = i // 12  # Caben más piezas por fila al ser más pequeñas
-            col = i % 12
-            pos_x = x + (col * espaciado_x)
-            pos_y = y + (fila * 25)
-
-            if hasattr(pieza, "imagen") and pieza.imagen:
-                # Escalamos la imagen original a miniatura
-                img_mini = pygame.transform.smoothscale(
-                    pieza.imagen, (mini_tam, mini_tam)
-                )
-                self.pantalla.blit(img_mini, (pos_x, pos_y))
-
-    def dibujar_brillo_jaque(self, rey):
-        s = pygame.Surface((self.tam_cuadro, self.tam_cuadro), pygame.SRCALPHA)
-        pygame.draw.rect(s, (255, 0, 0, 160), s.get_rect())
-        self.pantalla.blit(s, (rey.col * self.tam_cuadro, rey.fila * self.tam_cuadro))
-
-    def resaltar_ultimo_movimiento(self, mov):
-        s = pygame.Surface((self.tam_cuadro, self.tam_cuadro), pygame.SRCALPHA)
-        s.fill((245, 246, 130, 150))
-        self.pantalla.blit(s, (mov[1] * self.tam_cuadro, mov[0] * self.tam_cuadro))
-        self.pantalla.blit(s, (mov[3] * self.tam_cuadro, mov[2] * self.tam_cuadro))
-
-    def resaltar_seleccionada(self, pieza):
-        s = pygame.Surface((self.tam_cuadro, self.tam_cuadro), pygame.SRCALPHA)
-        s.fill((129, 182, 76, 120))
-        self.pantalla.blit(
-            s, (pieza.col * self.tam_cuadro, pieza.fila * self.tam_cuadro)
+    def resaltar_seleccionada(self, fila, col):
+        self.capa_resaltados.blit(
+            self.sprites_resaltado[MARCA_SELECCION],
+            (col * self.tam_cuadro, fila * self.tam_cuadro),
         )
 
-    def dibujar_puntos_legales(self, movimientos):
-        for f, c in movimientos:
-            s = pygame.Surface((self.tam_cuadro, self.tam_cuadro), pygame.SRCALPHA)
-            pygame.draw.circle(
-                s, (0, 0, 0, 35), (self.tam_cuadro // 2, self.tam_cuadro // 2), 12
-            )
-            self.pantalla.blit(s, (c * self.tam_cuadro, f * self.tam_cuadro))
+    def dibujar_punto_legal(self, fila, col):
+        self.capa_resaltados.blit(
+            self.sprites_resaltado[MARCA_PUNTO], (col * self.tam_cuadro, fila * self.tam_cuadro)
+        )
 
     def dibujar_ventana_promocion(self, color):
         centro_x = self.ancho_tablero // 2 - 150
@@ -216,12 +541,12 @@ class TableroInteractivo:
             self.pantalla, self.COLOR_ACENTO, rect_fondo, 2, border_radius=10
         )
 
-        opciones = ["reina", "torre", "alfil", "caballo"]
+        opciones = ["dama", "torre", "alfil", "caballo"]
         rects = []
         for i, pieza in enumerate(opciones):
             r = pygame.Rect(centro_x + 20 + (i * 70), centro_y + 20, 60, 60)
             pygame.draw.rect(self.pantalla, (65, 65, 65), r, border_radius=5)
-            txt = self.fuente_pequena.render(pieza[0].upper(), True, self.COLOR_TEXTO)
+            txt = self.textos.render(self.fuente_pequena, pieza[0].upper(), self.COLOR_TEXTO)
             self.pantalla.blit(
                 txt,
                 (r.centerx - txt.get_width() // 2, r.centery - txt.get_height() // 2),
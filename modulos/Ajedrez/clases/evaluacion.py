@@ -0,0 +1,214 @@
+"""Evaluación estática de una Posicion.
+
+Suma material, tablas pieza-casilla, una aproximación de la movilidad y la
+seguridad del rey (escudo de peones). evaluacion_lotes.py calcula lo mismo
+para muchas posiciones a la vez con NumPy; si se cambia un término aquí
+hay que cambiarlo también allí.
+
+Las tablas están escritas desde el punto de vista de las blancas con la
+fila 0 arriba (octava fila), igual que el tablero; para las negras se
+refleja la fila con ``casilla ^ 56``.
+"""
+
+from .generador import RAYOS_POR_PIEZA, SALTOS_CABALLO
+
+VALOR_PIEZA = {
+    "peon": 100,
+    "caballo": 320,
+    "alfil": 330,
+    "torre": 500,
+    "dama": 900,
+    "rey": 0,
+}
+
+# Peso de cada pieza en la fase de juego: 24 con todo el material, 0 en un final puro
+FASE_PIEZA = {"peon": 0, "caballo": 1, "alfil": 1, "torre": 2, "dama": 4, "rey": 0}
+FASE_MAXIMA = 24
+
+TABLAS_PIEZA = {
+    "peon": (
+        0, 0, 0, 0, 0, 0, 0, 0,
+        50, 50, 50, 50, 50, 50, 50, 50,
+        10, 10, 20, 30, 30, 20, 10, 10,
+        5, 5, 10, 25, 25, 10, 5, 5,
+        0, 0, 0, 20, 20, 0, 0, 0,
+        5, -5, -10, 0, 0, -10, -5, 5,
+        5, 10, 10, -20, -20, 10, 10, 5,
+        0, 0, 0, 0, 0, 0, 0, 0,
+    ),
+    "caballo": (
+        -50, -40, -30, -30, -30, -30, -40, -50,
+        -40, -20, 0, 0, 0, 0, -20, -40,
+        -30, 0, 10, 15, 15, 10, 0, -30,
+        -30, 5, 15, 20, 20, 15, 5, -30,
+        -30, 0, 15, 20, 20, 15, 0, -30,
+        -30, 5, 10, 15, 15, 10, 5, -30,
+        -40, -20, 0, 5, 5, 0, -20, -40,
+        -50, -40, -30, -30, -30, -30, -40, -50,
+    ),
+    "alfil": (
+        -20, -10, -10, -10, -10, -10, -10, -20,
+        -10, 0, 0, 0, 0, 0, 0, -10,
+        -10, 0, 5, 10, 10, 5, 0, -10,
+        -10, 5, 5, 10, 10, 5, 5, -10,
+        -10, 0, 10, 10, 10, 10, 0, -10,
+        -10, 10, 10, 10, 10, 10, 10, -10,
+        -10, 5, 0, 0, 0, 0, 5, -10,
+        -20, -10, -10, -10, -10, -10, -10, -20,
+    ),
+    "torre": (
+        0, 0, 0, 0, 0, 0, 0, 0,
+        5, 10, 10, 10, 10, 10, 10, 5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        0, 0, 0, 5, 5, 0, 0, 0,
+    ),
+    "dama": (
+        -20, -10, -10, -5, -5, -10, -10, -20,
+        -10, 0, 0, 0, 0, 0, 0, -10,
+        -10, 0, 5, 5, 5, 5, 0, -10,
+        -5, 0, 5, 5, 5, 5, 0, -5,
+        0, 0, 5, 5, 5, 5, 0, -5,
+        -10, 5, 5, 5, 5, 5, 0, -10,
+        -10, 0, 5, 0, 0, 0, 0, -10,
+        -20, -10, -10, -5, -5, -10, -10, -20,
+    ),
+    "rey": (
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -20, -30, -30, -40, -40, -30, -30, -20,
+        -10, -20, -20, -20, -20, -20, -20, -10,
+        20, 20, 0, 0, 0, 0, 20, 20,
+        20, 30, 10, 0, 0, 10, 30, 20,
+    ),
+}
+
+# En el final el rey debe centralizarse; se interpola con la tabla de medio juego
+TABLA_REY_FINAL = (
+    -50, -40, -30, -20, -20, -30, -40, -50,
+    -30, -20, -10, 0, 0, -10, -20, -30,
+    -30, -10, 20, 30, 30, 20, -10, -30,
+    -30, -10, 30, 40, 40, 30, -10, -30,
+    -30, -10, 30, 40, 40, 30, -10, -30,
+    -30, -10, 20, 30, 30, 20, -10, -30,
+    -30, -30, 0, 0, 0, 0, -30, -30,
+    -50, -30, -30, -30, -30, -30, -30, -50,
+)
+
+# Movilidad: (centipeones por casilla, casillas de una pieza "normal").
+# Se cuentan las casillas atacadas que no ocupa una pieza propia, sin mirar
+# clavadas ni jaques; restar la media deja el término cerca de 0.
+MOVILIDAD = {
+    "caballo": (4, 4),
+    "alfil": (5, 7),
+    "torre": (2, 7),
+    "dama": (1, 14),
+}
+
+# Escudo de peones del rey: valor de un peón propio en la fila de delante y
+# en la siguiente, en las tres columnas alrededor del rey. Pesa por la fase:
+# en el final el rey ya no necesita refugio.
+ESCUDO_PEON = (10, 5)
+
+
+def _tabla_escudo(avance):
+    """Por casilla del rey, pares (casilla, valor) de su escudo de peones."""
+    tabla = []
+    for casilla in range(64):
+        fila, col = divmod(casilla, 8)
+        escudo = []
+        for distancia, valor in enumerate(ESCUDO_PEON, start=1):
+            f = fila + avance * distancia
+            if not 0 <= f <= 7:
+                continue
+            for c in (col - 1, col, col + 1):
+                if 0 <= c <= 7:
+                    escudo.append((f * 8 + c, valor))
+        tabla.append(tuple(escudo))
+    return tuple(tabla)
+
+
+ESCUDO_REY = {"blanco": _tabla_escudo(-1), "negro": _tabla_escudo(1)}
+
+# Material + tabla ya sumados: color -> nombre -> 64 valores vistos desde las blancas
+VALOR_CASILLA = {"blanco": {}, "negro": {}}
+for _nombre, _tabla in TABLAS_PIEZA.items():
+    _blancas = tuple(VALOR_PIEZA[_nombre] + v for v in _tabla)
+    VALOR_CASILLA["blanco"][_nombre] = _blancas
+    VALOR_CASILLA["negro"][_nombre] = tuple(-_blancas[i ^ 56] for i in range(64))
+
+
+def fase(piezas):
+    """Fase de juego entre 0 (final) y FASE_MAXIMA (apertura)."""
+    total = 0
+    for p in piezas:
+        total += FASE_PIEZA[p.nombre]
+    return min(total, FASE_MAXIMA)
+
+
+def movilidad(posicion, pieza):
+    """Casillas que ataca la pieza y no ocupa una pieza de su color."""
+    casillas = posicion.casillas
+    color = pieza.color
+    origen = pieza.fila * 8 + pieza.col
+    total = 0
+    if pieza.nombre == "caballo":
+        for destino in SALTOS_CABALLO[origen]:
+            otra = casillas[destino]
+            if otra is None or otra.color != color:
+                total += 1
+        return total
+    for rayo in RAYOS_POR_PIEZA[pieza.nombre][origen]:
+        for destino in rayo:
+            otra = casillas[destino]
+            if otra is None:
+                total += 1
+                continue
+            if otra.color != color:
+                total += 1
+            break
+    return total
+
+
+def escudo_rey(posicion, rey):
+    """Valor del escudo de peones propios delante del rey."""
+    casillas = posicion.casillas
+    total = 0
+    for casilla, valor in ESCUDO_REY[rey.color][rey.fila * 8 + rey.col]:
+        p = casillas[casilla]
+        if p is not None and p.nombre == "peon" and p.color == rey.color:
+            total += valor
+    return total
+
+
+def evaluar(posicion):
+    """Puntuación en centipeones desde el punto de vista del bando al turno."""
+    valor = 0
+    total_fase = 0
+    for p in posicion.piezas:
+        nombre = p.nombre
+        valor += VALOR_CASILLA[p.color][nombre][p.fila * 8 + p.col]
+        total_fase += FASE_PIEZA[nombre]
+        if nombre in MOVILIDAD:
+            peso, media = MOVILIDAD[nombre]
+            extra = peso * (movilidad(posicion, p) - media)
+            valor += extra if p.color == "blanco" else -extra
+
+    # Rey: tabla interpolada entre medio juego y final y escudo de peones
+    f = min(total_fase, FASE_MAXIMA)
+    tabla_medio = TABLAS_PIEZA["rey"]
+    for rey in posicion.reyes.values():
+        casilla = rey.fila * 8 + rey.col
+        if rey.color == "negro":
+            casilla ^= 56
+        medio, final = tabla_medio[casilla], TABLA_REY_FINAL[casilla]
+        ajuste = (final - medio) * (FASE_MAXIMA - f) // FASE_MAXIMA
+        ajuste += escudo_rey(posicion, rey) * f // FASE_MAXIMA
+        valor += ajuste if rey.color == "blanco" else -ajuste
+
+    return valor if posicion.turno == "blanco" else -valor
@@ -0,0 +1,200 @@
+"""Evaluación por lotes con NumPy para análisis, ajuste y minería de problemas.
+
+Cada posición se codifica como 12 planos de 64 casillas (uno por color y
+tipo de pieza, en el orden de PLANOS) y todo el lote se evalúa con unas
+pocas operaciones sobre matrices. Los términos son exactamente los de
+evaluacion.evaluar, con la misma aritmética entera, así que el resultado
+coincide posición a posición con la evaluación del motor.
+
+Uso:
+    planos, turnos = codificar(posiciones)
+    valores = evaluar_lote(planos, turnos)
+"""
+
+import numpy as np
+
+from .evaluacion import (
+    ESCUDO_PEON,
+    ESCUDO_REY,
+    FASE_MAXIMA,
+    FASE_PIEZA,
+    MOVILIDAD,
+    TABLA_REY_FINAL,
+    TABLAS_PIEZA,
+    VALOR_CASILLA,
+)
+
+NOMBRES = ("peon", "caballo", "alfil", "torre", "dama", "rey")
+PLANOS = tuple((color, nombre) for color in ("blanco", "negro") for nombre in NOMBRES)
+PLANO = {clave: i for i, clave in enumerate(PLANOS)}
+_BASE_PLANO = {clave: i * 64 for clave, i in PLANO.items()}
+
+# Material + tabla pieza-casilla por plano, con signo (negras en negativo)
+PESOS_CASILLA = np.array(
+    [VALOR_CASILLA[color][nombre] for color, nombre in PLANOS], dtype=np.int64
+)
+# Copia en coma flotante para que el producto use BLAS; los valores son
+# enteros pequeños, así que la suma es exacta
+_PESOS_CASILLA_BLAS = PESOS_CASILLA.reshape(-1).astype(np.float32)
+PESOS_FASE = np.array([FASE_PIEZA[nombre] for _, nombre in PLANOS], dtype=np.int64)
+
+# Diferencia final - medio juego de la tabla del rey, ya reflejada para negras
+_REY_MEDIO = np.array(TABLAS_PIEZA["rey"], dtype=np.int64)
+_REY_FINAL = np.array(TABLA_REY_FINAL, dtype=np.int64)
+_REFLEJO = np.arange(64) ^ 56
+AJUSTE_REY = {
+    "blanco": _REY_FINAL - _REY_MEDIO,
+    "negro": (_REY_FINAL - _REY_MEDIO)[_REFLEJO],
+}
+
+def _mascara(casillas):
+    valor = 0
+    for casilla in casillas:
+        valor |= 1 << casilla
+    return valor
+
+
+# La movilidad y el escudo del rey se calculan con tableros de bits: un
+# uint64 por plano y posición, bit i = casilla i (fila * 8 + col).
+# ESCUDO[color][distancia] -> máscara del escudo por casilla del rey
+ESCUDO = {}
+for _color, _tabla in ESCUDO_REY.items():
+    ESCUDO[_color] = [
+        np.array(
+            [_mascara(c for c, v in _escudo if v == _valor) for _escudo in _tabla],
+            dtype=np.uint64,
+        )
+        for _valor in ESCUDO_PEON
+    ]
+
+DESPL_CABALLO = ((-2, -1), (-2, 1), (-1, -2), (-1, 2), (1, -2), (1, 2), (2, -1), (2, 1))
+DIRECCIONES_RECTAS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+DIRECCIONES_DIAGONALES = ((-1, -1), (-1, 1), (1, -1), (1, 1))
+
+
+def _desplazamiento(df, dc):
+    """(casillas que pueden dar el salto, desplazamiento en bits)."""
+    origenes = _mascara(
+        f * 8 + c
+        for f in range(8)
+        for c in range(8)
+        if 0 <= f + df <= 7 and 0 <= c + dc <= 7
+    )
+    return np.uint64(origenes), df * 8 + dc
+
+
+def _mover(tablero, salto):
+    """Desplaza todas las piezas del tablero de bits un mismo salto."""
+    origenes, delta = salto
+    tablero = tablero & origenes
+    if delta > 0:
+        return tablero << np.uint64(delta)
+    return tablero >> np.uint64(-delta)
+
+
+SALTOS = {
+    "caballo": tuple(_desplazamiento(df, dc) for df, dc in DESPL_CABALLO),
+    "rectas": tuple(_desplazamiento(df, dc) for df, dc in DIRECCIONES_RECTAS),
+    "diagonales": tuple(_desplazamiento(df, dc) for df, dc in DIRECCIONES_DIAGONALES),
+}
+RAYOS_PIEZA = {
+    "alfil": ("diagonales",),
+    "torre": ("rectas",),
+    "dama": ("rectas", "diagonales"),
+}
+
+
+def codificar(posiciones):
+    """Planos (N, 12, 64) uint8 y turnos (N,) int64 (+1 blancas, -1 negras)."""
+    posiciones = list(posiciones)
+    planos = np.zeros((len(posiciones), len(PLANOS), 64), dtype=np.uint8)
+    turnos = np.ones(len(posiciones), dtype=np.int64)
+    # Índices planos de cada pieza; se marcan todos de una vez al final
+    indices = []
+    base = 0
+    for i, posicion in enumerate(posiciones):
+        for p in posicion.piezas:
+            indices.append(base + _BASE_PLANO[p.color, p.nombre] + p.fila * 8 + p.col)
+        if posicion.turno == "negro":
+            turnos[i] = -1
+        base += len(PLANOS) * 64
+    planos.reshape(-1)[indices] = 1
+    return planos, turnos
+
+
+def tableros_bits(planos):
+    """Planos (N, 12, 64) -> tableros de bits (N, 12) uint64."""
+    planos = np.ascontiguousarray(planos, dtype=np.uint8)
+    bytes_ = np.packbits(planos, axis=2, bitorder="little")
+    return bytes_.view("<u8")[..., 0].astype(np.uint64)
+
+
+def _casillas_atacadas(piezas, vacias, libres, saltos, deslizante):
+    """Total de casillas libres atacadas por las piezas, sumando pieza a pieza.
+
+    Cada salto lleva cada pieza a una casilla distinta, así que contar bits
+    tras cada salto equivale a sumar las casillas de cada pieza. En los
+    rayos pasa lo mismo: el rayo de una pieza se corta en la siguiente
+    pieza de la misma línea, así que los rayos de una dirección no se solapan.
+    """
+    total = np.zeros(len(piezas), dtype=np.int64)
+    for salto in saltos:
+        frente = _mover(piezas, salto)
+        total += np.bitwise_count(frente & libres)
+        while deslizante:
+            frente = _mover(frente & vacias, salto)
+            if not frente.any():
+                break
+            total += np.bitwise_count(frente & libres)
+    return total
+
+
+def _movilidad(bits, vacias, color, desplazamiento):
+    """Suma de peso * (movilidad - media) de las piezas de un color, (N,)."""
+    propias = np.bitwise_or.reduce(bits[:, desplazamiento : desplazamiento + 6], axis=1)
+    libres = ~propias
+    total = np.zeros(len(bits), dtype=np.int64)
+    for nombre, (peso, media) in MOVILIDAD.items():
+        piezas = bits[:, PLANO[color, nombre]]
+        if nombre == "caballo":
+            casillas = _casillas_atacadas(piezas, vacias, libres, SALTOS["caballo"], False)
+        else:
+            casillas = sum(
+                _casillas_atacadas(piezas, vacias, libres, SALTOS[rayos], True)
+                for rayos in RAYOS_PIEZA[nombre]
+            )
+        total += peso * (casillas - media * np.bitwise_count(piezas).astype(np.int64))
+    return total
+
+
+def evaluar_lote(planos, turnos):
+    """Puntuaciones (N,) en centipeones para el bando al turno de cada posición."""
+    n = len(planos)
+    planos = np.asarray(planos, dtype=np.uint8)
+    bits = tableros_bits(planos)
+
+    planos_blas = planos.reshape(n, len(PLANOS) * 64).astype(np.float32)
+    valor = (planos_blas @ _PESOS_CASILLA_BLAS).astype(np.int64)
+    conteos = np.bitwise_count(bits).astype(np.int64)
+    f = np.minimum(conteos @ PESOS_FASE, FASE_MAXIMA)
+
+    vacias = ~np.bitwise_or.reduce(bits, axis=1)
+    valor += _movilidad(bits, vacias, "blanco", 0)
+    valor -= _movilidad(bits, vacias, "negro", 6)
+
+    for color, signo in (("blanco", 1), ("negro", -1)):
+        rey = planos[:, PLANO[color, "rey"]].argmax(axis=1)
+        ajuste = AJUSTE_REY[color][rey] * (FASE_MAXIMA - f) // FASE_MAXIMA
+        peones = bits[:, PLANO[color, "peon"]]
+        escudo = np.zeros(n, dtype=np.int64)
+        for mascaras, puntos in zip(ESCUDO[color], ESCUDO_PEON):
+            escudo += puntos * np.bitwise_count(mascaras[rey] & peones).astype(np.int64)
+        ajuste += escudo * f // FASE_MAXIMA
+        valor += signo * ajuste
+
+    return valor * np.asarray(turnos, dtype=np.int64)
+
+
+def evaluar_posiciones(posiciones):
+    """Atajo: codifica y evalúa una secuencia de Posicion."""
+    return evaluar_lote(*codificar(posiciones))
@@ -0,0 +1,154 @@
+"""Lectura y escritura de posiciones en notación FEN."""
+
+from . import zobrist
+
+FEN_INICIAL = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+
+NOMBRE_POR_LETRA = {
+    "p": "peon",
+    "n": "caballo",
+    "b": "alfil",
+    "r": "torre",
+    "q": "dama",
+    "k": "rey",
+}
+
+LETRA_POR_NOMBRE = {nombre: letra for letra, nombre in NOMBRE_POR_LETRA.items()}
+
+# (letra de enroque, fila, columna de la torre)
+_TORRES_ENROQUE = (("K", 7, 7), ("Q", 7, 0), ("k", 0, 7), ("q", 0, 0))
+
+
+def leer_fen(fen):
+    """Descompone un FEN.
+
+    Devuelve (piezas, turno, enroques, al_paso, reloj_medio, jugada) donde
+    piezas es una lista de (nombre, color, fila, col) y al_paso es la
+    casilla (fila, col) saltada por el último avance doble, o None.
+    """
+    campos = fen.split()
+    if len(campos) < 4:
+        raise ValueError(f"FEN inválido (faltan campos): {fen!r}")
+    filas = campos[0].split("/")
+    if len(filas) != 8:
+        raise ValueError(f"FEN inválido (se esperaban 8 filas): {fen!r}")
+
+    piezas = []
+    for fila, texto in enumerate(filas):
+        col = 0
+        for letra in texto:
+            if letra.isdigit():
+                col += int(letra)
+                continue
+            nombre = NOMBRE_POR_LETRA.get(letra.lower())
+            if nombre is None or col > 7:
+                raise ValueError(f"FEN inválido (fila {8 - fila}): {fen!r}")
+            color = "blanco" if letra.isupper() else "negro"
+            piezas.append((nombre, color, fila, col))
+            col += 1
+        if col != 8:
+            raise ValueError(f"FEN inválido (fila {8 - fila}): {fen!r}")
+
+    if campos[1] not in ("w", "b"):
+        raise ValueError(f"FEN inválido (turno): {fen!r}")
+    turno = "blanco" if campos[1] == "w" else "negro"
+
+    enroques = "" if campos[2] == "-" else campos[2]
+
+    al_paso = None
+    if campos[3] != "-":
+        casilla = campos[3]
+        if len(casilla) != 2 or casilla[0] not in "abcdefgh" or casilla[1] not in "36":
+            raise ValueError(f"FEN inválido (captura al paso): {fen!r}")
+        al_paso = (8 - int(casilla[1]), "abcdefgh".index(casilla[0]))
+
+    reloj_medio = int(campos[4]) if len(campos) > 4 else 0
+    jugada = int(campos[5]) if len(campos) > 5 else 1
+    return piezas, turno, enroques, al_paso, reloj_medio, jugada
+
+
+def colocar_fen(posicion, fen, crear_pieza):
+    """Sustituye el contenido de ``posicion`` por el del FEN.
+
+    crear_pieza(nombre, color, fila, col) fabrica cada pieza, de modo que la
+    misma función sirve para piezas con o sin imagen.
+    """
+    piezas, turno, enroques, al_paso, reloj_medio, jugada = leer_fen(fen)
+    posicion.piezas = [crear_pieza(*datos) for datos in piezas]
+
+    # Los derechos de enroque se expresan con los flags ha_movido de reyes y torres
+    for p in posicion.piezas:
+        p.ha_movido = p.nombre in ("rey", "torre")
+    for letra, fila, col in _TORRES_ENROQUE:
+        if letra not in enroques:
+            continue
+        color = "blanco" if letra.isupper() else "negro"
+        for p in posicion.piezas:
+            if p.color == color and (
+                (p.nombre == "torre" and p.fila == fila and p.col == col)
+                or (p.nombre == "rey" and p.fila == fila and p.col == 4)
+            ):
+                p.ha_movido = False
+
+    posicion.turno = turno
+    posicion.ultimo_movimiento = None
+    if al_paso is not None:
+        f_saltada, col = al_paso
+        direccion = 1 if f_saltada == 5 else -1  # peón blanco sube, negro baja
+        posicion.ultimo_movimiento = (
+            f_saltada + direccion,
+            col,
+            f_saltada - direccion,
+            col,
+        )
+    posicion.reloj_medio = reloj_medio
+    posicion.numero_jugada = jugada
+    posicion.reconstruir_casillas()
+    posicion.reiniciar_claves()
+    return jugada
+
+
+def escribir_fen(posicion, jugada=None):
+    """FEN de una Posicion (jugada: número de jugada; por defecto, el de la posición).
+
+    La casilla al paso solo se escribe si algún peón puede capturar, igual
+    que en la clave Zobrist, para que dos FEN iguales sean la misma posición.
+    """
+    filas = []
+    for fila in range(8):
+        texto, vacias = "", 0
+        for col in range(8):
+            p = posicion.casillas[fila * 8 + col]
+            if p is None:
+                vacias += 1
+                continue
+            if vacias:
+                texto += str(vacias)
+                vacias = 0
+            letra = LETRA_POR_NOMBRE[p.nombre]
+            texto += letra.upper() if p.color == "blanco" else letra
+        if vacias:
+            texto += str(vacias)
+        filas.append(texto)
+
+    derechos = posicion.derechos_enroque
+    bits = (
+        zobrist.ENROQUE_BLANCO_CORTO,
+        zobrist.ENROQUE_BLANCO_LARGO,
+        zobrist.ENROQUE_NEGRO_CORTO,
+        zobrist.ENROQUE_NEGRO_LARGO,
+    )
+    enroques = "".join(l for l, bit in zip("KQkq", bits) if derechos & bit) or "-"
+
+    al_paso = "-"
+    if posicion.col_al_paso != zobrist.SIN_AL_PASO:
+        f_orig, col, f_dest, _ = posicion.ultimo_movimiento
+        al_paso = f"{'abcdefgh'[col]}{8 - (f_orig + f_dest) // 2}"
+
+    if jugada is None:
+        jugada = posicion.numero_jugada
+    turno = "w" if posicion.turno == "blanco" else "b"
+    return (
+        f"{'/'.join(filas)} {turno} {enroques} {al_paso} "
+        f"{posicion.reloj_medio} {jugada}"
+    )
@@ -0,0 +1,273 @@
+"""Generador de movimientos pseudo-legales y legales por pieza.
+
+En lugar de probar las 64 casillas destino de cada pieza, se recorren solo
+los destinos alcanzables: tablas precalculadas para caballo y rey y rayos
+para torre, alfil y dama. Las casillas se indexan como fila * 8 + col,
+igual que ``Posicion.casillas``.
+"""
+
+from .Movimiento import Movimiento
+
+PIEZAS_PROMOCION = ("dama", "torre", "alfil", "caballo")
+
+
+def _tabla_saltos(desplazamientos):
+    tabla = []
+    for casilla in range(64):
+        fila, col = divmod(casilla, 8)
+        destinos = []
+        for df, dc in desplazamientos:
+            f, c = fila + df, col + dc
+            if 0 <= f <= 7 and 0 <= c <= 7:
+                destinos.append(f * 8 + c)
+        tabla.append(tuple(destinos))
+    return tuple(tabla)
+
+
+def _tabla_rayos(direcciones):
+    tabla = []
+    for casilla in range(64):
+        fila, col = divmod(casilla, 8)
+        rayos = []
+        for df, dc in direcciones:
+            rayo = []
+            f, c = fila + df, col + dc
+            while 0 <= f <= 7 and 0 <= c <= 7:
+                rayo.append(f * 8 + c)
+                f, c = f + df, c + dc
+            if rayo:
+                rayos.append(tuple(rayo))
+        tabla.append(tuple(rayos))
+    return tuple(tabla)
+
+
+SALTOS_CABALLO = _tabla_saltos(
+    ((-2, -1), (-2, 1), (-1, -2), (-1, 2), (1, -2), (1, 2), (2, -1), (2, 1))
+)
+SALTOS_REY = _tabla_saltos(
+    ((-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1))
+)
+RAYOS_RECTOS = _tabla_rayos(((-1, 0), (1, 0), (0, -1), (0, 1)))
+RAYOS_DIAGONALES = _tabla_rayos(((-1, -1), (-1, 1), (1, -1), (1, 1)))
+RAYOS_DAMA = tuple(RAYOS_RECTOS[i] + RAYOS_DIAGONALES[i] for i in range(64))
+
+RAYOS_POR_PIEZA = {
+    "torre": RAYOS_RECTOS,
+    "alfil": RAYOS_DIAGONALES,
+    "dama": RAYOS_DAMA,
+}
+
+
+def generar_pseudolegales(posicion, pieza):
+    """Movimientos de la pieza sin comprobar si dejan al propio rey en jaque."""
+    casillas = posicion.casillas
+    color = pieza.color
+    origen = pieza.fila * 8 + pieza.col
+    movimientos = []
+    nombre = pieza.nombre
+
+    if nombre == "peon":
+        _generar_peon(posicion, pieza, movimientos)
+    elif nombre == "caballo" or nombre == "rey":
+        tabla = SALTOS_CABALLO if nombre == "caballo" else SALTOS_REY
+        for destino in tabla[origen]:
+            ocupante = casillas[destino]
+            if ocupante is None:
+                movimientos.append(Movimiento(pieza, destino >> 3, destino & 7))
+            elif ocupante.color != color and ocupante.nombre != "rey":
+                movimientos.append(
+                    Movimiento(pieza, destino >> 3, destino & 7, capturada=ocupante)
+                )
+        if nombre == "rey":
+            _generar_enroques(posicion, pieza, movimientos)
+    else:
+        for rayo in RAYOS_POR_PIEZA[nombre][origen]:
+            for destino in rayo:
+                ocupante = casillas[destino]
+                if ocupante is None:
+                    movimientos.append(Movimiento(pieza, destino >> 3, destino & 7))
+                    continue
+                if ocupante.color != color and ocupante.nombre != "rey":
+                    movimientos.append(
+                        Movimiento(
+                            pieza, destino >> 3, destino & 7, capturada=ocupante
+                        )
+                    )
+                break
+    return movimientos
+
+
+def _generar_peon(posicion, pieza, movimientos):
+    casillas = posicion.casillas
+    fila, col = pieza.fila, pieza.col
+    direccion = -1 if pieza.color == "blanco" else 1
+    fila_inicial = 6 if pieza.color == "blanco" else 1
+    f_dest = fila + direccion
+    if not 0 <= f_dest <= 7:
+        return
+    promueve = f_dest in (0, 7)
+
+    def agregar(c_dest, capturada=None, es_al_paso=False):
+        if promueve:
+            for nombre in PIEZAS_PROMOCION:
+                movimientos.append(
+                    Movimiento(pieza, f_dest, c_dest, capturada, promocion=nombre)
+                )
+        else:
+            movimientos.append(
+                Movimiento(pieza, f_dest, c_dest, capturada, es_al_paso=es_al_paso)
+            )
+
+    # Avances
+    if casillas[f_dest * 8 + col] is None:
+        agregar(col)
+        if fila == fila_inicial and casillas[(fila + 2 * direccion) * 8 + col] is None:
+            movimientos.append(Movimiento(pieza, fila + 2 * direccion, col))
+
+    # Capturas diagonales
+    for c_dest in (col - 1, col + 1):
+        if 0 <= c_dest <= 7:
+            ocupante = casillas[f_dest * 8 + c_dest]
+            if (
+                ocupante is not None
+                and ocupante.color != pieza.color
+                and ocupante.nombre != "rey"
+            ):
+                agregar(c_dest, ocupante)
+
+    # Captura al paso: el último movimiento fue un avance doble de un peón vecino
+    if posicion.ultimo_movimiento:
+        uo, co, ud, cd = posicion.ultimo_movimiento
+        if abs(uo - ud) == 2 and ud == fila and abs(cd - col) == 1:
+            victima = casillas[ud * 8 + cd]
+            if (
+                victima is not None
+                and victima.nombre == "peon"
+                and victima.color != pieza.color
+                and casillas[f_dest * 8 + cd] is None
+            ):
+                agregar(cd, victima, es_al_paso=True)
+
+
+def _generar_enroques(posicion, rey, movimientos):
+    if rey.ha_movido:
+        return
+    casillas = posicion.casillas
+    fila, col = rey.fila, rey.col
+    if posicion.esta_atacada(fila, col, rey.color):
+        return
+    for c_torre, paso in ((7, 1), (0, -1)):
+        torre = casillas[fila * 8 + c_torre]
+        if (
+            torre is None
+            or torre.nombre != "torre"
+            or torre.color != rey.color
+            or torre.ha_movido
+        ):
+            continue
+        if any(
+            casillas[fila * 8 + c] is not None
+            for c in range(min(col, c_torre) + 1, max(col, c_torre))
+        ):
+            continue
+        if posicion.esta_atacada(
+            fila, col + paso, rey.color
+        ) or posicion.esta_atacada(fila, col + 2 * paso, rey.color):
+            continue
+        movimientos.append(Movimiento(rey, fila, col + 2 * paso, es_enroque=True))
+
+
+def generar_todas_pseudolegales(posicion, color):
+    movimientos = []
+    for pieza in posicion.piezas:
+        if pieza.color == color:
+            movimientos.extend(generar_pseudolegales(posicion, pieza))
+    return movimientos
+
+
+def generar_capturas(posicion, color):
+    """Capturas y promociones pseudo-legales (búsqueda de quietud)."""
+    casillas = posicion.casillas
+    movimientos = []
+    for pieza in posicion.piezas:
+        if pieza.color != color:
+            continue
+        nombre = pieza.nombre
+        if nombre == "peon":
+            todos = []
+            _generar_peon(posicion, pieza, todos)
+            movimientos.extend(
+                m for m in todos if m.capturada is not None or m.promocion
+            )
+            continue
+        origen = pieza.fila * 8 + pieza.col
+        if nombre == "caballo" or nombre == "rey":
+            tabla = SALTOS_CABALLO if nombre == "caballo" else SALTOS_REY
+            for destino in tabla[origen]:
+                ocupante = casillas[destino]
+                if (
+                    ocupante is not None
+                    and ocupante.color != color
+                    and ocupante.nombre != "rey"
+                ):
+                    movimientos.append(
+                        Movimiento(pieza, destino >> 3, destino & 7, capturada=ocupante)
+                    )
+            continue
+        for rayo in RAYOS_POR_PIEZA[nombre][origen]:
+            for destino in rayo:
+                ocupante = casillas[destino]
+                if ocupante is None:
+                    continue
+                if ocupante.color != color and ocupante.nombre != "rey":
+                    movimientos.append(
+                        Movimiento(
+                            pieza, destino >> 3, destino & 7, capturada=ocupante
+                        )
+                    )
+                break
+    return movimientos
+
+
+def generar_legales(posicion, pieza):
+    """Movimientos de la pieza que no dejan a su rey en jaque."""
+    return [
+        mov
+        for mov in generar_pseudolegales(posicion, pieza)
+        if not posicion.deja_al_rey_en_jaque(mov)
+    ]
+
+
+def generar_todos_legales(posicion, color):
+    movimientos = []
+    for pieza in list(posicion.piezas):
+        if pieza.color == color:
+            movimientos.extend(generar_legales(posicion, pieza))
+    return movimientos
+
+
+def jugada_uci(posicion, uci):
+    """Movimiento legal que corresponde a la jugada UCI (p. ej. "e7e8q"), o None."""
+    if len(uci) < 4:
+        return None
+    col_orig, fila_orig = "abcdefgh".find(uci[0]), "87654321".find(uci[1])
+    if col_orig < 0 or fila_orig < 0:
+        return None
+    pieza = posicion.casillas[fila_orig * 8 + col_orig]
+    if pieza is None or pieza.color != posicion.turno:
+        return None
+    for mov in generar_legales(posicion, pieza):
+        if mov.uci == uci:
+            return mov
+    return None
+
+
+def hay_movimientos_legales(posicion, color):
+    """Corta en cuanto encuentra una jugada legal (mate / ahogado)."""
+    for pieza in list(posicion.piezas):
+        if pieza.color != color:
+            continue
+        for mov in generar_pseudolegales(posicion, pieza):
+            if not posicion.deja_al_rey_en_jaque(mov):
+                return True
+    return False
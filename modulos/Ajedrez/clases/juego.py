@@ -1,10 +1,54 @@
 import pygame
-import copy
 import os
-from pygame.locals import QUIT, MOUSEBUTTONDOWN, MOUSEBUTTONUP
+import sqlite3
+import time
+from pygame.locals import (
+    QUIT,
+    MOUSEBUTTONDOWN,
+    MOUSEBUTTONUP,
+    KEYDOWN,
+    WINDOWEXPOSED,
+    K_s,
+    KMOD_CTRL,
+    K_LEFT,
+    K_RIGHT,
+    K_UP,
+    K_DOWN,
+    K_HOME,
+    K_END,
+    K_PAGEUP,
+    K_PAGEDOWN,
+)
 from .TableroInteractivo import TableroInteractivo
 from .PiezaAnimada import PiezaAnimada
 from .Flecha import Flecha
+from .ArbolVariantes import ArbolVariantes
+from .Movimiento import DeltaPartida
+from .Posicion import Posicion
+from . import generador
+from .Reglas import Reglas
+from .RelojAjedrez import RelojAjedrez
+from .ServicioMotor import ServicioMotor
+from .LibroAperturas import LibroAperturas
+from .ArchivoPartidas import ArchivoPartidas, PartidaArchivada
+from .pgn import escribir_pgn, escribir_san, leer_partidas, resolver_san
+from .fen import FEN_INICIAL, escribir_fen
+
+RUTA_PARTIDAS = os.path.normpath(
+    os.path.join(os.path.dirname(__file__), "..", "assets", "partidas")
+)
+
+# Resultado del PGN <-> texto del cartel de fin de partida
+TEXTO_RESULTADO_PGN = {
+    "1-0": "Ganan Blancas",
+    "0-1": "Ganan Negras",
+    "1/2-1/2": "TABLAS",
+}
+
+# --- FOTOGRAMAS POR SEGUNDO ---
+# Mientras algo cambia en pantalla y con todo quieto
+FPS_ACTIVO = 120
+FPS_REPOSO = 30
 
 # --- CONSTANTES DE COLORES PARA FLECHAS ---
 COLORES_FLECHAS = {
@@ -14,9 +58,24 @@ COLORES_FLECHAS = {
     "4": (255, 165, 0, 160),
 }
 
-
 class Juego:
-    def __init__(self, minutos=10):
+    """Vista/controlador de la partida: eventos, sonido y dibujo con pygame.
+
+    Las reglas viven en self.posicion (Posicion + Reglas, sin pygame).
+    Con nivel_ia (1-5) el bando color_ia lo juega el motor, que piensa en
+    otro proceso (ServicioMotor) mientras el bucle sigue dibujando.
+    """
+
+    def __init__(
+        self,
+        minutos=10,
+        nivel_ia=None,
+        color_ia="negro",
+        sondeo_finales=None,
+        archivar=True,
+        incremento=0.0,
+        retraso=0.0,
+    ):
         if not pygame.mixer.get_init():
             pygame.mixer.init()
 
@@ -27,24 +86,54 @@ class Juego:
 
         self.partida_activa = True
         self.reloj_fps = pygame.time.Clock()
-        self.piezas = []
+        self.posicion = Posicion.inicial(self.crear_pieza)
         self.flechas = []
         self.seleccionada = None
         self.movs_legales = []
-        self.turno = "blanco"
-        self.ultimo_movimiento = None
+        # Movimientos estructurados de la pieza seleccionada, por casilla destino
+        self.movimientos_seleccionada = {}
         self.resultado = None
 
-        self.tiempo_blanco = minutos * 60.0
-        self.tiempo_negro = minutos * 60.0
-        self.reloj_iniciado = False
-        self.ultima_actualizacion_tiempo = pygame.time.get_ticks()
+        # incremento: Fischer; retraso: Bronstein (segundos por jugada)
+        self.reloj = RelojAjedrez(minutos * 60.0, incremento, retraso)
 
-        self.historial = []  # Almacena todos los movimientos (pueden ser 200+)
+        self.historial = []  # Jugadas en notación española, para el panel
+        self.jugadas_san = []  # Las mismas en SAN inglés, para exportar a PGN
+        self.fen_inicial = None  # FEN de partida cargada que no empieza desde el inicio
         self.capturadas_blancas = []
         self.capturadas_negras = []
 
+        # Deltas por jugada para volver atrás con deshacer (ver guardar_estado).
+        # Empiezan en la media jugada ply_base: tras saltar a un punto de
+        # control del árbol, las anteriores ya no tienen registro.
         self.historial_estados = []
+        self.ply_base = 0
+        # Árbol de jugadas y variantes para navegar por la partida
+        self.arbol = ArbolVariantes(escribir_fen(self.posicion), self.posicion.clave)
+        self.revisando = False  # navegando por jugadas ya hechas: el motor espera
+
+        self.nivel_ia = nivel_ia
+        self.color_ia = color_ia
+        self.servicio_motor = None
+        if nivel_ia is not None:
+            self.servicio_motor = ServicioMotor(nivel_ia, sondeo_finales)
+
+        # Libro de aperturas opcional (ver construir_libro.py)
+        self.libro = LibroAperturas.abrir()
+        self.sugerencia_libro = None
+
+        # Archivo de partidas de la clase: cada partida terminada se encola
+        # y la escribe el hilo del archivo (ver archivar_partida)
+        self.archivo = None
+        if archivar:
+            try:
+                self.archivo = ArchivoPartidas()
+            except (OSError, sqlite3.Error) as e:
+                print(f"Sin archivo de partidas: {e}")
+        self.inicio_partida = time.time()
+        self.jugadas_cargadas = 0  # las de un PGN cargado ya están en su fichero
+        self.guardada = False  # guardada con Ctrl+S: se archiva aunque no haya terminado
+
         self.dibujando_flecha = False
         self.inicio_flecha = None
         self.color_flecha_actual = COLORES_FLECHAS["1"]
@@ -70,93 +159,256 @@ class Juego:
                 self.sonido_fin
             ) = None
 
-        self.crear_piezas_iniciales()
-        self.guardar_estado()
         pygame.display.set_caption(f"Ajedrez - Turno: {self.turno.upper()}")
+        self.actualizar_sugerencia_libro()
+
+    @classmethod
+    def desde_fen(cls, fen, **opciones):
+        """Partida que empieza en la posición del FEN (opciones: las de __init__)."""
+        juego = cls(**opciones)
+        juego.colocar_fen(fen)
+        return juego
+
+    def colocar_fen(self, fen):
+        """Pone la posición del FEN sin rehacer la ventana ni recargar imágenes.
+
+        Las piezas se crean con crear_pieza, que toma los sprites de la caché
+        compartida, así que montar una posición cuesta lo mismo que crear
+        32 objetos. Lanza ValueError si el FEN no es válido.
+        """
+        posicion = Posicion.desde_fen(fen, self.crear_pieza)
+        self.reiniciar(posicion)
+        fen = escribir_fen(posicion)
+        if fen != FEN_INICIAL:
+            self.fen_inicial = fen
+
+    def a_fen(self):
+        """FEN de la posición actual, con enroques, al paso y contadores."""
+        return escribir_fen(self.posicion)
+
+    def crear_pieza(self, nombre, color, fila, col):
+        return PiezaAnimada(nombre, color, fila, col, self.tablero.tam_cuadro)
+
+    # --- ACCESOS DE LECTURA A LA POSICIÓN Y AL RELOJ ---
+    @property
+    def piezas(self):
+        return self.posicion.piezas
+
+    @property
+    def turno(self):
+        return self.posicion.turno
+
+    @property
+    def ultimo_movimiento(self):
+        return self.posicion.ultimo_movimiento
+
+    @property
+    def tiempo_blanco(self):
+        return self.reloj.tiempo_blanco
+
+    @property
+    def tiempo_negro(self):
+        return self.reloj.tiempo_negro
+
+    def guardar_estado(self, registro, imagen_previa=None):
+        """Apila el delta de la última jugada (sin copiar piezas ni imágenes)."""
+        self.historial_estados.append(
+            DeltaPartida(
+                registro,
+                imagen_previa,
+                self.tiempo_blanco,
+                self.tiempo_negro,
+                self.resultado,
+            )
+        )
 
-    def obtener_notacion_corta(self, f_orig, c_orig, f_dest, c_dest, pieza, es_captura):
-        """Convierte a notación corta en español: Inicial + destino (ej: Ce4, Dxf7)"""
-        letras = "abcdefgh"
-        iniciales = {
-            "rey": "R",
-            "dama": "D",
-            "torre": "T",
-            "alfil": "A",
-            "caballo": "C",
-            "peon": "",
-        }
+    def deshacer_movimiento(self):
+        """Vuelve a la jugada anterior; la deshecha queda en el árbol como variante."""
+        self.ir_a(self.arbol.actual.padre)
 
-        prefijo = iniciales.get(pieza.nombre, "")
-
-        # Si es captura de peón, la notación empieza con la columna de origen (ej: exd5)
-        if pieza.nombre == "peon" and es_captura:
-            prefijo = letras[c_orig]
-
-        conector = "x" if es_captura else ""
-        destino = f"{letras[c_dest]}{8-f_dest}"
-
-        # Caso especial: Enroques (opcional, pero mejora la notación)
-        if pieza.nombre == "rey" and abs(c_dest - c_orig) == 2:
-            return "O-O" if c_dest > c_orig else "O-O-O"
-
-        return f"{prefijo}{conector}{destino}"
-
-    def guardar_estado(self):
-        estado = {
-            "piezas": copy.deepcopy(self.piezas),
-            "turno": self.turno,
-            "ultimo_movimiento": self.ultimo_movimiento,
-            "historial_txt": list(self.historial),
-            "cap_b": list(self.capturadas_blancas),
-            "cap_n": list(self.capturadas_negras),
-            "t_blanco": self.tiempo_blanco,
-            "t_negro": self.tiempo_negro,
-            "reloj_iniciado": self.reloj_iniciado,
-            "resultado": self.resultado,
-        }
-        self.historial_estados.append(estado)
+    # --- NAVEGACIÓN POR EL ÁRBOL DE VARIANTES ---
+    def _aplicar(self, mov, san=None, san_es=None):
+        """Hace la jugada en la posición y en las listas del panel, sin sonidos ni reglas."""
+        pieza = mov.pieza
+        self.historial.append(san_es or escribir_san(self.posicion, mov, "es"))
+        self.jugadas_san.append(san or escribir_san(self.posicion, mov))
+
+        registro = self.posicion.hacer_movimiento(mov)
+
+        tam = self.tablero.tam_cuadro
+        pieza.x, pieza.y = pieza.col * tam, pieza.fila * tam
+        if registro.torre is not None:
+            registro.torre.x = registro.torre.col * tam
+        imagen_previa = None
+        if mov.promocion:
+            imagen_previa = pieza.imagen
+            pieza.cargar_imagen()
+
+        if mov.capturada is not None:
+            if mov.capturada.color == "blanco":
+                self.capturadas_negras.append(mov.capturada)
+            else:
+                self.capturadas_blancas.append(mov.capturada)
+        return registro, imagen_previa
+
+    def _retroceder(self):
+        """Deshace la última jugada de historial_estados en la posición y el panel."""
+        delta = self.historial_estados.pop()
+        registro = delta.registro
+        mov = registro.mov
+        self.posicion.deshacer(registro)
+
+        self.historial.pop()
+        self.jugadas_san.pop()
+        if mov.capturada is not None:
+            if mov.capturada.color == "blanco":
+                self.capturadas_negras.pop()
+            else:
+                self.capturadas_blancas.pop()
+        if delta.imagen_previa is not None:
+            mov.pieza.imagen = delta.imagen_previa
 
-    def deshacer_movimiento(self):
-        if len(self.historial_estados) > 1:
-            self.historial_estados.pop()
-            previo = self.historial_estados[-1]
-            self.piezas = copy.deepcopy(previo["piezas"])
-            self.turno = previo["turno"]
-            self.ultimo_movimiento = previo["ultimo_movimiento"]
-            self.historial = list(previo["historial_txt"])
-            self.capturadas_blancas = list(previo["cap_b"])
-            self.capturadas_negras = list(previo["cap_n"])
-            self.tiempo_blanco = previo["t_blanco"]
-            self.tiempo_negro = previo["t_negro"]
-            self.reloj_iniciado = previo.get("reloj_iniciado", False)
-            self.resultado = previo.get("resultado", None)
-            for p in self.piezas:
-                p.x, p.y = (
-                    p.col * self.tablero.tam_cuadro,
-                    p.fila * self.tablero.tam_cuadro,
-                )
-            self.seleccionada = None
-            self.movs_legales = []
-            self.flechas = []
-            pygame.display.set_caption(f"Ajedrez - Turno: {self.turno.upper()}")
-
-    def crear_piezas_iniciales(self):
         tam = self.tablero.tam_cuadro
-        orden = [
-            "torre",
-            "caballo",
-            "alfil",
-            "dama",
-            "rey",
-            "alfil",
-            "caballo",
-            "torre",
-        ]
-        for col, nombre in enumerate(orden):
-            self.piezas.append(PiezaAnimada(nombre, "negro", 0, col, tam))
-            self.piezas.append(PiezaAnimada("peon", "negro", 1, col, tam))
-            self.piezas.append(PiezaAnimada("peon", "blanco", 6, col, tam))
-            self.piezas.append(PiezaAnimada(nombre, "blanco", 7, col, tam))
+        for p in (mov.pieza, mov.capturada, registro.torre):
+            if p is not None:
+                p.x, p.y = p.col * tam, p.fila * tam
+
+    def _montar_control(self, control):
+        """Pone en el tablero la posición guardada en el nodo de control."""
+        camino = self.arbol.camino(control)
+        posicion = Posicion.desde_fen(control.fen, self.crear_pieza)
+        # Las repeticiones se cuentan con las claves de toda la partida
+        posicion.historial_claves = [n.clave for n in camino]
+        if control.uci:
+            u = control.uci
+            posicion.ultimo_movimiento = (
+                "87654321".index(u[1]),
+                "abcdefgh".index(u[0]),
+                "87654321".index(u[3]),
+                "abcdefgh".index(u[2]),
+            )
+        self.posicion = posicion
+        jugadas = camino[1:]
+        self.historial = [n.san_es for n in jugadas]
+        self.jugadas_san = [n.san for n in jugadas]
+        self.capturadas_blancas, self.capturadas_negras = [], []
+        for n in jugadas:
+            if n.capturada is not None:
+                nombre, color = n.capturada
+                pieza = self.crear_pieza(nombre, color, 0, 0)
+                if color == "blanco":
+                    self.capturadas_negras.append(pieza)
+                else:
+                    self.capturadas_blancas.append(pieza)
+        self.historial_estados = []
+        self.ply_base = control.ply
+
+    def ir_a(self, nodo):
+        """Pone en el tablero la posición del nodo del árbol.
+
+        El árbol decide el camino más barato: deshacer hasta el antecesor
+        común y rehacer desde ahí, o montar el punto de control anterior al
+        destino y rehacer como mucho INTERVALO_CONTROL jugadas. Saltar a
+        cualquier media jugada cuesta así un número acotado de jugadas.
+        """
+        if nodo is None or nodo is self.arbol.actual:
+            return
+        if self.servicio_motor is not None:
+            self.servicio_motor.cancelar()
+        control, subidas, bajadas = self.arbol.plan(nodo, self.ply_base)
+        if control is None:
+            for _ in range(subidas):
+                self._retroceder()
+        else:
+            self._montar_control(control)
+        for n in bajadas:
+            mov = generador.jugada_uci(self.posicion, n.uci)
+            registro, imagen_previa = self._aplicar(mov, n.san, n.san_es)
+            self.historial_estados.append(
+                DeltaPartida(registro, imagen_previa, n.t_blanco, n.t_negro, n.resultado)
+            )
+            n.padre.elegido = n
+        self.arbol.actual = nodo
+
+        # Relojes y resultado tal como quedaron tras esa jugada. Con jugadas
+        # por delante se está repasando: el reloj queda parado hasta que se
+        # siga jugando (al llegar al final de la línea, con una jugada nueva
+        # o con DESHACER)
+        self.resultado = nodo.resultado
+        if nodo.padre is not None:
+            self.reloj.restaurar(
+                nodo.t_blanco,
+                nodo.t_negro,
+                not self.resultado and not nodo.hijos,
+                self.turno,
+                nodo.ply,
+            )
+        else:
+            inicial = self.reloj.tiempo_inicial
+            self.reloj.restaurar(inicial, inicial, False, self.turno, 0)
+
+        self.seleccionada = None
+        self.movs_legales = []
+        self.movimientos_seleccionada = {}
+        self.flechas = []
+        pygame.display.set_caption(f"Ajedrez - Turno: {self.turno.upper()}")
+        self.actualizar_sugerencia_libro()
+
+    def navegar(self, tecla):
+        """Flechas: jugada anterior/siguiente y variantes; Inicio/Fin; RePág/AvPág de 10 en 10."""
+        arbol = self.arbol
+        actual = arbol.actual
+        destino = {
+            K_LEFT: lambda: actual.padre,
+            K_RIGHT: actual.siguiente,
+            K_UP: lambda: arbol.hermano(-1),
+            K_DOWN: lambda: arbol.hermano(1),
+            K_HOME: lambda: arbol.raiz,
+            K_END: arbol.fin_de_linea,
+            K_PAGEUP: lambda: arbol.nodo_en_ply(actual.ply - 10),
+            K_PAGEDOWN: lambda: arbol.nodo_en_ply(actual.ply + 10),
+        }[tecla]()
+        if destino is None:
+            return
+        self.ir_a(destino)
+        # En mitad de la línea el motor no juega; al llegar al final, sigue
+        self.revisando = bool(destino.hijos)
+
+    def actualizar_sugerencia_libro(self):
+        """Texto de la jugada de libro para el panel; se calcula una vez por jugada."""
+        self.sugerencia_libro = None
+        if self.libro is None or self.resultado:
+            return
+        mov = self.libro.mejor_jugada(self.posicion)
+        if mov is not None:
+            self.sugerencia_libro = escribir_san(self.posicion, mov, "es")
+
+    def es_turno_ia(self):
+        return (
+            self.servicio_motor is not None
+            and self.turno == self.color_ia
+            and not self.resultado
+            and self.partida_activa
+            and not self.revisando
+        )
+
+    def atender_ia(self):
+        """Pide la jugada al motor o recoge su respuesta, sin esperar nunca."""
+        servicio = self.servicio_motor
+        if not servicio.pensando:
+            if self.libro is not None:
+                jugada = self.libro.elegir(self.posicion)
+                if jugada is not None:
+                    self.jugar_movimiento(jugada)
+                    return
+            tiempo = servicio.tiempo_para_jugada(
+                self.reloj.restante(self.color_ia), self.reloj.incremento
+            )
+            servicio.pedir(self.posicion, tiempo)
+            return
+        resultado = servicio.sondear()
+        if resultado is not None and resultado.jugada is not None:
+            self.jugar_movimiento(resultado.jugada, resultado.instante)
 
     def reproducir_sonido(self, tipo):
         sonidos = {
@@ -168,185 +420,205 @@ class Juego:
         if tipo in sonidos and sonidos[tipo]:
             sonidos[tipo].play()
 
-    def obtener_rey(self, color):
-        return next(
-            (p for p in self.piezas if p.nombre == "rey" and p.color == color), None
-        )
+    def jugar_movimiento(self, mov, instante=None):
+        """Jugada de la partida: aplica las reglas y actualiza historial, sonido y final.
 
-    def esta_atacada(self, fila, col, color_defensor):
-        color_enemigo = "negro" if color_defensor == "blanco" else "blanco"
-        for p in self.piezas:
-            if p.color != color_enemigo:
-                continue
-            df, dc = fila - p.fila, col - p.col
-            if p.nombre == "peon":
-                dir_p = 1 if p.color == "negro" else -1
-                if df == dir_p and abs(dc) == 1:
-                    return True
-            elif p.nombre == "caballo":
-                if abs(df) * abs(dc) == 2:
-                    return True
-            elif p.nombre == "rey":
-                if abs(df) <= 1 and abs(dc) <= 1:
-                    return True
-            elif p.nombre in ["dama", "torre", "alfil"]:
-                if (
-                    (p.nombre == "torre" and (df != 0 and dc != 0))
-                    or (p.nombre == "alfil" and abs(df) != abs(dc))
-                    or (
-                        p.nombre == "dama"
-                        and (df != 0 and dc != 0 and abs(df) != abs(dc))
-                    )
-                ):
-                    continue
-                step_f, step_c = (0 if df == 0 else (1 if df > 0 else -1)), (
-                    0 if dc == 0 else (1 if dc > 0 else -1)
-                )
-                f_act, c_act, obstruido = p.fila + step_f, p.col + step_c, False
-                while f_act != fila or c_act != col:
-                    if any(
-                        x for x in self.piezas if x.fila == f_act and x.col == c_act
-                    ):
-                        obstruido = True
-                        break
-                    f_act, c_act = f_act + step_f, c_act + step_c
-                if not obstruido:
-                    return True
-        return False
-
-    def deja_al_rey_en_jaque(self, pieza, n_fila, n_col):
-        f_orig, c_orig = pieza.fila, pieza.col
-        p_cap = next(
-            (
-                p
-                for p in self.piezas
-                if p.fila == n_fila and p.col == n_col and p != pieza
-            ),
-            None,
-        )
-        if p_cap:
-            self.piezas.remove(p_cap)
-        pieza.fila, pieza.col = n_fila, n_col
-        rey = self.obtener_rey(pieza.color)
-        en_jaque = self.esta_atacada(rey.fila, rey.col, pieza.color) if rey else False
-        pieza.fila, pieza.col = f_orig, c_orig
-        if p_cap:
-            self.piezas.append(p_cap)
-        return en_jaque
-
-    def tiene_movimientos_legales(self, color):
-        for p in self.piezas:
-            if p.color == color:
-                for f in range(8):
-                    for c in range(8):
-                        if self.es_movimiento_valido(
-                            p, f, c
-                        ) and not self.deja_al_rey_en_jaque(p, f, c):
-                            return True
-        return False
-
-    def es_movimiento_valido(self, pieza, n_fila, n_col, chequear_enroque=True):
-        if not (0 <= n_fila <= 7 and 0 <= n_col <= 7):
-            return False
-        df, dc = n_fila - pieza.fila, n_col - pieza.col
-        p_dest = next(
-            (p for p in self.piezas if p.fila == n_fila and p.col == n_col), None
-        )
-        if p_dest and (p_dest.nombre == "rey" or p_dest.color == pieza.color):
-            return False
-        if pieza.nombre == "peon":
-            dir = -1 if pieza.color == "blanco" else 1
-            if dc == 0 and df == dir and not p_dest:
-                return True
-            if not pieza.ha_movido and dc == 0 and df == 2 * dir:
-                if (
-                    not any(
-                        p.fila == pieza.fila + dir and p.col == n_col
-                        for p in self.piezas
-                    )
-                    and not p_dest
-                ):
-                    return True
-            if abs(dc) == 1 and df == dir:
-                if p_dest and p_dest.color != pieza.color:
-                    return True
-                if self.ultimo_movimiento:
-                    uo, co, ud, cd = self.ultimo_movimiento
-                    if abs(uo - ud) == 2 and ud == pieza.fila and cd == n_col:
-                        return True
-            return False
-        elif pieza.nombre == "caballo":
-            return abs(df) * abs(dc) == 2
-        elif pieza.nombre == "rey":
-            if abs(df) <= 1 and abs(dc) <= 1:
-                return True
-            if chequear_enroque and not pieza.ha_movido and df == 0 and abs(dc) == 2:
-                if self.esta_atacada(pieza.fila, pieza.col, pieza.color):
-                    return False
-                ct = 7 if dc > 0 else 0
-                torre = next(
-                    (
-                        p
-                        for p in self.piezas
-                        if p.fila == pieza.fila and p.col == ct and p.nombre == "torre"
-                    ),
-                    None,
-                )
-                if torre and not torre.ha_movido:
-                    if all(
-                        not any(
-                            p.fila == pieza.fila and p.col == c for p in self.piezas
-                        )
-                        for c in range(min(pieza.col, ct) + 1, max(pieza.col, ct))
-                    ):
-                        paso = 1 if dc > 0 else -1
-                        if not self.esta_atacada(
-                            pieza.fila, pieza.col + paso, pieza.color
-                        ) and not self.esta_atacada(pieza.fila, n_col, pieza.color):
-                            return True
-            return False
-        elif pieza.nombre in ["torre", "alfil", "dama"]:
-            if (
-                (pieza.nombre == "torre" and df != 0 and dc != 0)
-                or (pieza.nombre == "alfil" and abs(df) != abs(dc))
-                or (
-                    pieza.nombre == "dama"
-                    and df != 0
-                    and dc != 0
-                    and abs(df) != abs(dc)
-                )
-            ):
+        instante es el momento (ns de time.monotonic_ns) en que se decidió la
+        jugada: el clic que la completa o el fin de la búsqueda del motor.
+        Si llega después de que se acabara el tiempo, la partida se pierde
+        por tiempo y la jugada no se hace.
+        """
+        if self.reloj.pulsar(instante) is None:
+            self.perder_por_tiempo()
+            return
+        self.revisando = False
+        registro, imagen_previa = self._aplicar(mov)
+        if mov.capturada is not None:
+            self.reproducir_sonido("Captura")
+        else:
+            self.reproducir_sonido("Movimiento")
+
+        resultado, en_jaque = Reglas.estado_final(self.posicion)
+        if resultado:
+            self.resultado = resultado
+            self.reloj.detener(instante)
+            self.reproducir_sonido("Fin")
+        elif en_jaque:
+            self.reproducir_sonido("Jaque")
+
+        self.seleccionada, self.movs_legales = None, []
+        self.movimientos_seleccionada = {}
+        self.guardar_estado(registro, imagen_previa)
+        self.anotar_en_arbol(mov)
+        pygame.display.set_caption(f"Ajedrez - Turno: {self.turno.upper()}")
+        self.actualizar_sugerencia_libro()
+
+    def anotar_en_arbol(self, mov):
+        """Baja por la jugada en el árbol (nodo nuevo o variante ya vista) y la anota."""
+        nodo, _ = self.arbol.agregar(mov.uci)
+        nodo.san = self.jugadas_san[-1]
+        nodo.san_es = self.historial[-1]
+        if mov.capturada is not None:
+            nodo.capturada = (mov.capturada.nombre, mov.capturada.color)
+        nodo.clave = self.posicion.clave
+        nodo.t_blanco, nodo.t_negro = self.tiempo_blanco, self.tiempo_negro
+        nodo.resultado = self.resultado
+        if nodo.fen is None and self.arbol.necesita_control(nodo):
+            nodo.fen = escribir_fen(self.posicion)
+
+    # --- PARTIDAS EN PGN ---
+    def reiniciar(self, posicion):
+        """Empieza de nuevo desde la posición dada, con relojes y listas a cero."""
+        if self.servicio_motor is not None:
+            self.servicio_motor.cancelar()
+        self.archivar_partida()
+        self.inicio_partida = time.time()
+        self.jugadas_cargadas = 0
+        self.guardada = False
+        self.posicion = posicion
+        self.fen_inicial = None
+        self.historial = []
+        self.jugadas_san = []
+        self.capturadas_blancas = []
+        self.capturadas_negras = []
+        self.historial_estados = []
+        self.ply_base = 0
+        self.arbol = ArbolVariantes(escribir_fen(posicion), posicion.clave)
+        self.revisando = False
+        self.resultado = None
+        self.flechas = []
+        self.seleccionada, self.movs_legales = None, []
+        self.movimientos_seleccionada = {}
+        inicial = self.reloj.tiempo_inicial
+        self.reloj.restaurar(inicial, inicial, False, self.turno, 0)
+        pygame.display.set_caption(f"Ajedrez - Turno: {self.turno.upper()}")
+        self.actualizar_sugerencia_libro()
+
+    def cargar_pgn(self, ruta, numero=1):
+        """Carga la partida número `numero` del fichero y la reproduce.
+
+        El fichero se lee en flujo hasta esa partida. Devuelve False si no
+        existe o si alguna jugada no se puede resolver (se queda hasta ahí).
+        """
+        with open(ruta, encoding="utf-8", errors="replace") as entrada:
+            for i, partida in enumerate(leer_partidas(entrada), start=1):
+                if i == numero:
+                    break
+            else:
                 return False
-            pf, pc = (0 if df == 0 else (1 if df > 0 else -1)), (
-                0 if dc == 0 else (1 if dc > 0 else -1)
+
+        self.reiniciar(partida.posicion_inicial(self.crear_pieza))
+        self.fen_inicial = partida.fen_inicial
+        idioma = partida.idioma
+        completa = True
+        # Se reproduce sin reglas de partida ni reloj: solo tablero, panel y árbol
+        for san in partida.jugadas:
+            try:
+                mov = resolver_san(self.posicion, san, idioma)
+            except ValueError as e:
+                print(f"No se pudo cargar la partida entera: {e}")
+                completa = False
+                break
+            registro, imagen_previa = self._aplicar(mov)
+            self.guardar_estado(registro, imagen_previa)
+            self.anotar_en_arbol(mov)
+        self.jugadas_cargadas = len(self.jugadas_san)
+
+        resultado, _ = Reglas.estado_final(self.posicion)
+        # Abandonos y acuerdos no se deducen del tablero
+        if not resultado and completa and partida.resultado in TEXTO_RESULTADO_PGN:
+            resultado = TEXTO_RESULTADO_PGN[partida.resultado]
+        self.resultado = resultado
+        self.arbol.actual.resultado = resultado
+        # Las jugadas cargadas no gastan tiempo: relojes enteros y parados
+        # hasta la próxima jugada, como al empezar una partida
+        inicial = self.reloj.tiempo_inicial
+        self.reloj.restaurar(inicial, inicial, False, self.turno, 0)
+        pygame.display.set_caption(f"Ajedrez - Turno: {self.turno.upper()}")
+        self.actualizar_sugerencia_libro()
+        return completa
+
+    def resultado_pgn(self):
+        if not self.resultado:
+            return "*"
+        if "TABLAS" in self.resultado:
+            return "1/2-1/2"
+        return "1-0" if "Ganan Blancas" in self.resultado else "0-1"
+
+    def cabeceras_pgn(self):
+        jugador_ia = f"Computadora (nivel {self.nivel_ia})"
+        return {
+            "Event": "Partida de Ajedrez Táctico",
+            "Site": "?",
+            "Date": time.strftime("%Y.%m.%d", time.localtime(self.inicio_partida)),
+            "Round": "-",
+            "White": jugador_ia if self.nivel_ia and self.color_ia == "blanco" else "Jugador",
+            "Black": jugador_ia if self.nivel_ia and self.color_ia == "negro" else "Jugador",
+        }
+
+    def exportar_pgn(self, ruta=None):
+        """Guarda la partida en PGN (por defecto en assets/partidas) y devuelve la ruta."""
+        if ruta is None:
+            os.makedirs(RUTA_PARTIDAS, exist_ok=True)
+            nombre = time.strftime("partida_%Y%m%d_%H%M%S.pgn")
+            ruta = os.path.join(RUTA_PARTIDAS, nombre)
+        cabeceras = self.cabeceras_pgn()
+        primera_jugada, empieza_negro = 1, False
+        if self.fen_inicial:
+            cabeceras["SetUp"] = "1"
+            cabeceras["FEN"] = self.fen_inicial
+            campos = self.fen_inicial.split()
+            empieza_negro = len(campos) > 1 and campos[1] == "b"
+            if len(campos) > 5 and campos[5].isdigit():
+                primera_jugada = int(campos[5])
+        texto = escribir_pgn(
+            cabeceras, self.jugadas_san, self.resultado_pgn(), primera_jugada, empieza_negro
+        )
+        with open(ruta, "w", encoding="utf-8") as salida:
+            salida.write(texto)
+        return ruta
+
+    def archivar_partida(self):
+        """Encola la partida en el archivo si tiene jugadas nuevas; no espera al disco.
+
+        Se llama al cerrar la ventana y antes de empezar otra partida, así
+        cada partida entra una sola vez y con todo lo que se jugó. Solo se
+        archivan las terminadas y las que el usuario guardó con Ctrl+S; una
+        partida a medias que se cierra sin más no entra.
+        """
+        if self.archivo is None or len(self.jugadas_san) <= self.jugadas_cargadas:
+            return
+        if not self.resultado and not self.guardada:
+            return
+        self.archivo.guardar(
+            PartidaArchivada(
+                None,  # sin origen: cada partida de Juego entra una sola vez
+                self.cabeceras_pgn(),
+                self.resultado_pgn(),
+                self.fen_inicial,
+                list(self.jugadas_san),
+                [n.uci for n in self.arbol.camino(self.arbol.actual)[1:]],
+                list(self.posicion.historial_claves),
             )
-            f_act, c_act = pieza.fila + pf, pieza.col + pc
-            while f_act != n_fila or c_act != n_col:
-                if any(p.fila == f_act and p.col == c_act for p in self.piezas):
-                    return False
-                f_act, c_act = f_act + pf, c_act + pc
-            return True
-        return False
+        )
+        self.jugadas_cargadas = len(self.jugadas_san)
 
     def actualizar_relojes(self):
-        ahora = pygame.time.get_ticks()
-        delta = (ahora - self.ultima_actualizacion_tiempo) / 1000.0
-        self.ultima_actualizacion_tiempo = ahora
-        if self.reloj_iniciado and self.partida_activa and not self.resultado:
-            if self.turno == "blanco":
-                self.tiempo_blanco = max(0, self.tiempo_blanco - delta)
-                if self.tiempo_blanco <= 0:
-                    self.resultado = "Ganan Negras por Tiempo"
-                    self.reproducir_sonido("Fin")
-            else:
-                self.tiempo_negro = max(0, self.tiempo_negro - delta)
-                if self.tiempo_negro <= 0:
-                    self.resultado = "Ganan Blancas por Tiempo"
-                    self.reproducir_sonido("Fin")
+        """Solo mira el reloj: si al bando al turno se le acabó el tiempo, pierde."""
+        if self.partida_activa and not self.resultado and self.reloj.sin_tiempo():
+            self.perder_por_tiempo()
+
+    def perder_por_tiempo(self):
+        ganador = "Negras" if self.turno == "blanco" else "Blancas"
+        self.resultado = f"Ganan {ganador} por Tiempo"
+        self.reloj.detener()
+        self.arbol.actual.resultado = self.resultado
+        self.reproducir_sonido("Fin")
 
     def esperar_promocion(self, pieza):
-        esperando = True
-        while esperando:
+        """Muestra la ventana de promoción y devuelve el nombre de la pieza elegida."""
+        elegida = None
+        while elegida is None:
             opciones = self.tablero.dibujar_ventana_promocion(pieza.color)
             pygame.display.flip()
             for e in pygame.event.get():
@@ -357,41 +629,35 @@ class Juego:
                     pos = pygame.mouse.get_pos()
                     for rect, nombre in opciones:
                         if rect.collidepoint(pos):
-                            pieza.nombre = nombre
-                            esperando = False
+                            elegida = nombre
             self.reloj_fps.tick(30)
-        pieza.cargar_imagen()
-
-    def dibujar_cartel_resultado(self):
-        if not self.resultado:
-            return
-        fuente = pygame.font.SysFont("Arial", 20, bold=True)
-        x_cartel = self.tablero.ancho_tablero + 15
-        y_cartel = self.tablero.alto_total // 2 + 100
-        ancho_cartel = self.tablero.ancho_total - self.tablero.ancho_tablero - 30
-        rect_fondo = pygame.Rect(x_cartel, y_cartel, ancho_cartel, 50)
-        pygame.draw.rect(self.pantalla, (45, 45, 45), rect_fondo, border_radius=8)
-        pygame.draw.rect(self.pantalla, (212, 175, 55), rect_fondo, 2, border_radius=8)
-        texto = fuente.render(self.resultado, True, (255, 215, 0))
-        text_rect = texto.get_rect(center=rect_fondo.center)
-        self.pantalla.blit(texto, text_rect)
+        # La ventana tapó parte del tablero
+        self.tablero.invalidar()
+        return elegida
 
     def iniciar_partida(self):
         while self.partida_activa:
             self.actualizar_relojes()
-            rey_act = self.obtener_rey(self.turno)
             rey_en_jaque = (
-                rey_act
-                if (
-                    rey_act and self.esta_atacada(rey_act.fila, rey_act.col, self.turno)
-                )
+                self.posicion.obtener_rey(self.turno)
+                if self.posicion.en_jaque(self.turno)
                 else None
             )
 
             for evento in pygame.event.get():
                 if evento.type == QUIT:
                     self.partida_activa = False
+                if evento.type == WINDOWEXPOSED:
+                    self.tablero.invalidar()
+                if evento.type == KEYDOWN and evento.key == K_s and evento.mod & KMOD_CTRL:
+                    print(f"Partida guardada en {self.exportar_pgn()}")
+                    self.guardada = True
+                elif evento.type == KEYDOWN and evento.key in (
+                    K_LEFT, K_RIGHT, K_UP, K_DOWN, K_HOME, K_END, K_PAGEUP, K_PAGEDOWN
+                ):
+                    self.navegar(evento.key)
                 if evento.type == MOUSEBUTTONDOWN:
+                    instante = self.reloj.ahora()
                     pos = pygame.mouse.get_pos()
                     if pos[0] < self.tablero.ancho_tablero:
                         col, fila = (
@@ -401,158 +667,52 @@ class Juego:
                         if evento.button == 3:
                             self.dibujando_flecha = True
                             self.inicio_flecha = (fila, col)
-                        elif evento.button == 1 and not self.resultado:
+                        elif (
+                            evento.button == 1
+                            and not self.resultado
+                            # Con el motor al turno el tablero no atiende clics
+                            and not self.es_turno_ia()
+                        ):
                             if self.seleccionada and (fila, col) in self.movs_legales:
-                                self.reloj_iniciado = True
-                                f_orig, c_orig = (
-                                    self.seleccionada.fila,
-                                    self.seleccionada.col,
-                                )
-
-                                # Detectar si es captura (normal o al paso)
-                                p_dest = next(
-                                    (
-                                        p
-                                        for p in self.piezas
-                                        if p.fila == fila
-                                        and p.col == col
-                                        and p != self.seleccionada
-                                    ),
-                                    None,
-                                )
-                                es_captura = p_dest is not None or (
-                                    self.seleccionada.nombre == "peon"
-                                    and abs(col - c_orig) == 1
-                                    and not p_dest
-                                )
-
-                                # Guardar en historial con notación corregida
-                                texto_mov = self.obtener_notacion_corta(
-                                    f_orig,
-                                    c_orig,
-                                    fila,
-                                    col,
-                                    self.seleccionada,
-                                    es_captura,
-                                )
-                                self.historial.append(texto_mov)
-
-                                # Lógica de captura al paso (eliminar peón enemigo)
-                                if (
-                                    self.seleccionada.nombre == "peon"
-                                    and abs(col - c_orig) == 1
-                                    and not p_dest
-                                ):
-                                    p_dest = next(
-                                        (
-                                            p
-                                            for p in self.piezas
-                                            if p.fila == f_orig and p.col == col
-                                        ),
-                                        None,
+                                opciones = self.movimientos_seleccionada[(fila, col)]
+                                mov = opciones[0]
+                                if mov.promocion:
+                                    nombre = self.esperar_promocion(self.seleccionada)
+                                    mov = next(
+                                        m for m in opciones if m.promocion == nombre
                                     )
-
-                                # Lógica de Enroque (mover la torre)
-                                if (
-                                    self.seleccionada.nombre == "rey"
-                                    and abs(col - c_orig) == 2
-                                ):
-                                    col_t_orig = 7 if col > c_orig else 0
-                                    col_t_dest = col - 1 if col > c_orig else col + 1
-                                    torre = next(
-                                        (
-                                            p
-                                            for p in self.piezas
-                                            if p.fila == fila and p.col == col_t_orig
-                                        ),
-                                        None,
-                                    )
-                                    if torre:
-                                        torre.col, torre.x, torre.ha_movido = (
-                                            col_t_dest,
-                                            col_t_dest * self.tablero.tam_cuadro,
-                                            True,
-                                        )
-
-                                if p_dest:
-                                    if p_dest.color == "blanco":
-                                        self.capturadas_negras.append(p_dest)
-                                    else:
-                                        self.capturadas_blancas.append(p_dest)
-                                    self.piezas.remove(p_dest)
-                                    self.reproducir_sonido("Captura")
-                                else:
-                                    self.reproducir_sonido("Movimiento")
-
-                                self.ultimo_movimiento = (f_orig, c_orig, fila, col)
-                                (
-                                    self.seleccionada.fila,
-                                    self.seleccionada.col,
-                                    self.seleccionada.ha_movido,
-                                ) = (fila, col, True)
-                                self.seleccionada.x, self.seleccionada.y = (
-                                    col * self.tablero.tam_cuadro,
-                                    fila * self.tablero.tam_cuadro,
-                                )
-
-                                if (
-                                    self.seleccionada.nombre == "peon"
-                                    and self.seleccionada.fila in [0, 7]
-                                ):
-                                    self.esperar_promocion(self.seleccionada)
-
-                                self.turno = (
-                                    "negro" if self.turno == "blanco" else "blanco"
-                                )
-                                n_rey = self.obtener_rey(self.turno)
-                                if n_rey and self.esta_atacada(
-                                    n_rey.fila, n_rey.col, self.turno
-                                ):
-                                    if not self.tiene_movimientos_legales(self.turno):
-                                        ganador = (
-                                            "Blancas"
-                                            if self.turno == "negro"
-                                            else "Negras"
-                                        )
-                                        self.resultado = f"¡MATE! Ganan {ganador}"
-                                        self.reproducir_sonido("Fin")
-                                    else:
-                                        self.reproducir_sonido("Jaque")
-                                elif not self.tiene_movimientos_legales(self.turno):
-                                    self.resultado = "TABLAS (Ahogado)"
-                                    self.reproducir_sonido("Fin")
-
-                                self.seleccionada, self.movs_legales = None, []
-                                self.guardar_estado()
-                                pygame.display.set_caption(
-                                    f"Ajedrez - Turno: {self.turno.upper()}"
-                                )
+                                    # Elegir la pieza es parte de la jugada
+                                    instante = self.reloj.ahora()
+                                self.jugar_movimiento(mov, instante)
                             else:
-                                p_clic = next(
-                                    (
-                                        p
-                                        for p in self.piezas
-                                        if p.fila == fila
-                                        and p.col == col
-                                        and p.color == self.turno
-                                    ),
-                                    None,
-                                )
-                                if p_clic:
+                                p_clic = self.posicion.pieza_en(fila, col)
+                                if p_clic and p_clic.color == self.turno:
                                     self.seleccionada = p_clic
-                                    self.movs_legales = [
-                                        (f, c)
-                                        for f in range(8)
-                                        for c in range(8)
-                                        if self.es_movimiento_valido(p_clic, f, c)
-                                        and not self.deja_al_rey_en_jaque(p_clic, f, c)
-                                    ]
+                                    self.movimientos_seleccionada = {}
+                                    for mov in Reglas.movimientos_legales(
+                                        self.posicion, p_clic
+                                    ):
+                                        self.movimientos_seleccionada.setdefault(
+                                            mov.destino, []
+                                        ).append(mov)
+                                    self.movs_legales = list(
+                                        self.movimientos_seleccionada
+                                    )
                                 else:
                                     self.seleccionada, self.movs_legales = None, []
+                                    self.movimientos_seleccionada = {}
                     elif hasattr(
                         self.tablero, "rect_deshacer"
                     ) and self.tablero.rect_deshacer.collidepoint(pos):
                         self.deshacer_movimiento()
+                        # Contra el motor se deshace también su respuesta
+                        if self.servicio_motor is not None and self.turno == self.color_ia:
+                            self.deshacer_movimiento()
+                        self.revisando = False
+                        # Se sigue jugando desde aquí (en la posición inicial el
+                        # reloj arranca con la primera jugada, como siempre)
+                        if not self.resultado and self.arbol.actual.padre is not None:
+                            self.reloj.reanudar(instante)
 
                 if (
                     evento.type == MOUSEBUTTONUP
@@ -581,7 +741,7 @@ class Juego:
             # Mostramos solo los últimos 14 movimientos para no desbordar el panel lateral
             historial_visible = self.historial[-14:]
 
-            self.tablero.dibujar_tablero(
+            sucios = self.tablero.dibujar_tablero(
                 self.piezas,
                 self.seleccionada,
                 rey_en_jaque,
@@ -594,11 +754,25 @@ class Juego:
                 self.tiempo_blanco,
                 self.tiempo_negro,
                 self.turno,
+                self.sugerencia_libro,
+                self.resultado,
             )
-
-            if self.resultado:
-                self.dibujar_cartel_resultado()
-            pygame.display.flip()
-            self.reloj_fps.tick(120)
-
+            if sucios:
+                pygame.display.update(sucios)
+
+            if self.es_turno_ia():
+                self.atender_ia()
+            elif self.servicio_motor is not None and self.servicio_motor.pensando:
+                # La partida terminó (p. ej. por tiempo) mientras el motor pensaba
+                self.servicio_motor.cancelar()
+            # Sin nada que redibujar basta con atender eventos y el reloj
+            self.reloj_fps.tick(FPS_ACTIVO if sucios else FPS_REPOSO)
+
+        if self.servicio_motor is not None:
+            self.servicio_motor.cerrar()
+        if self.libro is not None:
+            self.libro.cerrar()
+        if self.archivo is not None:
+            self.archivar_partida()
+            self.archivo.cerrar()
         pygame.quit()
@@ -0,0 +1,314 @@
+"""Lectura y escritura de partidas en PGN y de jugadas SAN.
+
+El lector es un generador que avanza línea a línea, así que sirve para
+ficheros de cualquier tamaño sin cargarlos en memoria. Se aceptan las
+iniciales inglesas (KQRBN) y las españolas (RDTAC); como la R significa
+rey en español y torre en inglés, el idioma se decide por partida.
+"""
+
+import re
+
+from . import generador
+from .Pieza import Pieza
+from .Posicion import Posicion
+
+LETRAS_SAN = {
+    "en": {"rey": "K", "dama": "Q", "torre": "R", "alfil": "B", "caballo": "N"},
+    "es": {"rey": "R", "dama": "D", "torre": "T", "alfil": "A", "caballo": "C"},
+}
+PIEZA_POR_LETRA = {
+    idioma: {letra: nombre for nombre, letra in letras.items()}
+    for idioma, letras in LETRAS_SAN.items()
+}
+PIEZA_POR_LETRA_SAN = PIEZA_POR_LETRA["en"]
+# Letras que solo existen en uno de los dos idiomas
+_SOLO_ESPANOL = set("DTAC")
+_SOLO_INGLES = set("KQBN")
+
+RESULTADOS = ("1-0", "0-1", "1/2-1/2", "*")
+# Cabeceras obligatorias del PGN, en su orden
+CABECERAS_OBLIGATORIAS = ("Event", "Site", "Date", "Round", "White", "Black", "Result")
+
+_CABECERA = re.compile(r'\[\s*(\w+)\s+"((?:[^"\\]|\\.)*)"\s*\]')
+_ESCAPE = re.compile(r"\\(.)")
+_NUMERO_JUGADA = re.compile(r"^\d+\.+")
+_SAN = re.compile(
+    r"^(?P<pieza>[KQRBNDTAC])?(?P<col>[a-h])?(?P<fila>[1-8])?x?"
+    r"(?P<destino>[a-h][1-8])(?:=?(?P<promocion>[QRBNDTAC]))?$"
+)
+
+
+class PartidaPGN:
+    """Cabeceras, jugadas SAN y resultado de una partida leída."""
+
+    __slots__ = ("cabeceras", "jugadas", "resultado", "error")
+
+    def __init__(self, cabeceras, jugadas, resultado):
+        self.cabeceras = cabeceras
+        self.jugadas = jugadas
+        self.resultado = resultado
+        self.error = None  # motivo si alguna jugada no se pudo resolver
+
+    @property
+    def fen_inicial(self):
+        return self.cabeceras.get("FEN")
+
+    @property
+    def idioma(self):
+        return detectar_idioma(self.jugadas)
+
+    def posicion_inicial(self, crear_pieza=Pieza):
+        if self.fen_inicial:
+            return Posicion.desde_fen(self.fen_inicial, crear_pieza)
+        return Posicion.inicial(crear_pieza)
+
+
+def detectar_idioma(jugadas):
+    """"es" si alguna jugada usa una inicial española (D, T, A, C); si no, "en"."""
+    for san in jugadas:
+        for car in san:
+            if car in _SOLO_ESPANOL:
+                return "es"
+            if car in _SOLO_INGLES:
+                return "en"
+    return "en"
+
+
+def _fichas(texto, estado):
+    """Separa el texto de jugadas en fichas, saltando comentarios y variantes.
+
+    estado guarda lo que queda abierto entre líneas: la profundidad de
+    variantes y si hay un comentario {...} sin cerrar.
+    """
+    fichas = []
+    i, n = 0, len(texto)
+    while i < n:
+        car = texto[i]
+        if estado["comentario"]:
+            fin = texto.find("}", i)
+            if fin < 0:
+                return fichas
+            estado["comentario"] = False
+            i = fin + 1
+            continue
+        if car == "{":
+            estado["comentario"] = True
+            i += 1
+            continue
+        if car == ";":
+            return fichas  # comentario hasta fin de línea
+        if car == "(":
+            estado["variantes"] += 1
+            i += 1
+            continue
+        if car == ")":
+            estado["variantes"] = max(0, estado["variantes"] - 1)
+            i += 1
+            continue
+        if car.isspace():
+            i += 1
+            continue
+        j = i
+        while j < n and not texto[j].isspace() and texto[j] not in "{}();":
+            j += 1
+        if estado["variantes"] == 0:
+            fichas.append(texto[i:j])
+        i = j
+    return fichas
+
+
+def leer_partidas(lineas):
+    """Genera las PartidaPGN de un iterable de líneas (p. ej. un fichero abierto)."""
+    cabeceras, jugadas = {}, []
+    estado = {"comentario": False, "variantes": 0}
+    en_jugadas = False
+    for linea in lineas:
+        linea = linea.strip()
+        if not estado["comentario"] and linea.startswith("["):
+            if en_jugadas:
+                # Partida sin resultado final: empieza otra
+                yield PartidaPGN(cabeceras, jugadas, "*")
+                cabeceras, jugadas, en_jugadas = {}, [], False
+            coincidencia = _CABECERA.match(linea)
+            if coincidencia:
+                cabeceras[coincidencia.group(1)] = _ESCAPE.sub(r"\1", coincidencia.group(2))
+            continue
+        if not linea and not estado["comentario"]:
+            continue
+        en_jugadas = True
+        for ficha in _fichas(linea, estado):
+            if ficha in RESULTADOS:
+                yield PartidaPGN(cabeceras, jugadas, ficha)
+                cabeceras, jugadas, en_jugadas = {}, [], False
+                estado = {"comentario": False, "variantes": 0}
+                continue
+            if ficha.startswith("$"):
+                continue  # anotación numérica (NAG)
+            ficha = _NUMERO_JUGADA.sub("", ficha)
+            if ficha:
+                jugadas.append(ficha)
+    if en_jugadas and jugadas:
+        yield PartidaPGN(cabeceras, jugadas, cabeceras.get("Result", "*"))
+
+
+def resolver_san(posicion, san, idioma="en"):
+    """Movimiento legal de la posición que corresponde a la jugada SAN.
+
+    Lanza ValueError si la jugada no existe o es ambigua.
+    """
+    texto = san.rstrip("+#!?")
+    legales = generador.generar_todos_legales(posicion, posicion.turno)
+
+    if texto in ("O-O", "0-0", "O-O-O", "0-0-0"):
+        largo = texto.count("-") == 2
+        for mov in legales:
+            if mov.es_enroque and (mov.c_dest < mov.c_orig) == largo:
+                return mov
+        raise ValueError(f"Enroque ilegal: {san!r}")
+
+    coincidencia = _SAN.match(texto)
+    if coincidencia is None:
+        raise ValueError(f"Jugada SAN no reconocida: {san!r}")
+    letras = PIEZA_POR_LETRA[idioma]
+    letra_pieza = coincidencia.group("pieza")
+    if letra_pieza is not None and letra_pieza not in letras:
+        raise ValueError(f"Inicial de pieza desconocida: {san!r}")
+    nombre = letras.get(letra_pieza, "peon")
+    destino = coincidencia.group("destino")
+    f_dest, c_dest = 8 - int(destino[1]), "abcdefgh".index(destino[0])
+    col = coincidencia.group("col")
+    fila = coincidencia.group("fila")
+    letra_promocion = coincidencia.group("promocion")
+    if letra_promocion and letra_promocion not in letras:
+        raise ValueError(f"Promoción desconocida: {san!r}")
+    promocion = letras[letra_promocion] if letra_promocion else None
+
+    candidatas = [
+        mov
+        for mov in legales
+        if mov.pieza.nombre == nombre
+        and mov.f_dest == f_dest
+        and mov.c_dest == c_dest
+        and not mov.es_enroque
+        and mov.promocion == promocion
+        and (col is None or mov.c_orig == "abcdefgh".index(col))
+        and (fila is None or mov.f_orig == 8 - int(fila))
+    ]
+    if len(candidatas) != 1:
+        motivo = "ilegal" if not candidatas else "ambigua"
+        raise ValueError(f"Jugada SAN {motivo}: {san!r}")
+    return candidatas[0]
+
+
+def reproducir_partidas(lineas, crear_pieza=Pieza):
+    """Genera (PartidaPGN, jugadas UCI) resolviendo cada SAN con el generador.
+
+    Las jugadas UCI se pueden volver a aplicar sobre partida.posicion_inicial()
+    con generador.jugada_uci. Si una jugada no se puede resolver, la lista se
+    corta ahí y partida.error dice por qué.
+    """
+    for partida in leer_partidas(lineas):
+        idioma = partida.idioma
+        posicion = partida.posicion_inicial(crear_pieza)
+        jugadas = []
+        for san in partida.jugadas:
+            try:
+                mov = resolver_san(posicion, san, idioma)
+            except ValueError as e:
+                partida.error = str(e)
+                break
+            jugadas.append(mov.uci)
+            posicion.hacer_movimiento(mov)
+        yield partida, jugadas
+
+
+# --- ESCRITURA ---
+def escribir_san(posicion, mov, idioma="en"):
+    """SAN de una jugada legal en la posición previa (desambiguación y +/#)."""
+    letras = LETRAS_SAN[idioma]
+    pieza = mov.pieza
+    columnas = "abcdefgh"
+    if mov.es_enroque:
+        texto = "O-O" if mov.c_dest > mov.c_orig else "O-O-O"
+    else:
+        destino = f"{columnas[mov.c_dest]}{8 - mov.f_dest}"
+        captura = "x" if mov.capturada is not None else ""
+        if pieza.nombre == "peon":
+            texto = (columnas[mov.c_orig] if captura else "") + captura + destino
+            if mov.promocion:
+                texto += "=" + letras[mov.promocion]
+        else:
+            # Otras piezas iguales que también llegan al destino
+            rivales = [
+                otra
+                for otra in posicion.piezas
+                if otra is not pieza
+                and otra.nombre == pieza.nombre
+                and otra.color == pieza.color
+                and any(
+                    m.f_dest == mov.f_dest and m.c_dest == mov.c_dest
+                    for m in generador.generar_legales(posicion, otra)
+                )
+            ]
+            desambiguacion = ""
+            if rivales:
+                if all(otra.col != mov.c_orig for otra in rivales):
+                    desambiguacion = columnas[mov.c_orig]
+                elif all(otra.fila != mov.f_orig for otra in rivales):
+                    desambiguacion = str(8 - mov.f_orig)
+                else:
+                    desambiguacion = f"{columnas[mov.c_orig]}{8 - mov.f_orig}"
+            texto = letras[pieza.nombre] + desambiguacion + captura + destino
+
+    registro = posicion.hacer_movimiento(mov)
+    try:
+        if posicion.en_jaque():
+            hay_jugadas = generador.hay_movimientos_legales(posicion, posicion.turno)
+            texto += "+" if hay_jugadas else "#"
+    finally:
+        posicion.deshacer(registro)
+    return texto
+
+
+def escribir_pgn(cabeceras, jugadas, resultado="*", primera_jugada=1, empieza_negro=False):
+    """Texto PGN de una partida a partir de sus jugadas SAN (en inglés).
+
+    Las cabeceras obligatorias que falten se rellenan con "?"; Result se
+    toma de resultado. Las líneas de jugadas se cortan a 80 columnas.
+    """
+    cabeceras = dict(cabeceras)
+    cabeceras["Result"] = resultado
+    lineas = []
+    for clave in CABECERAS_OBLIGATORIAS:
+        lineas.append(_linea_cabecera(clave, cabeceras.pop(clave, "?")))
+    for clave, valor in cabeceras.items():
+        lineas.append(_linea_cabecera(clave, valor))
+    lineas.append("")
+
+    fichas = []
+    numero, negro = primera_jugada, empieza_negro
+    for i, san in enumerate(jugadas):
+        if not negro:
+            fichas.append(f"{numero}.")
+        elif i == 0:
+            fichas.append(f"{numero}...")
+        fichas.append(san)
+        if negro:
+            numero += 1
+        negro = not negro
+    fichas.append(resultado)
+
+    actual = ""
+    for ficha in fichas:
+        if actual and len(actual) + 1 + len(ficha) > 80:
+            lineas.append(actual)
+            actual = ficha
+        else:
+            actual = f"{actual} {ficha}" if actual else ficha
+    lineas.append(actual)
+    return "\n".join(lineas) + "\n"
+
+
+def _linea_cabecera(clave, valor):
+    valor = str(valor).replace("\\", "\\\\").replace('"', '\\"')
+    return f'[{clave} "{valor}"]'
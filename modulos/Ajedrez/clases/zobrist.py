@@ -0,0 +1,101 @@
+"""Claves Zobrist de 64 bits para identificar posiciones.
+
+La clave combina (XOR) un número aleatorio por pieza y casilla, uno para
+el turno de las negras, uno por combinación de derechos de enroque y uno
+por columna de captura al paso. La semilla es fija para que las claves
+coincidan entre procesos y sesiones (libro de aperturas, base de partidas).
+"""
+
+import random
+
+_azar = random.Random(0x41A7E5)
+
+INDICE_PIEZA = {}
+for _color_offset, _color in ((0, "blanco"), (6, "negro")):
+    for _i, _nombre in enumerate(("peon", "caballo", "alfil", "torre", "dama", "rey")):
+        INDICE_PIEZA[(_nombre, _color)] = _color_offset + _i
+
+# CLAVES_PIEZA[indice_pieza][casilla], con casilla = fila * 8 + col
+CLAVES_PIEZA = tuple(
+    tuple(_azar.getrandbits(64) for _ in range(64)) for _ in range(12)
+)
+CLAVE_TURNO = _azar.getrandbits(64)
+# Derechos de enroque como máscara de 4 bits; el índice 0 (sin derechos) vale 0
+CLAVES_ENROQUE = (0,) + tuple(_azar.getrandbits(64) for _ in range(15))
+# Columna de captura al paso; el índice 8 (sin captura posible) vale 0
+CLAVES_AL_PASO = tuple(_azar.getrandbits(64) for _ in range(8)) + (0,)
+
+SIN_AL_PASO = 8
+
+ENROQUE_BLANCO_CORTO = 1
+ENROQUE_BLANCO_LARGO = 2
+ENROQUE_NEGRO_CORTO = 4
+ENROQUE_NEGRO_LARGO = 8
+
+# (bit, casilla del rey, casilla de la torre, color)
+_ENROQUES = (
+    (ENROQUE_BLANCO_CORTO, 60, 63, "blanco"),
+    (ENROQUE_BLANCO_LARGO, 60, 56, "blanco"),
+    (ENROQUE_NEGRO_CORTO, 4, 7, "negro"),
+    (ENROQUE_NEGRO_LARGO, 4, 0, "negro"),
+)
+
+
+def clave_pieza(pieza, casilla):
+    return CLAVES_PIEZA[INDICE_PIEZA[(pieza.nombre, pieza.color)]][casilla]
+
+
+def derechos_enroque(casillas):
+    """Máscara de enroques aún posibles según rey y torres sin mover."""
+    derechos = 0
+    for bit, c_rey, c_torre, color in _ENROQUES:
+        rey = casillas[c_rey]
+        torre = casillas[c_torre]
+        if (
+            rey is not None
+            and rey.nombre == "rey"
+            and rey.color == color
+            and not rey.ha_movido
+            and torre is not None
+            and torre.nombre == "torre"
+            and torre.color == color
+            and not torre.ha_movido
+        ):
+            derechos |= bit
+    return derechos
+
+
+def columna_al_paso(casillas, ultimo_movimiento):
+    """Columna capturable al paso, o SIN_AL_PASO.
+
+    Solo cuenta si hay un peón rival al lado del que avanzó dos casillas,
+    para que dos posiciones idénticas en la práctica tengan la misma clave.
+    """
+    if not ultimo_movimiento:
+        return SIN_AL_PASO
+    uo, co, ud, cd = ultimo_movimiento
+    if abs(uo - ud) != 2:
+        return SIN_AL_PASO
+    peon = casillas[ud * 8 + cd]
+    if peon is None or peon.nombre != "peon":
+        return SIN_AL_PASO
+    for c in (cd - 1, cd + 1):
+        if 0 <= c <= 7:
+            vecino = casillas[ud * 8 + c]
+            if (
+                vecino is not None
+                and vecino.nombre == "peon"
+                and vecino.color != peon.color
+            ):
+                return cd
+    return SIN_AL_PASO
+
+
+def calcular_clave(piezas, turno, derechos, col_al_paso):
+    """Clave completa desde cero (el juego la mantiene luego de forma incremental)."""
+    clave = 0
+    for p in piezas:
+        clave ^= clave_pieza(p, p.fila * 8 + p.col)
+    if turno == "negro":
+        clave ^= CLAVE_TURNO
+    return clave ^ CLAVES_ENROQUE[derechos] ^ CLAVES_AL_PASO[col_al_paso]
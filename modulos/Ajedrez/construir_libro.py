@@ -0,0 +1,126 @@
+"""Construye el libro de aperturas binario a partir de ficheros PGN.
+
+Cada partida se reproduce hasta --jugadas medias jugadas y cada par
+(posición, jugada) suma peso para el bando que la hizo: 2 si ganó, 1 si
+hizo tablas y 0 si perdió. Para no depender de la memoria con colecciones
+enormes, los conteos se vuelcan ordenados a ficheros temporales cada
+--bloque entradas y al final se mezclan en un único fichero ordenado.
+
+Uso:
+    python -m modulos.Ajedrez.construir_libro partidas.pgn [otras.pgn ...]
+    python -m modulos.Ajedrez.construir_libro masters.pgn --jugadas 24 --salida libro.bin
+"""
+
+import argparse
+import heapq
+import os
+import sys
+import tempfile
+
+from .clases.Posicion import Posicion
+from .clases.LibroAperturas import MAGICO, PESO_MAXIMO, REGISTRO, RUTA_LIBRO
+from .clases.pgn import leer_partidas, resolver_san
+
+# Resultado -> puntos para (blancas, negras)
+PUNTOS_RESULTADO = {"1-0": (2, 0), "0-1": (0, 2), "1/2-1/2": (1, 1)}
+
+
+def _volcar_bloque(conteos, directorio):
+    """Escribe un bloque ordenado de registros y devuelve su ruta."""
+    descriptor, ruta = tempfile.mkstemp(suffix=".bloque", dir=directorio)
+    with os.fdopen(descriptor, "wb") as salida:
+        for (clave, codigo), peso in sorted(conteos.items()):
+            salida.write(REGISTRO.pack(clave, codigo, min(peso, PESO_MAXIMO)))
+    return ruta
+
+
+def _leer_bloque(ruta):
+    with open(ruta, "rb") as entrada:
+        while True:
+            datos = entrada.read(REGISTRO.size)
+            if len(datos) < REGISTRO.size:
+                return
+            yield REGISTRO.unpack(datos)
+
+
+def _mezclar(rutas, salida):
+    """Mezcla los bloques ordenados sumando el peso de registros repetidos."""
+    total = 0
+    previo = None
+    with open(salida, "wb") as destino:
+        destino.write(MAGICO)
+        for clave, codigo, peso in heapq.merge(*(_leer_bloque(r) for r in rutas)):
+            if previo is not None and previo[0] == clave and previo[1] == codigo:
+                previo[2] = min(previo[2] + peso, PESO_MAXIMO)
+                continue
+            if previo is not None:
+                destino.write(REGISTRO.pack(*previo))
+                total += 1
+            previo = [clave, codigo, peso]
+        if previo is not None:
+            destino.write(REGISTRO.pack(*previo))
+            total += 1
+    return total
+
+
+def construir(rutas_pgn, salida, max_medias_jugadas=20, bloque=1_000_000):
+    """Genera el libro. Devuelve (partidas leídas, registros escritos)."""
+    directorio = os.path.dirname(os.path.abspath(salida))
+    os.makedirs(directorio, exist_ok=True)
+    bloques = []
+    conteos = {}
+    partidas = 0
+    try:
+        for ruta in rutas_pgn:
+            with open(ruta, encoding="utf-8", errors="replace") as entrada:
+                for partida in leer_partidas(entrada):
+                    puntos = PUNTOS_RESULTADO.get(partida.resultado)
+                    if puntos is None or partida.fen_inicial:
+                        continue  # sin resultado o sin la posición inicial normal
+                    partidas += 1
+                    posicion = Posicion.inicial()
+                    idioma = partida.idioma
+                    for san in partida.jugadas[:max_medias_jugadas]:
+                        try:
+                            mov = resolver_san(posicion, san, idioma)
+                        except ValueError:
+                            break
+                        peso = puntos[0] if posicion.turno == "blanco" else puntos[1]
+                        if peso:
+                            par = (posicion.clave, mov.codigo)
+                            conteos[par] = conteos.get(par, 0) + peso
+                        posicion.hacer_movimiento(mov)
+                    if len(conteos) >= bloque:
+                        bloques.append(_volcar_bloque(conteos, directorio))
+                        conteos = {}
+        if conteos or not bloques:
+            bloques.append(_volcar_bloque(conteos, directorio))
+        registros = _mezclar(bloques, salida)
+    finally:
+        for ruta in bloques:
+            os.remove(ruta)
+    return partidas, registros
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Construye el libro de aperturas")
+    parser.add_argument("pgn", nargs="+", help="ficheros PGN de entrada")
+    parser.add_argument("--salida", default=RUTA_LIBRO, help="fichero del libro")
+    parser.add_argument(
+        "--jugadas", type=int, default=20, help="medias jugadas por partida"
+    )
+    parser.add_argument(
+        "--bloque",
+        type=int,
+        default=1_000_000,
+        help="entradas en memoria antes de volcar a disco",
+    )
+    args = parser.parse_args(argv)
+
+    partidas, registros = construir(args.pgn, args.salida, args.jugadas, args.bloque)
+    print(f"{partidas} partidas, {registros} registros -> {args.salida}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
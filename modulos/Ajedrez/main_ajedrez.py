@@ -1,4 +1,25 @@
-from clases.juego import Juego
+import sys
+
+try:
+    from .clases.juego import Juego
+    from .niveles import tablas_finales
+except ImportError:
+    # python main_ajedrez.py desde esta carpeta: clases queda como paquete
+    # de primer nivel y las tablas de finales (que importan ..clases) no
+    # se pueden cargar; con python -m modulos.Ajedrez.main_ajedrez sí
+    from clases.juego import Juego
+
+    tablas_finales = None
+
+
+def elegir_nivel():
+    """Pregunta por consola si se juega contra la computadora y a qué nivel."""
+    respuesta = input(
+        "\nNivel de la computadora (1-5, Enter para dos jugadores): "
+    ).strip()
+    if respuesta in ("1", "2", "3", "4", "5"):
+        return int(respuesta)
+    return None
 
 
 def main():
@@ -8,7 +29,14 @@ def main():
     while True:
         try:
             # Crear una nueva partida
-            partida = Juego()
+            # El motor consulta las tablas de finales si ya están generadas
+            sondeo = None
+            if tablas_finales is not None and tablas_finales.disponibles():
+                sondeo = tablas_finales.sondear_motor
+            partida = Juego(nivel_ia=elegir_nivel(), sondeo_finales=sondeo)
+            # python main_ajedrez.py partida.pgn: continúa una partida guardada
+            if len(sys.argv) > 1:
+                partida.cargar_pgn(sys.argv[1])
 
             # Ejecutar la partida
             partida.iniciar_partida()
@@ -0,0 +1,332 @@
+"""Busca problemas tácticos en colecciones de partidas PGN.
+
+Reproduce cada partida con las reglas del juego y, en cada posición,
+puntúa todas las jugadas con una búsqueda corta. Si solo una jugada gana
+con claridad (un mate, una horquilla, una captura ganadora...), el motor
+lo confirma con una búsqueda más profunda y la posición se guarda en el
+almacén de problemas con su solución, sus temas y un rating estimado.
+
+Las partidas se leen en flujo y se reparten en bloques entre un pool de
+procesos; nunca hay más de unos pocos bloques en vuelo, así que la memoria
+no crece con el tamaño del fichero.
+
+Uso:
+    python -m modulos.Ajedrez.minar_tacticas partidas.pgn
+    python -m modulos.Ajedrez.minar_tacticas masters.pgn --procesos 4 --profundidad 5
+"""
+
+import argparse
+import collections
+import multiprocessing
+import os
+import sys
+import time
+
+from .clases.Posicion import Posicion
+from .clases.Motor import Motor, UMBRAL_MATE, MATE
+from .clases import generador
+from .clases.evaluacion import FASE_MAXIMA, VALOR_PIEZA, fase
+from .clases.fen import escribir_fen
+from .clases.pgn import leer_partidas, resolver_san
+from .niveles.problemas import AlmacenProblemas, RUTA_PROBLEMAS
+
+# Ventaja mínima (centipeones) para que la jugada cuente como ganadora y
+# distancia mínima a la segunda mejor para que sea la única
+UMBRAL_GANANCIA = 200
+MARGEN_UNICA = 250
+# Desde aquí la ventaja se etiqueta "crushing" en vez de "advantage"
+UMBRAL_APLASTANTE = 600
+# Jugadas del alumno como máximo en una solución que no es mate
+JUGADAS_SOLUCION = 2
+
+PARTIDAS_POR_BLOQUE = 20
+# Bloques pendientes por proceso: acota la memoria del lector
+BLOQUES_EN_VUELO = 2
+
+_motor = None
+
+
+def _iniciar_trabajador():
+    global _motor
+    # Nivel 4: sin ruido en la evaluación
+    _motor = Motor(4)
+
+
+def _jugadas_partida(jugadas_san, fen_inicial, idioma="en"):
+    """Genera (ply, posicion) tras reproducir cada jugada; para si hay un error."""
+    posicion = Posicion.desde_fen(fen_inicial) if fen_inicial else Posicion.inicial()
+    yield 0, posicion
+    for ply, san in enumerate(jugadas_san, start=1):
+        try:
+            mov = resolver_san(posicion, san, idioma)
+        except ValueError:
+            return
+        posicion.hacer_movimiento(mov)
+        yield ply, posicion
+
+
+def _da_jaque(posicion, pieza):
+    """La pieza ataca ella misma al rey del bando al turno (sin contar descubiertas)."""
+    rey = posicion.reyes.get(posicion.turno)
+    if rey is None:
+        return False
+    if pieza.nombre == "peon":
+        avance = -1 if pieza.color == "blanco" else 1
+        return rey.fila == pieza.fila + avance and abs(rey.col - pieza.col) == 1
+    # El generador no captura reyes: con su casilla vacía, atacarla es poder ir a ella
+    casilla = rey.fila * 8 + rey.col
+    posicion.casillas[casilla] = None
+    try:
+        return any(
+            m.f_dest * 8 + m.c_dest == casilla
+            for m in generador.generar_pseudolegales(posicion, pieza)
+        )
+    finally:
+        posicion.casillas[casilla] = rey
+
+
+def _es_horquilla(posicion, mov):
+    """Tras hacer mov: la pieza movida da jaque o ataca dos piezas que valen más."""
+    pieza = mov.pieza
+    if mov.promocion:
+        return False
+    objetivos = 1 if _da_jaque(posicion, pieza) else 0
+    for ataque in generador.generar_pseudolegales(posicion, pieza):
+        victima = ataque.capturada
+        if victima is not None and VALOR_PIEZA[victima.nombre] > VALOR_PIEZA[pieza.nombre]:
+            objetivos += 1
+    return objetivos >= 2
+
+
+def _temas(posicion, solucion, valor):
+    """Etiquetas (estilo Lichess) del problema que empieza en posicion."""
+    temas = []
+    primera = solucion[0]
+    jugadas_alumno = (len(solucion) + 1) // 2
+    if valor >= UMBRAL_MATE:
+        temas += ["mate", f"mateIn{(MATE - valor + 1) // 2}"]
+    else:
+        temas.append("crushing" if valor >= UMBRAL_APLASTANTE else "advantage")
+
+    color = posicion.turno
+    registro = posicion.hacer_movimiento(primera)
+    try:
+        if _es_horquilla(posicion, primera):
+            temas.append("fork")
+        if primera.capturada is not None and not posicion.esta_atacada(
+            primera.f_dest, primera.c_dest, color
+        ):
+            temas.append("hangingPiece")
+    finally:
+        posicion.deshacer(registro)
+
+    temas.append(
+        {1: "oneMove", 2: "short", 3: "long"}.get(jugadas_alumno, "veryLong")
+    )
+    temas.append("endgame" if fase(posicion.piezas) <= FASE_MAXIMA // 4 else "middlegame")
+    return temas
+
+
+def estimar_rating(posicion, solucion, valor):
+    """Rating inicial aproximado; los resultados de los alumnos lo irán afinando.
+
+    Cuenta la longitud de la solución y si la primera jugada es "tranquila"
+    (ni captura ni jaque), que es lo que más cuesta ver.
+    """
+    jugadas_alumno = (len(solucion) + 1) // 2
+    rating = 600 + 300 * (jugadas_alumno - 1)
+    primera = solucion[0]
+    if primera.capturada is None:
+        registro = posicion.hacer_movimiento(primera)
+        da_jaque = posicion.en_jaque()
+        posicion.deshacer(registro)
+        rating += 150 if da_jaque else 400
+    if valor < UMBRAL_MATE:
+        rating += 200
+    return rating
+
+
+def analizar_posicion(motor, posicion, profundidad):
+    """(solución, valor) si solo una jugada gana con claridad, o None."""
+    puntuadas = motor.puntuar_jugadas(posicion, 1)
+    if len(puntuadas) < 2:
+        return None
+    (candidata, mejor), (segunda, valor_segunda) = puntuadas[0], puntuadas[1]
+    if mejor < UMBRAL_GANANCIA or mejor - valor_segunda < MARGEN_UNICA:
+        return None
+
+    # Confirmación: la búsqueda profunda tiene que elegir la misma jugada...
+    resultado = motor.buscar(posicion, tiempo=3600, profundidad_max=profundidad)
+    if resultado.jugada.codigo != candidata.codigo or resultado.valor < UMBRAL_GANANCIA:
+        return None
+    # ...y la segunda mejor, mirada igual de lejos, no debe ganar también
+    registro = posicion.hacer_movimiento(segunda)
+    try:
+        respuesta = motor.buscar(posicion, tiempo=3600, profundidad_max=profundidad - 1)
+        if respuesta is not None:
+            valor_segunda = -respuesta.valor
+        else:
+            # Sin jugadas tras la segunda: también da mate, o ahoga
+            valor_segunda = MATE - 1 if posicion.en_jaque() else 0
+    finally:
+        posicion.deshacer(registro)
+    if resultado.valor - valor_segunda < MARGEN_UNICA:
+        return None
+
+    solucion = list(resultado.pv)
+    if resultado.valor >= UMBRAL_MATE:
+        plies_mate = MATE - resultado.valor
+        # Un corte por la tabla de transposición deja la variante principal
+        # a medias: sin la línea entera hasta el mate no hay solución que guardar
+        if len(solucion) < plies_mate:
+            return None
+        solucion = solucion[:plies_mate]
+    elif candidata.capturada is not None:
+        solucion = solucion[:1]
+    else:
+        solucion = solucion[: 2 * JUGADAS_SOLUCION - 1]
+    if len(solucion) % 2 == 0:
+        solucion.pop()  # la solución termina siempre con una jugada del alumno
+    return solucion, resultado.valor
+
+
+def _minar_bloque(bloque, desde_ply, profundidad):
+    """Analiza un bloque de partidas. Devuelve (problemas, posiciones vistas)."""
+    if _motor is None:
+        _iniciar_trabajador()
+    problemas = []
+    vistas = 0
+    for origen, jugadas_san, fen_inicial, idioma in bloque:
+        for ply, posicion in _jugadas_partida(jugadas_san, fen_inicial, idioma):
+            if ply < desde_ply:
+                continue
+            vistas += 1
+            encontrado = analizar_posicion(_motor, posicion, profundidad)
+            if encontrado is None:
+                continue
+            solucion, valor = encontrado
+            problemas.append(
+                (
+                    f"{origen}:{ply}",
+                    escribir_fen(posicion),
+                    [m.uci for m in solucion],
+                    _temas(posicion, solucion, valor),
+                    estimar_rating(posicion, solucion, valor),
+                )
+            )
+    return problemas, vistas
+
+
+def _bloques(rutas_pgn, partidas_por_bloque, max_partidas=None):
+    """Lee las partidas en flujo y las agrupa en bloques serializables."""
+    bloque = []
+    leidas = 0
+    for ruta in rutas_pgn:
+        nombre = os.path.basename(ruta)
+        with open(ruta, encoding="utf-8", errors="replace") as entrada:
+            for numero, partida in enumerate(leer_partidas(entrada), start=1):
+                if max_partidas is not None and leidas >= max_partidas:
+                    break
+                leidas += 1
+                bloque.append(
+                    (
+                        f"pgn:{nombre}:{numero}",
+                        partida.jugadas,
+                        partida.fen_inicial,
+                        partida.idioma,
+                    )
+                )
+                if len(bloque) >= partidas_por_bloque:
+                    yield bloque
+                    bloque = []
+    if bloque:
+        yield bloque
+
+
+def minar(
+    rutas_pgn,
+    almacen,
+    procesos=None,
+    profundidad=4,
+    desde_ply=10,
+    partidas_por_bloque=PARTIDAS_POR_BLOQUE,
+    max_partidas=None,
+    informar=None,
+):
+    """Mina las partidas y guarda los problemas. Devuelve (posiciones, problemas nuevos)."""
+    procesos = procesos or os.cpu_count() or 1
+    bloques = _bloques(rutas_pgn, partidas_por_bloque, max_partidas)
+    vistas_total, nuevos_total = 0, 0
+
+    def recoger(problemas, vistas):
+        nonlocal vistas_total, nuevos_total
+        vistas_total += vistas
+        nuevos_total += almacen.agregar(problemas)
+        if informar is not None:
+            informar(vistas_total, nuevos_total)
+
+    if procesos == 1:
+        for bloque in bloques:
+            recoger(*_minar_bloque(bloque, desde_ply, profundidad))
+        return vistas_total, nuevos_total
+
+    contexto = multiprocessing.get_context("spawn")
+    with contexto.Pool(procesos, initializer=_iniciar_trabajador) as pool:
+        # Ventana de bloques en vuelo: no se lee más PGN hasta que sale uno
+        en_vuelo = collections.deque()
+        for bloque in bloques:
+            en_vuelo.append(
+                pool.apply_async(_minar_bloque, (bloque, desde_ply, profundidad))
+            )
+            if len(en_vuelo) >= procesos * BLOQUES_EN_VUELO:
+                recoger(*en_vuelo.popleft().get())
+        while en_vuelo:
+            recoger(*en_vuelo.popleft().get())
+    return vistas_total, nuevos_total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mina problemas tácticos de partidas PGN")
+    parser.add_argument("pgn", nargs="+", help="ficheros PGN de entrada")
+    parser.add_argument("--base", default=RUTA_PROBLEMAS, help="almacén de problemas")
+    parser.add_argument("--procesos", type=int, default=None)
+    parser.add_argument(
+        "--profundidad", type=int, default=4, help="profundidad de la confirmación"
+    )
+    parser.add_argument(
+        "--desde", type=int, default=10, help="primera media jugada analizada"
+    )
+    parser.add_argument("--bloque", type=int, default=PARTIDAS_POR_BLOQUE)
+    parser.add_argument("--max-partidas", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    inicio = time.perf_counter()
+
+    def informar(vistas, nuevos):
+        print(
+            f"\r{vistas} posiciones, {nuevos} problemas "
+            f"({time.perf_counter() - inicio:.0f}s)",
+            end="",
+            flush=True,
+        )
+
+    almacen = AlmacenProblemas(args.base)
+    try:
+        vistas, nuevos = minar(
+            args.pgn,
+            almacen,
+            args.procesos,
+            args.profundidad,
+            args.desde,
+            args.bloque,
+            args.max_partidas,
+            informar,
+        )
+    finally:
+        almacen.cerrar()
+    print(f"\n{vistas} posiciones analizadas, {nuevos} problemas nuevos -> {args.base}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,439 @@
+"""Genera las tablas de finales por análisis retrógrado.
+
+Se parte de las posiciones de mate y se va hacia atrás capa a capa: las
+jugadas deshechas del bando fuerte dan posiciones ganadas y, cuando a una
+posición del bando débil ya no le queda ninguna jugada que no pierda, pasa
+a estar perdida. Todo el trabajo pesado (clasificar cada posición y
+calcular predecesores) se hace con NumPy por bloques repartidos en un pool
+de procesos.
+
+Uso:
+    python -m modulos.Ajedrez.niveles.generar_tablas
+    python -m modulos.Ajedrez.niveles.generar_tablas KQK KRK --procesos 4
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+
+import numpy as np
+
+from .tablas_finales import (
+    CABECERA,
+    FINALES,
+    MAGICO,
+    RUTA_TABLAS,
+    VERSION,
+    bytes_por_bloque,
+    ruta_tabla,
+    tamano,
+)
+
+# Piezas a las que se puede promocionar con la tabla que resulta
+PROMOCIONES_KPK = (("dama", "KQK"), ("torre", "KRK"))
+
+# Por debajo de este tamaño no compensa repartir el trabajo entre procesos
+MINIMO_PARALELO = 50000
+BLOQUE_CLASIFICACION = 1 << 18
+
+# --- TABLAS GEOMÉTRICAS (casilla = fila * 8 + col, fila 0 arriba) ---
+_FILA = np.arange(64) >> 3
+_COL = np.arange(64) & 7
+_DF = _FILA[None, :] - _FILA[:, None]
+_DC = _COL[None, :] - _COL[:, None]
+
+ADYACENTE = (np.maximum(abs(_DF), abs(_DC)) == 1)
+RECTA = ((_DF == 0) | (_DC == 0)) & ~((_DF == 0) & (_DC == 0))
+DIAGONAL = (abs(_DF) == abs(_DC)) & (_DF != 0)
+# El peón fuerte (normalizado a blancas) avanza hacia la fila 0
+ATAQUE_PEON = (_DF == -1) & (abs(_DC) == 1)
+
+BIT = np.left_shift(np.uint64(1), np.arange(64, dtype=np.uint64))
+
+DIRECCIONES_REY = ((-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1))
+DIRECCIONES_RECTAS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+DIRECCIONES_DIAGONALES = ((-1, -1), (-1, 1), (1, -1), (1, 1))
+DIRECCIONES_PIEZA = {
+    "dama": DIRECCIONES_REY,
+    "torre": DIRECCIONES_RECTAS,
+    "alfil": DIRECCIONES_DIAGONALES,
+}
+
+
+def _tabla_rayos():
+    """RAYO[casilla, dirección, distancia - 1] -> casilla destino o -1."""
+    rayo = np.full((64, 8, 7), -1, dtype=np.int64)
+    for casilla in range(64):
+        fila, col = casilla >> 3, casilla & 7
+        for d, (df, dc) in enumerate(DIRECCIONES_REY):
+            for k in range(1, 8):
+                f, c = fila + df * k, col + dc * k
+                if not (0 <= f <= 7 and 0 <= c <= 7):
+                    break
+                rayo[casilla, d, k - 1] = f * 8 + c
+    return rayo
+
+
+def _tabla_entre():
+    """ENTRE[a, b] -> máscara de las casillas estrictamente entre a y b."""
+    entre = np.zeros((64, 64), dtype=np.uint64)
+    for a in range(64):
+        for b in range(64):
+            df, dc = (b >> 3) - (a >> 3), (b & 7) - (a & 7)
+            if a == b or not (df == 0 or dc == 0 or abs(df) == abs(dc)):
+                continue
+            pasos = max(abs(df), abs(dc))
+            sf, sc = (df > 0) - (df < 0), (dc > 0) - (dc < 0)
+            mascara = 0
+            for k in range(1, pasos):
+                mascara |= 1 << (((a >> 3) + sf * k) * 8 + (a & 7) + sc * k)
+            entre[a, b] = mascara
+    return entre
+
+
+RAYO = _tabla_rayos()
+ENTRE = _tabla_entre()
+_INDICE_DIRECCION = {d: i for i, d in enumerate(DIRECCIONES_REY)}
+
+# Casillas canónicas: rey fuerte en el cuadrante superior izquierdo, peón en
+# las columnas 0-3 de las filas 1-6
+REY_CANONICO = np.array([f * 8 + c for f in range(4) for c in range(4)], dtype=np.int64)
+PEON_CANONICO = np.array(
+    [f * 8 + c for f in range(1, 7) for c in range(4)], dtype=np.int64
+)
+
+
+# --- CODIFICACIÓN VECTORIAL DEL ÍNDICE (idéntica a tablas_finales.indice) ---
+def _decodificar(nombre, indices):
+    if nombre == "KPK":
+        kd = indices & 63
+        kf = (indices >> 6) & 63
+        return kf, kd, [PEON_CANONICO[indices >> 12]]
+    extras = []
+    resto = indices
+    for _ in FINALES[nombre]:
+        extras.append(resto & 63)
+        resto = resto >> 6
+    extras.reverse()
+    return REY_CANONICO[resto >> 6], resto & 63, extras
+
+
+def _codificar(nombre, kf, kd, extras):
+    """Índices canónicos; -1 donde la posición no tiene índice (peón en 1ª/8ª)."""
+    if nombre == "KPK":
+        peon = extras[0]
+        espejo = np.where((peon & 7) > 3, 7, 0)
+        peon = peon ^ espejo
+        fila = peon >> 3
+        i = (((fila - 1) * 4 + (peon & 7)) * 64 + (kf ^ espejo)) * 64 + (kd ^ espejo)
+        return np.where((fila >= 1) & (fila <= 6), i, -1)
+    espejo = np.where((kf & 7) > 3, 7, 0) | np.where((kf >> 3) > 3, 56, 0)
+    kf = kf ^ espejo
+    i = ((kf >> 3) * 4 + (kf & 7)) * 64 + (kd ^ espejo)
+    for casilla in extras:
+        i = i * 64 + (casilla ^ espejo)
+    return i
+
+
+def _atacada(casillas, atacantes, ocupacion):
+    """Casillas atacadas por alguno de los (nombre, casillas) con esa ocupación.
+
+    Una pieza no ataca su propia casilla, así que una pieza que va a ser
+    capturada no cuenta como defensora de sí misma.
+    """
+    atacada = np.zeros(len(casillas), dtype=bool)
+    for nombre, origen in atacantes:
+        if nombre == "rey":
+            atacada |= ADYACENTE[origen, casillas]
+        elif nombre == "peon":
+            atacada |= ATAQUE_PEON[origen, casillas]
+        else:
+            if nombre == "torre":
+                linea = RECTA[origen, casillas]
+            elif nombre == "alfil":
+                linea = DIAGONAL[origen, casillas]
+            else:
+                linea = RECTA[origen, casillas] | DIAGONAL[origen, casillas]
+            libre = (ENTRE[origen, casillas] & ocupacion) == 0
+            atacada |= linea & libre
+    return atacada
+
+
+def _ocupacion(casillas):
+    ocupacion = np.zeros(len(casillas[0]), dtype=np.uint64)
+    for c in casillas:
+        ocupacion |= BIT[c]
+    return ocupacion
+
+
+# --- TRABAJO DE CADA PROCESO ---
+_nombre = None
+_promociones = {}
+
+
+def _iniciar_trabajador(nombre, directorio):
+    """Prepara el proceso: qué tabla se genera y, para KPK, las de promoción."""
+    global _nombre, _promociones
+    _nombre = nombre
+    _promociones = {}
+    if nombre == "KPK":
+        for pieza, tabla in PROMOCIONES_KPK:
+            _promociones[pieza] = leer_codigos(ruta_tabla(tabla, directorio))[1]
+
+
+def _clasificar(inicio, fin):
+    """Legalidad, jaque, jugadas del débil y semillas de promoción de un bloque.
+
+    Devuelve (valida_fuerte, valida_debil, jaque, cuenta, escapa, semillas):
+    cuenta son las jugadas legales del rey débil que no capturan y escapa
+    indica que puede capturar una pieza indefensa (material de tablas).
+    """
+    nombre = _nombre
+    piezas = FINALES[nombre]
+    indices = np.arange(inicio, fin, dtype=np.int64)
+    kf, kd, extras = _decodificar(nombre, indices)
+    todas = [kf, kd] + extras
+
+    valida = ~ADYACENTE[kf, kd]
+    for i in range(len(todas)):
+        for j in range(i + 1, len(todas)):
+            valida &= todas[i] != todas[j]
+
+    ocupacion = _ocupacion(todas)
+    atacantes = [("rey", kf)] + list(zip(piezas, extras))
+    jaque = valida & _atacada(kd, atacantes, ocupacion)
+
+    cuenta = np.zeros(len(indices), dtype=np.int8)
+    escapa = np.zeros(len(indices), dtype=bool)
+    sin_rey_debil = ocupacion & ~BIT[kd]
+    for d in range(8):
+        destino = RAYO[kd, d, 0]
+        en_tablero = destino >= 0
+        destino = np.where(en_tablero, destino, 0)
+        legal = valida & en_tablero & (destino != kf)
+        legal &= ~_atacada(destino, atacantes, sin_rey_debil)
+        captura = np.zeros(len(indices), dtype=bool)
+        for casilla in extras:
+            captura |= destino == casilla
+        escapa |= legal & captura
+        cuenta += (legal & ~captura).astype(np.int8)
+
+    semillas = np.zeros(len(indices), dtype=np.int16)
+    if nombre == "KPK":
+        peon = extras[0]
+        destino = peon - 8
+        puede = valida & ~jaque & (peon >> 3 == 1) & (destino != kf) & (destino != kd)
+        for pieza, codigos in _promociones.items():
+            i = _codificar("KQK", kf, kd, [destino])  # mismo índice para KRK
+            codigo = np.where(puede, codigos[np.where(puede, i, 0)], 0)
+            # Si el débil pierde en n medias jugadas, promocionar gana en n + 1
+            gana = (codigo > 0) & ((codigo - 1) % 2 == 0)
+            mejora = gana & ((semillas == 0) | (codigo < semillas))
+            semillas = np.where(mejora, codigo, semillas).astype(np.int16)
+
+    return valida & ~jaque, valida, jaque, cuenta, escapa, semillas
+
+
+def _predecesores_fuerte(indices):
+    """Posiciones (mueve el fuerte) desde las que una jugada lleva a las dadas."""
+    nombre = _nombre
+    piezas = FINALES[nombre]
+    kf, kd, extras = _decodificar(nombre, indices)
+    ocupacion = _ocupacion([kf, kd] + extras)
+    resultado = []
+
+    for d in range(8):
+        origen = RAYO[kf, d, 0]
+        ok = origen >= 0
+        resultado.append(_codificar(nombre, origen, kd, extras)[ok])
+
+    for j, pieza in enumerate(piezas):
+        casilla = extras[j]
+        resto = ocupacion & ~BIT[casilla]
+
+        def con_origen(origen):
+            nuevas = list(extras)
+            nuevas[j] = origen
+            return _codificar(nombre, kf, kd, nuevas)
+
+        if pieza == "peon":
+            fila = casilla >> 3
+            # Avance simple desde la fila siguiente y doble desde la 6
+            ok = fila <= 5
+            resultado.append(con_origen(np.where(ok, casilla + 8, casilla))[ok])
+            ok = (fila == 4) & ((BIT[np.minimum(casilla + 8, 63)] & resto) == 0)
+            resultado.append(con_origen(np.where(ok, casilla + 16, casilla))[ok])
+            continue
+
+        for df, dc in DIRECCIONES_PIEZA[pieza]:
+            d = _INDICE_DIRECCION[(df, dc)]
+            for k in range(7):
+                origen = RAYO[casilla, d, k]
+                ok = origen >= 0
+                origen = np.where(ok, origen, casilla)
+                ok &= (ENTRE[origen, casilla] & resto) == 0
+                if not ok.any():
+                    break
+                resultado.append(con_origen(origen)[ok])
+
+    todos = np.concatenate(resultado)
+    return todos[todos >= 0]
+
+
+def _predecesores_debil(indices):
+    """Posiciones (mueve el débil) desde las que el rey débil llega a las dadas."""
+    nombre = _nombre
+    kf, kd, extras = _decodificar(nombre, indices)
+    resultado = []
+    for d in range(8):
+        origen = RAYO[kd, d, 0]
+        ok = origen >= 0
+        resultado.append(_codificar(nombre, kf, origen, extras)[ok])
+    todos = np.concatenate(resultado)
+    return todos[todos >= 0]
+
+
+# --- REPARTO DEL TRABAJO ---
+def _en_paralelo(pool, funcion, indices, procesos):
+    if pool is None or len(indices) < MINIMO_PARALELO:
+        return funcion(indices)
+    trozos = np.array_split(indices, procesos * 2)
+    return np.concatenate(pool.map(funcion, trozos))
+
+
+def generar(nombre, directorio=RUTA_TABLAS, procesos=None):
+    """Genera una tabla y la escribe en disco. Devuelve (entradas, máximo de plies)."""
+    procesos = procesos or os.cpu_count() or 1
+    total = tamano(nombre)
+    # Los lotes pequeños se resuelven aquí mismo, así que este proceso también se prepara
+    _iniciar_trabajador(nombre, directorio)
+    pool = None
+    if procesos > 1:
+        contexto = multiprocessing.get_context("spawn")
+        pool = contexto.Pool(
+            procesos, initializer=_iniciar_trabajador, initargs=(nombre, directorio)
+        )
+
+    try:
+        rangos = [
+            (inicio, min(inicio + BLOQUE_CLASIFICACION, total))
+            for inicio in range(0, total, BLOQUE_CLASIFICACION)
+        ]
+        if pool is not None:
+            partes = pool.starmap(_clasificar, rangos)
+        else:
+            partes = [_clasificar(*r) for r in rangos]
+        valida_f, valida_d, jaque, cuenta, escapa, semillas = (
+            np.concatenate(columna) for columna in zip(*partes)
+        )
+        del partes
+
+        # Códigos: 0 = sin resolver / tablas; medias jugadas al mate + 1
+        codigos_f = np.zeros(total, dtype=np.int16)
+        codigos_d = np.zeros(total, dtype=np.int16)
+
+        frontera = np.flatnonzero(valida_d & jaque & (cuenta == 0) & ~escapa)
+        codigos_d[frontera] = 1  # mate: pierde en 0
+        plies = 0
+        max_semilla = int(semillas.max())
+        while len(frontera) or plies + 1 <= max_semilla:
+            # El fuerte gana en plies + 1 si alguna jugada lleva a una derrota del débil
+            ganadas = np.unique(_en_paralelo(pool, _predecesores_fuerte, frontera, procesos))
+            ganadas = ganadas[valida_f[ganadas] & (codigos_f[ganadas] == 0)]
+            if max_semilla:
+                extra = np.flatnonzero(semillas == plies + 1)
+                extra = extra[codigos_f[extra] == 0]
+                ganadas = np.union1d(ganadas, extra)
+            codigos_f[ganadas] = plies + 2
+
+            # El débil pierde en plies + 2 cuando ya no le queda jugada a salvo
+            previas = _en_paralelo(pool, _predecesores_debil, ganadas, procesos)
+            previas = previas[
+                valida_d[previas] & ~escapa[previas] & (codigos_d[previas] == 0)
+            ]
+            np.subtract.at(cuenta, previas, 1)
+            frontera = np.unique(previas[cuenta[previas] == 0])
+            codigos_d[frontera] = plies + 3
+            plies += 2
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    escribir_codigos(ruta_tabla(nombre, directorio), nombre, codigos_f, codigos_d)
+    return total, int(max(codigos_f.max(), codigos_d.max())) - 1
+
+
+# --- FORMATO EN DISCO ---
+def _empaquetar(codigos, bits):
+    pesos = np.arange(bits - 1, -1, -1, dtype=np.int16)
+    matriz = ((codigos[:, None] >> pesos) & 1).astype(np.uint8)
+    datos = np.packbits(matriz.ravel())
+    relleno = bytes_por_bloque(len(codigos), bits) - len(datos)
+    return datos.tobytes() + bytes(relleno)
+
+
+def escribir_codigos(ruta, nombre, codigos_f, codigos_d):
+    bits = max(1, int(max(codigos_f.max(), codigos_d.max())).bit_length())
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    temporal = ruta + ".tmp"
+    with open(temporal, "wb") as salida:
+        salida.write(
+            CABECERA.pack(MAGICO, VERSION, nombre.encode("ascii"), bits, len(codigos_f))
+        )
+        salida.write(_empaquetar(codigos_f, bits))
+        salida.write(_empaquetar(codigos_d, bits))
+    os.replace(temporal, ruta)
+
+
+def leer_codigos(ruta):
+    """Desempaqueta una tabla completa a arrays (mueve el fuerte, mueve el débil)."""
+    with open(ruta, "rb") as entrada:
+        datos = entrada.read()
+    _, _, _, bits, entradas = CABECERA.unpack_from(datos)
+    tam_bloque = bytes_por_bloque(entradas, bits)
+    pesos = (1 << np.arange(bits - 1, -1, -1)).astype(np.int16)
+    bloques = []
+    for inicio in (CABECERA.size, CABECERA.size + tam_bloque):
+        crudo = np.frombuffer(datos, dtype=np.uint8, count=tam_bloque, offset=inicio)
+        matriz = np.unpackbits(crudo)[: entradas * bits].reshape(entradas, bits)
+        bloques.append((matriz.astype(np.int16) * pesos).sum(axis=1).astype(np.int16))
+    return bloques[0], bloques[1]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera las tablas de finales")
+    parser.add_argument(
+        "finales", nargs="*", help=f"tablas a generar: {', '.join(FINALES)} (todas)"
+    )
+    parser.add_argument("--directorio", default=RUTA_TABLAS)
+    parser.add_argument("--procesos", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    finales = args.finales or list(FINALES)
+    desconocidos = [n for n in finales if n not in FINALES]
+    if desconocidos:
+        parser.error(f"finales desconocidos: {', '.join(desconocidos)}")
+    # KPK necesita KQK y KRK para valorar las promociones
+    if "KPK" in finales:
+        for previa in ("KQK", "KRK"):
+            if previa not in finales and not os.path.exists(
+                ruta_tabla(previa, args.directorio)
+            ):
+                finales.insert(0, previa)
+        finales.sort(key=lambda n: n == "KPK")
+
+    for nombre in finales:
+        inicio = time.perf_counter()
+        entradas, maximo = generar(nombre, args.directorio, args.procesos)
+        print(
+            f"{nombre}: {entradas} posiciones por bando, mate más largo en "
+            f"{(maximo + 1) // 2} jugadas ({time.perf_counter() - inicio:.1f}s)"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,386 @@
+"""Almacén de problemas tácticos en SQLite para las lecciones.
+
+Cada problema guarda la posición en FEN con el alumno al turno, la línea de
+solución en UCI (empezando por la jugada del alumno), sus temas, el rating
+y el número de piezas. Para sacar un problema al azar sin recorrer la
+tabla, cada fila lleva un número aleatorio fijo (azar) que forma parte de
+los índices: se busca el primer problema con azar >= un valor al azar
+dentro de la banda de rating pedida, lo que cuesta una búsqueda en el
+índice aunque haya cientos de miles de problemas.
+
+Uso:
+    python -m modulos.Ajedrez.niveles.problemas importar lichess_db_puzzle.csv
+    python -m modulos.Ajedrez.niveles.problemas elegir --tema mateIn2 --rating 600 800
+"""
+
+import argparse
+import csv
+import os
+import random
+import sqlite3
+import sys
+import time
+
+from ..clases.Posicion import Posicion
+from ..clases import generador
+from ..clases.fen import escribir_fen
+
+RUTA_PROBLEMAS = os.path.normpath(
+    os.path.join(os.path.dirname(__file__), "..", "assets", "problemas", "problemas.db")
+)
+
+# Ancho de cada banda de rating en los índices
+ANCHO_BANDA = 100
+# Piezas posibles en el tablero; max_piezas = MAX_PIEZAS es no filtrar
+MIN_PIEZAS = 2
+MAX_PIEZAS = 32
+# Resultados de alumnos que se acumulan antes de escribirlos en una transacción
+LOTE_RESULTADOS = 50
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS problemas (
+    id INTEGER PRIMARY KEY,
+    origen TEXT UNIQUE,
+    fen TEXT NOT NULL,
+    solucion TEXT NOT NULL,
+    temas TEXT NOT NULL DEFAULT '',
+    rating INTEGER NOT NULL,
+    banda INTEGER NOT NULL,
+    piezas INTEGER NOT NULL,
+    azar REAL NOT NULL,
+    intentos INTEGER NOT NULL DEFAULT 0,
+    aciertos INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_problemas_banda ON problemas (banda, azar);
+CREATE INDEX IF NOT EXISTS idx_problemas_piezas ON problemas (piezas, banda, azar);
+
+-- Un registro por (tema, problema); lleva copiados los campos de filtrado
+-- para que el índice cubra la consulta entera
+CREATE TABLE IF NOT EXISTS temas (
+    tema TEXT NOT NULL,
+    problema_id INTEGER NOT NULL REFERENCES problemas (id) ON DELETE CASCADE,
+    banda INTEGER NOT NULL,
+    azar REAL NOT NULL,
+    rating INTEGER NOT NULL,
+    piezas INTEGER NOT NULL,
+    PRIMARY KEY (tema, problema_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_temas ON temas (tema, banda, azar, rating, piezas);
+
+CREATE TABLE IF NOT EXISTS resultados (
+    id INTEGER PRIMARY KEY,
+    problema_id INTEGER NOT NULL REFERENCES problemas (id) ON DELETE CASCADE,
+    estudiante TEXT NOT NULL DEFAULT '',
+    resuelto INTEGER NOT NULL,
+    segundos REAL,
+    fecha REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_resultados_estudiante ON resultados (estudiante, fecha);
+"""
+
+_COLUMNAS = "id, fen, solucion, temas, rating, piezas"
+
+
+class Problema:
+    """Un problema táctico leído del almacén."""
+
+    __slots__ = ("id", "fen", "solucion", "temas", "rating", "piezas")
+
+    def __init__(self, id, fen, solucion, temas, rating, piezas):
+        self.id = id
+        self.fen = fen
+        self.solucion = solucion
+        self.temas = temas
+        self.rating = rating
+        self.piezas = piezas
+
+    @classmethod
+    def _desde_fila(cls, fila):
+        id_, fen, solucion, temas, rating, piezas = fila
+        return cls(id_, fen, solucion.split(), tuple(temas.split()), rating, piezas)
+
+    def posicion(self):
+        return Posicion.desde_fen(self.fen)
+
+    def __repr__(self):
+        return f"Problema({self.id}, {self.rating}, {' '.join(self.temas)!r})"
+
+
+def contar_piezas(fen):
+    """Piezas en el tablero de un FEN, sin construir la posición."""
+    return sum(car.isalpha() for car in fen.split(" ", 1)[0])
+
+
+def banda(rating):
+    return rating // ANCHO_BANDA
+
+
+def _sorteo_ponderado(pesos, azar):
+    """Recorre las claves al azar, cada vez con probabilidad proporcional a su peso."""
+    pesos = dict(pesos)
+    while pesos:
+        clave = azar.choices(list(pesos), list(pesos.values()))[0]
+        del pesos[clave]
+        yield clave
+
+
+class AlmacenProblemas:
+    """Conexión al almacén: importación, selección al azar y resultados."""
+
+    def __init__(self, ruta=RUTA_PROBLEMAS):
+        self.ruta = ruta
+        if ruta != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(ruta)), exist_ok=True)
+        self.conexion = sqlite3.connect(ruta)
+        self.conexion.execute("PRAGMA foreign_keys = ON")
+        if ruta != ":memory:":
+            self.conexion.execute("PRAGMA journal_mode = WAL")
+            self.conexion.execute("PRAGMA synchronous = NORMAL")
+        self.conexion.executescript(ESQUEMA)
+        self._resultados_pendientes = []
+        self._conteos = None  # problemas por (piezas, banda); ver _conteo_tramos
+
+    # --- ESCRITURA DE PROBLEMAS ---
+    def agregar(self, problemas, lote=5000, azar=random):
+        """Inserta problemas de un iterable en transacciones de `lote` filas.
+
+        Cada elemento es (origen, fen, solucion, temas, rating); solucion y
+        temas pueden ser listas o cadenas separadas por espacios. Los
+        problemas cuyo origen ya existe se ignoran. Devuelve cuántos entraron.
+        """
+        total = 0
+        bloque = []
+        for problema in problemas:
+            bloque.append(problema)
+            if len(bloque) >= lote:
+                total += self._insertar(bloque, azar)
+                bloque = []
+        if bloque:
+            total += self._insertar(bloque, azar)
+        return total
+
+    def _insertar(self, bloque, azar):
+        insertados = 0
+        with self.conexion:
+            cursor = self.conexion.cursor()
+            for origen, fen, solucion, temas, rating in bloque:
+                if not isinstance(solucion, str):
+                    solucion = " ".join(solucion)
+                if isinstance(temas, str):
+                    temas = temas.split()
+                rating = int(rating)
+                piezas = contar_piezas(fen)
+                valor_azar = azar.random()
+                cursor.execute(
+                    "INSERT OR IGNORE INTO problemas "
+                    "(origen, fen, solucion, temas, rating, banda, piezas, azar) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (origen, fen, solucion, " ".join(temas), rating,
+                     banda(rating), piezas, valor_azar),
+                )
+                if not cursor.rowcount:
+                    continue
+                insertados += 1
+                id_problema = cursor.lastrowid
+                cursor.executemany(
+                    "INSERT OR IGNORE INTO temas "
+                    "(tema, problema_id, banda, azar, rating, piezas) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    [
+                        (tema, id_problema, banda(rating), valor_azar, rating, piezas)
+                        for tema in temas
+                    ],
+                )
+        if insertados:
+            self._conteos = None
+        return insertados
+
+    def importar_csv(self, ruta, lote=5000):
+        """Importa el CSV de problemas de Lichess leyéndolo fila a fila.
+
+        Columnas: PuzzleId, FEN, Moves, Rating, ..., Themes. En ese formato
+        el FEN es anterior a la jugada del rival que plantea el problema, así
+        que se aplica esa primera jugada para dejar al alumno al turno.
+        """
+        with open(ruta, newline="", encoding="utf-8") as entrada:
+            return self.agregar(_filas_lichess(csv.reader(entrada)), lote)
+
+    # --- CONSULTAS ---
+    def total(self):
+        return self.conexion.execute("SELECT COUNT(*) FROM problemas").fetchone()[0]
+
+    def obtener(self, id_problema):
+        fila = self.conexion.execute(
+            f"SELECT {_COLUMNAS} FROM problemas WHERE id = ?", (id_problema,)
+        ).fetchone()
+        return Problema._desde_fila(fila) if fila else None
+
+    def _conteo_tramos(self):
+        """Problemas por (piezas, banda), para que elegir pese cada tramo.
+
+        Se cuenta una vez recorriendo idx_problemas_piezas y se guarda hasta
+        la próxima inserción desde este almacén.
+        """
+        if self._conteos is None:
+            self._conteos = {
+                (piezas, numero_banda): n
+                for piezas, numero_banda, n in self.conexion.execute(
+                    "SELECT piezas, banda, COUNT(*) FROM problemas "
+                    "INDEXED BY idx_problemas_piezas GROUP BY piezas, banda"
+                )
+            }
+        return self._conteos
+
+    def elegir(
+        self, tema=None, rating_min=0, rating_max=4000, max_piezas=MAX_PIEZAS, azar=random
+    ):
+        """Un problema al azar con el tema, rating y número de piezas pedidos.
+
+        El rating va de rating_min (incluido) a rating_max (excluido).
+        Devuelve None si no hay ninguno.
+        """
+        bandas = list(range(banda(rating_min), banda(max(rating_max - 1, rating_min)) + 1))
+        if tema is not None:
+            consulta = (
+                "SELECT problema_id FROM temas INDEXED BY idx_temas "
+                "WHERE tema = ? AND banda = ? AND azar {} ? AND rating >= ? "
+                "AND rating < ? AND piezas <= ? ORDER BY azar LIMIT 1"
+            )
+            tramos = [(tema, b) for b in bandas]
+            azar.shuffle(tramos)
+            filtros = (rating_min, rating_max, max_piezas)
+        elif max_piezas < MAX_PIEZAS:
+            # Con límite de piezas cada (piezas, banda) permitido es un tramo
+            # contiguo de idx_problemas_piezas: se sondean en vez de recorrer
+            # la banda entera descartando por piezas. Cada tramo sale con peso
+            # igual a sus problemas, para que los de un tramo pequeño no se
+            # repitan una y otra vez
+            consulta = (
+                f"SELECT {_COLUMNAS} FROM problemas INDEXED BY idx_problemas_piezas "
+                "WHERE piezas = ? AND banda = ? AND azar {} ? AND rating >= ? "
+                "AND rating < ? ORDER BY azar LIMIT 1"
+            )
+            conteos = self._conteo_tramos()
+            pesos = {
+                (n, b): conteos[(n, b)]
+                for n in range(MIN_PIEZAS, max_piezas + 1)
+                for b in bandas
+                if (n, b) in conteos
+            }
+            tramos = _sorteo_ponderado(pesos, azar)
+            filtros = (rating_min, rating_max)
+        else:
+            consulta = (
+                f"SELECT {_COLUMNAS} FROM problemas "
+                "WHERE banda = ? AND azar {} ? AND rating >= ? AND rating < ? "
+                "ORDER BY azar LIMIT 1"
+            )
+            tramos = [(b,) for b in bandas]
+            azar.shuffle(tramos)
+            filtros = (rating_min, rating_max)
+        for tramo in tramos:
+            punto = azar.random()
+            # Primero desde el punto hacia arriba; si no hay, se da la vuelta
+            for operador in (">=", "<"):
+                fila = self.conexion.execute(
+                    consulta.format(operador), tramo + (punto,) + filtros
+                ).fetchone()
+                if fila is None:
+                    continue
+                if tema is None:
+                    return Problema._desde_fila(fila)
+                return self.obtener(fila[0])
+        return None
+
+    # --- RESULTADOS DE LOS ALUMNOS ---
+    def registrar_resultado(self, id_problema, resuelto, segundos=None, estudiante=""):
+        """Anota un intento; se escribe junto con otros en una sola transacción."""
+        self._resultados_pendientes.append(
+            (id_problema, estudiante, 1 if resuelto else 0, segundos, time.time())
+        )
+        if len(self._resultados_pendientes) >= LOTE_RESULTADOS:
+            self.guardar_resultados()
+
+    def guardar_resultados(self):
+        pendientes, self._resultados_pendientes = self._resultados_pendientes, []
+        if not pendientes:
+            return
+        with self.conexion:
+            self.conexion.executemany(
+                "INSERT INTO resultados (problema_id, estudiante, resuelto, segundos, fecha) "
+                "VALUES (?, ?, ?, ?, ?)",
+                pendientes,
+            )
+            self.conexion.executemany(
+                "UPDATE problemas SET intentos = intentos + 1, aciertos = aciertos + ? "
+                "WHERE id = ?",
+                [(resuelto, id_problema) for id_problema, _, resuelto, _, _ in pendientes],
+            )
+
+    def cerrar(self):
+        self.guardar_resultados()
+        self.conexion.close()
+
+
+def _filas_lichess(filas):
+    """Convierte filas del CSV de Lichess en tuplas para AlmacenProblemas.agregar."""
+    for fila in filas:
+        if not fila or fila[0] == "PuzzleId" or len(fila) < 8:
+            continue
+        origen, fen, jugadas, rating, themes = fila[0], fila[1], fila[2].split(), fila[3], fila[7]
+        if len(jugadas) < 2:
+            continue
+        posicion = Posicion.desde_fen(fen)
+        planteamiento = generador.jugada_uci(posicion, jugadas[0])
+        if planteamiento is None:
+            continue
+        posicion.hacer_movimiento(planteamiento)
+        yield (
+            f"lichess:{origen}",
+            escribir_fen(posicion),
+            jugadas[1:],
+            themes,
+            rating,
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Almacén de problemas tácticos")
+    parser.add_argument("--base", default=RUTA_PROBLEMAS, help="fichero SQLite")
+    ordenes = parser.add_subparsers(dest="orden", required=True)
+
+    importar = ordenes.add_parser("importar", help="importa un CSV de Lichess")
+    importar.add_argument("csv")
+
+    elegir = ordenes.add_parser("elegir", help="muestra un problema al azar")
+    elegir.add_argument("--tema")
+    elegir.add_argument("--rating", type=int, nargs=2, default=(0, 4000))
+    elegir.add_argument("--piezas", type=int, default=MAX_PIEZAS, help="máximo de piezas")
+    args = parser.parse_args(argv)
+
+    almacen = AlmacenProblemas(args.base)
+    try:
+        if args.orden == "importar":
+            inicio = time.perf_counter()
+            nuevos = almacen.importar_csv(args.csv)
+            print(
+                f"{nuevos} problemas nuevos en {time.perf_counter() - inicio:.1f}s "
+                f"({almacen.total()} en total)"
+            )
+        else:
+            inicio = time.perf_counter()
+            problema = almacen.elegir(args.tema, *args.rating, max_piezas=args.piezas)
+            ms = (time.perf_counter() - inicio) * 1000
+            if problema is None:
+                print("No hay problemas con esos filtros")
+                return 1
+            print(f"#{problema.id}  rating {problema.rating}  {' '.join(problema.temas)}")
+            print(f"FEN: {problema.fen}")
+            print(f"Solución: {' '.join(problema.solucion)}  ({ms:.2f} ms)")
+    finally:
+        almacen.cerrar()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,228 @@
+"""Tablas de finales básicos (KQK, KRK, KBBK, KPK) con distancia al mate.
+
+Las tablas las genera generar_tablas.py por análisis retrógrado y se guardan
+en disco empaquetadas a nivel de bit. Aquí solo se leen: el fichero se
+proyecta con mmap y cada consulta calcula el índice de la posición y lee
+unos pocos bits, sin búsqueda ni estructuras en memoria.
+
+Convenciones del índice (compartidas con el generador):
+  * El bando fuerte se normaliza a blancas; si es el negro, se refleja el
+    tablero en vertical (casilla ^ 56).
+  * Sin peones se usa la simetría de 4 ejes: el rey fuerte queda siempre
+    en el cuadrante de filas 0-3 y columnas 0-3.
+  * Con peón solo hay simetría izquierda-derecha: el peón queda en las
+    columnas 0-3 (y en las filas 1-6, las únicas posibles).
+  * Cada entrada guarda 0 si es tablas (o ilegal) y, si no, las medias
+    jugadas hasta el mate más uno. Con número impar de medias jugadas gana
+    el bando al turno; con número par, pierde.
+"""
+
+import mmap
+import os
+import struct
+
+from ..clases import generador
+from ..clases.Motor import MATE
+
+RUTA_TABLAS = os.path.normpath(
+    os.path.join(os.path.dirname(__file__), "..", "assets", "tablas")
+)
+
+MAGICO = b"TFAJ"
+VERSION = 1
+CABECERA = struct.Struct(">4sB8sBI")  # mágico, versión, nombre, bits, entradas
+
+# Piezas del bando fuerte además del rey, en el orden del índice
+FINALES = {
+    "KQK": ("dama",),
+    "KRK": ("torre",),
+    "KBBK": ("alfil", "alfil"),
+    "KPK": ("peon",),
+}
+# Material sin posibilidad de mate: tablas sin necesidad de tabla
+TABLAS_TEORICAS = {(), ("alfil",), ("caballo",)}
+
+_FINAL_POR_MATERIAL = {tuple(sorted(piezas)): nombre for nombre, piezas in FINALES.items()}
+
+
+def tamano(nombre):
+    """Número de entradas de la tabla para cada bando al turno."""
+    if nombre == "KPK":
+        return 24 * 64 * 64
+    return 16 * 64 ** (1 + len(FINALES[nombre]))
+
+
+def indice(nombre, kf, kd, extras):
+    """Índice canónico con el bando fuerte ya normalizado a blancas."""
+    if nombre == "KPK":
+        peon = extras[0]
+        espejo = 7 if peon & 7 > 3 else 0
+        peon ^= espejo
+        i = ((peon >> 3) - 1) * 4 + (peon & 7)
+        return (i * 64 + (kf ^ espejo)) * 64 + (kd ^ espejo)
+    espejo = (7 if kf & 7 > 3 else 0) | (56 if kf >> 3 > 3 else 0)
+    kf ^= espejo
+    i = ((kf >> 3) * 4 + (kf & 7)) * 64 + (kd ^ espejo)
+    for casilla in extras:
+        i = i * 64 + (casilla ^ espejo)
+    return i
+
+
+def ruta_tabla(nombre, directorio=RUTA_TABLAS):
+    return os.path.join(directorio, f"{nombre}.tbl")
+
+
+def disponibles(directorio=RUTA_TABLAS):
+    """True si generar_tablas.py ya dejó alguna tabla en el directorio."""
+    return any(os.path.exists(ruta_tabla(nombre, directorio)) for nombre in FINALES)
+
+
+class TablaFinal:
+    """Un fichero de tabla: dos bloques de bits (mueve el fuerte / el débil)."""
+
+    def __init__(self, ruta):
+        self._fichero = open(ruta, "rb")
+        self._datos = mmap.mmap(self._fichero.fileno(), 0, access=mmap.ACCESS_READ)
+        magico, version, nombre, bits, entradas = CABECERA.unpack_from(self._datos)
+        if magico != MAGICO or version != VERSION:
+            self.cerrar()
+            raise ValueError(f"No es una tabla de finales válida: {ruta}")
+        self.nombre = nombre.rstrip(b"\0").decode("ascii")
+        self.bits = bits
+        self.entradas = entradas
+        self._mascara = (1 << bits) - 1
+        bytes_bloque = bytes_por_bloque(entradas, bits)
+        self._inicio = (CABECERA.size, CABECERA.size + bytes_bloque)
+
+    def codigo(self, mueve_fuerte, i):
+        """Código guardado (0 = tablas) para el índice y bando al turno."""
+        bit = i * self.bits
+        base = self._inicio[0 if mueve_fuerte else 1] + (bit >> 3)
+        trozo = int.from_bytes(self._datos[base : base + 3], "big")
+        return (trozo >> (24 - (bit & 7) - self.bits)) & self._mascara
+
+    def cerrar(self):
+        self._datos.close()
+        self._fichero.close()
+
+
+def bytes_por_bloque(entradas, bits):
+    # Dos bytes de relleno para poder leer siempre 3 bytes seguidos
+    return (entradas * bits + 7) // 8 + 2
+
+
+class TablasFinales:
+    """Consulta de las tablas disponibles en un directorio."""
+
+    def __init__(self, directorio=RUTA_TABLAS):
+        self.tablas = {}
+        for nombre in FINALES:
+            ruta = ruta_tabla(nombre, directorio)
+            if os.path.exists(ruta):
+                self.tablas[nombre] = TablaFinal(ruta)
+
+    def _clasificar(self, posicion):
+        """(nombre, mueve_fuerte, kf, kd, extras) normalizado, o None."""
+        if posicion.derechos_enroque:
+            return None
+        extras = [p for p in posicion.piezas if p.nombre != "rey"]
+        colores = {p.color for p in extras}
+        if len(colores) > 1:
+            return None
+        material = tuple(sorted(p.nombre for p in extras))
+        if material in TABLAS_TEORICAS:
+            return ("tablas", False, 0, 0, ())
+        nombre = _FINAL_POR_MATERIAL.get(material)
+        if nombre is None or nombre not in self.tablas:
+            return None
+        fuerte = extras[0].color
+        debil = "negro" if fuerte == "blanco" else "blanco"
+        reflejo = 0 if fuerte == "blanco" else 56
+        kf = posicion.reyes[fuerte]
+        kd = posicion.reyes[debil]
+        orden = {n: i for i, n in enumerate(FINALES[nombre])}
+        extras.sort(key=lambda p: orden[p.nombre])
+        return (
+            nombre,
+            posicion.turno == fuerte,
+            (kf.fila * 8 + kf.col) ^ reflejo,
+            (kd.fila * 8 + kd.col) ^ reflejo,
+            tuple((p.fila * 8 + p.col) ^ reflejo for p in extras),
+        )
+
+    def sondear(self, posicion):
+        """("gana" | "pierde" | "tablas", medias jugadas al mate) o None.
+
+        El resultado es desde el punto de vista del bando al turno.
+        """
+        datos = self._clasificar(posicion)
+        if datos is None:
+            return None
+        nombre, mueve_fuerte, kf, kd, extras = datos
+        if nombre == "tablas":
+            return ("tablas", 0)
+        codigo = self.tablas[nombre].codigo(mueve_fuerte, indice(nombre, kf, kd, extras))
+        if codigo == 0:
+            return ("tablas", 0)
+        plies = codigo - 1
+        return ("gana" if plies % 2 else "pierde", plies)
+
+    def valor(self, posicion):
+        """Puntuación para el Motor (mates relativos a esta posición) o None."""
+        resultado = self.sondear(posicion)
+        if resultado is None:
+            return None
+        tipo, plies = resultado
+        if tipo == "gana":
+            return MATE - plies
+        if tipo == "pierde":
+            return -MATE + plies
+        return 0
+
+    def mejor_jugada(self, posicion):
+        """Jugada perfecta: el mate más rápido, la defensa más larga o unas tablas.
+
+        Devuelve (Movimiento, resultado, medias jugadas) o None si la
+        posición no está en las tablas o no tiene jugadas.
+        """
+        if self.sondear(posicion) is None:
+            return None
+        mejor, mejor_orden = None, None
+        for mov in generador.generar_todos_legales(posicion, posicion.turno):
+            registro = posicion.hacer_movimiento(mov)
+            resultado = self.sondear(posicion)
+            posicion.deshacer(registro)
+            if resultado is None:
+                continue
+            tipo, plies = resultado
+            if tipo == "pierde":
+                orden, propio = (2, -plies), ("gana", plies + 1)
+            elif tipo == "tablas":
+                orden, propio = (1, 0), ("tablas", 0)
+            else:
+                orden, propio = (0, plies), ("pierde", plies + 1)
+            if mejor_orden is None or orden > mejor_orden:
+                mejor, mejor_orden = (mov, *propio), orden
+        return mejor
+
+    def cerrar(self):
+        for tabla in self.tablas.values():
+            tabla.cerrar()
+        self.tablas = {}
+
+
+_tablas_proceso = None
+
+
+def sondear_motor(posicion):
+    """Gancho sondeo_finales para Motor/ServicioMotor.
+
+    Es una función de módulo para poder pasarla a un proceso "spawn"; las
+    tablas se abren la primera vez que se usa en cada proceso.
+    """
+    global _tablas_proceso
+    if len(posicion.piezas) > 4:
+        return None
+    if _tablas_proceso is None:
+        _tablas_proceso = TablasFinales()
+    return _tablas_proceso.valor(posicion)
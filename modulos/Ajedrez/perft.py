@@ -0,0 +1,179 @@
+"""Perft: conteo de nodos del generador de movimientos.
+
+Sirve para medir la velocidad de las reglas y como prueba de regresión
+cada vez que se toca la lógica de legalidad.
+
+Uso:
+    python -m modulos.Ajedrez.perft --profundidad 3
+    python -m modulos.Ajedrez.perft --fen "<fen>" --profundidad 4 --divide
+    python -m modulos.Ajedrez.perft --verificar --profundidad 3
+"""
+
+import argparse
+import sys
+import time
+
+from .clases.Posicion import Posicion
+from .clases import generador
+from .clases.fen import FEN_INICIAL
+
+# Nombre -> (FEN, conteos esperados para profundidad 1, 2, 3, ...)
+POSICIONES_REFERENCIA = {
+    "inicial": (FEN_INICIAL, (20, 400, 8902, 197281, 4865609)),
+    "kiwipete": (
+        "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+        (48, 2039, 97862, 4085603),
+    ),
+    "posicion_3": (
+        "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+        (14, 191, 2812, 43238, 674624),
+    ),
+    "posicion_4": (
+        "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1",
+        (6, 264, 9467, 422333),
+    ),
+    "posicion_5": (
+        "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8",
+        (44, 1486, 62379, 2103487),
+    ),
+    "posicion_6": (
+        "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10",
+        (46, 2079, 89890, 3894594),
+    ),
+    # Casos límite de captura al paso, enroque y promoción
+    "al_paso_ilegal_1": ("3k4/3p4/8/K1P4r/8/8/8/8 b - - 0 1", (18, 92, 1670, 10138)),
+    "al_paso_ilegal_2": (
+        "8/8/4k3/8/2p5/8/B2P2K1/8 w - - 0 1",
+        (13, 102, 1266, 10276),
+    ),
+    "al_paso_da_jaque": (
+        "8/8/1k6/2b5/2pP4/8/5K2/8 b - d3 0 1",
+        (15, 126, 1928, 13931),
+    ),
+    "enroque_corto_da_jaque": (
+        "5k2/8/8/8/8/8/8/4K2R w K - 0 1",
+        (15, 66, 1198, 6399),
+    ),
+    "enroque_largo_da_jaque": (
+        "3k4/8/8/8/8/8/8/R3K3 w Q - 0 1",
+        (16, 71, 1286, 7418),
+    ),
+    "derechos_de_enroque": (
+        "r3k2r/1b4bq/8/8/8/8/7B/R3K2R w KQkq - 0 1",
+        (26, 1141, 27826, 1274206),
+    ),
+    "enroque_impedido": (
+        "r3k2r/8/3Q4/8/8/5q2/8/R3K2R b KQkq - 0 1",
+        (44, 1494, 50509, 1720476),
+    ),
+    "promocion_sale_de_jaque": (
+        "2K2r2/4P3/8/8/8/8/8/3k4 w - - 0 1",
+        (11, 133, 1442, 19174),
+    ),
+    "jaque_descubierto": (
+        "8/8/1P2K3/8/2n5/1q6/8/5k2 b - - 0 1",
+        (29, 165, 5160, 31961),
+    ),
+    "promocion_da_jaque": ("4k3/1P6/8/8/8/8/K7/8 w - - 0 1", (9, 40, 472, 2661)),
+    "subpromocion_da_jaque": ("8/P1k5/K7/8/8/8/8/8 w - - 0 1", (6, 27, 273, 1329)),
+    "autoahogado": ("K1k5/8/P7/8/8/8/8/8 w - - 0 1", (2, 6, 13, 63)),
+    "ahogado_y_mate": ("8/k1P5/8/1K6/8/8/8/8 w - - 0 1", (10, 25, 268, 926)),
+    "ahogado_y_mate_2": (
+        "8/8/2k5/5q2/5n2/8/5K2/8 b - - 0 1",
+        (37, 183, 6559, 23527),
+    ),
+}
+
+
+def perft(posicion, profundidad):
+    """Número de posiciones hoja a la profundidad dada."""
+    movimientos = generador.generar_todos_legales(posicion, posicion.turno)
+    if profundidad <= 1:
+        return len(movimientos) if profundidad == 1 else 1
+    total = 0
+    for mov in movimientos:
+        registro = posicion.hacer_movimiento(mov)
+        total += perft(posicion, profundidad - 1)
+        posicion.deshacer(registro)
+    return total
+
+
+def divide(posicion, profundidad):
+    """Conteo por cada jugada de la raíz, para localizar diferencias."""
+    resultado = {}
+    for mov in generador.generar_todos_legales(posicion, posicion.turno):
+        registro = posicion.hacer_movimiento(mov)
+        resultado[mov.uci] = perft(posicion, profundidad - 1)
+        posicion.deshacer(registro)
+    return resultado
+
+
+def medir(posicion, profundidad):
+    inicio = time.perf_counter()
+    nodos = perft(posicion, profundidad)
+    segundos = time.perf_counter() - inicio
+    return nodos, segundos
+
+
+def verificar(profundidad_max):
+    """Compara con los conteos de referencia. Devuelve True si todo coincide."""
+    correcto = True
+    nodos_totales, segundos_totales = 0, 0.0
+    for nombre, (fen, esperados) in POSICIONES_REFERENCIA.items():
+        posicion = Posicion.desde_fen(fen)
+        for profundidad, esperado in enumerate(esperados, start=1):
+            if profundidad > profundidad_max:
+                break
+            nodos, segundos = medir(posicion, profundidad)
+            nodos_totales += nodos
+            segundos_totales += segundos
+            estado = "OK" if nodos == esperado else "FALLO"
+            if nodos != esperado:
+                correcto = False
+            print(
+                f"{estado:5} {nombre:26} prof {profundidad}: "
+                f"{nodos:>10} (esperado {esperado:>10})  {segundos:7.2f}s"
+            )
+    if segundos_totales > 0:
+        print(
+            f"\nTotal: {nodos_totales} nodos en {segundos_totales:.2f}s "
+            f"({nodos_totales / segundos_totales:,.0f} nodos/s)"
+        )
+    return correcto
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Perft del generador de movimientos")
+    parser.add_argument("--fen", default=FEN_INICIAL, help="posición de partida")
+    parser.add_argument("--profundidad", "--depth", type=int, default=3)
+    parser.add_argument(
+        "--divide", action="store_true", help="mostrar el conteo por jugada raíz"
+    )
+    parser.add_argument(
+        "--verificar",
+        action="store_true",
+        help="comparar con las posiciones de referencia hasta --profundidad",
+    )
+    args = parser.parse_args(argv)
+
+    if args.verificar:
+        return 0 if verificar(args.profundidad) else 1
+
+    posicion = Posicion.desde_fen(args.fen)
+    inicio = time.perf_counter()
+    if args.divide:
+        conteos = divide(posicion, args.profundidad)
+        for uci, nodos in sorted(conteos.items()):
+            print(f"{uci}: {nodos}")
+        nodos = sum(conteos.values())
+        print(f"\nJugadas: {len(conteos)}")
+    else:
+        nodos = perft(posicion, args.profundidad)
+    segundos = time.perf_counter() - inicio
+    print(f"Nodos: {nodos}")
+    print(f"Tiempo: {segundos:.2f}s ({nodos / max(segundos, 1e-9):,.0f} nodos/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+"""Repasar la partida con las flechas no gasta tiempo de reloj."""
+
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+from pygame.locals import K_END, K_LEFT
+
+from modulos.Ajedrez.clases import generador
+from modulos.Ajedrez.clases.juego import Juego
+from modulos.Ajedrez.clases.RelojAjedrez import NS, RelojAjedrez
+
+
+def _juego_con_reloj(minutos=5):
+    """Juego cuyo reloj lee un instante que avanza el test (ns en ahora[0])."""
+    ahora = [0]
+    juego = Juego(minutos=minutos, archivar=False)
+    juego.reloj = RelojAjedrez(minutos * 60.0, fuente=lambda: ahora[0])
+    return juego, ahora
+
+
+def _jugar(juego, ahora, *jugadas, segundos=5):
+    for uci in jugadas:
+        ahora[0] += segundos * NS
+        juego.jugar_movimiento(generador.jugada_uci(juego.posicion, uci))
+
+
+def test_volver_atras_para_el_reloj():
+    juego, ahora = _juego_con_reloj()
+    _jugar(juego, ahora, "e2e4", "e7e5", "g1f3", "b8c6")
+    juego.navegar(K_LEFT)
+    juego.navegar(K_LEFT)
+    tiempos = (juego.tiempo_blanco, juego.tiempo_negro)
+
+    # Diez minutos mirando la posición: más que el tiempo de la partida
+    ahora[0] += 600 * NS
+    juego.actualizar_relojes()
+
+    assert not juego.reloj.iniciado
+    assert juego.resultado is None
+    assert (juego.tiempo_blanco, juego.tiempo_negro) == tiempos
+
+
+def test_el_reloj_sigue_al_llegar_al_final():
+    juego, ahora = _juego_con_reloj()
+    _jugar(juego, ahora, "e2e4", "e7e5")
+    juego.navegar(K_LEFT)
+    ahora[0] += 60 * NS
+    juego.navegar(K_END)
+    negro = juego.tiempo_negro
+    assert juego.reloj.iniciado
+
+    ahora[0] += 10 * NS
+    assert juego.tiempo_blanco == 290.0  # corre desde que se volvió al final, no antes
+    assert juego.tiempo_negro == negro
+
+
+def test_una_variante_nueva_no_cobra_el_repaso():
+    juego, ahora = _juego_con_reloj()
+    _jugar(juego, ahora, "e2e4", "e7e5")
+    juego.navegar(K_LEFT)
+    blanco, negro = juego.tiempo_blanco, juego.tiempo_negro
+
+    ahora[0] += 60 * NS
+    juego.jugar_movimiento(generador.jugada_uci(juego.posicion, "c7c5"))
+
+    assert juego.tiempo_negro == negro  # el rato repasando no cuenta
+    assert juego.tiempo_blanco == blanco  # y el de las blancas acaba de arrancar
+    assert juego.reloj.iniciado and juego.turno == "blanco"